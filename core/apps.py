@@ -19,6 +19,15 @@ class CoreConfig(AppConfig):
         the user does not already exist. It is resilient to missing tables during
         initial migration phase and will silently no-op in that case.
         """
+        # Önbellek/indeks güncelleme sinyallerini bağla
+        from . import signals  # noqa: F401
+
+        # AVIF yazımı Pillow 10'da eklentiyle gelir; kurulu değilse türevler/küçük görseller WebP ve JPEG olur
+        try:
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            pass
+
         logger = logging.getLogger(__name__)
 
         username = os.environ.get('DJANGO_SUPERUSER_USERNAME')
@@ -0,0 +1,19 @@
+from django.templatetags.static import static
+
+
+# Yol -> static URL; manifestli depolamada manifest collectstatic'te yazılır ve
+# süreç boyunca değişmez, bu yüzden her yol worker başına bir kez çözülür
+_urls = {}
+
+
+def static_url(path):
+    """``static(path)`` ile aynı URL (görünümlerde hesaplanan yollar için sözlükten)
+
+    Manifestli depolamada storage.url() her çağrıda adı temizleyip manifestte
+    arar; katalog görselleri gibi sayfa başına onlarca kez çözülen yollar için
+    sonuç burada tutulur.
+    """
+    url = _urls.get(path)
+    if url is None:
+        url = _urls[path] = static(path)
+    return url
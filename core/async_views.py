@@ -0,0 +1,61 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+
+from . import views
+from .categories import get_category_registry
+from .suggest import get_suggestion_index
+
+
+# ASGI modunda (ASGI_MODE=1) sayfaların sorgu ve context mantığı views'daki senkron görünümlerle
+# ortaktır; burada yalnızca sarmalanır. Sayfa satırları async ORM ile okunur, katalog/indeks erişimi
+# ve render (şablon etiketleri, context processor'lar) thread'de çalışır; olay döngüsü yavaş
+# istemciler ve keep-alive bağlantılar için boş kalır.
+
+# Sürüm kontrolü için ara sıra sorgu yapanlar ve render ORM bağlantısını paylaşmak için
+# isteğin senkron thread'inde çalışır
+_get_category_registry = sync_to_async(get_category_registry)
+_category_products = sync_to_async(views._category_products)
+_filter_products = sync_to_async(views._filter_products)
+_render_category_detail = sync_to_async(views._render_category_detail)
+_render_product_list = sync_to_async(views._render_product_list)
+
+
+async def _paginate(request, items, per_page, keyset=None):
+    """views._paginate'in async karşılığı: sayım ve sayfa satırları async ORM ile"""
+    paginator, number = views._paginator(request, items, per_page, keyset)
+    return await paginator.aget_page(number)
+
+
+async def home(request):
+    """Ana sayfa - önbellek kontrolü (ve gerekirse render) thread'de, yanıt olay döngüsünden"""
+    page = await sync_to_async(views._home_page)(request)
+    return page.response(request)
+
+
+async def category_detail(request, slug):
+    """Kategori detay sayfası"""
+    registry = await _get_category_registry()
+    category = registry.get(slug)
+    if category is None:
+        raise Http404("Kategori bulunamadı")
+
+    products, keyset = await _category_products(registry, category)
+    products_page = await _paginate(request, products, views.PRODUCTS_PER_PAGE, keyset)
+    return await _render_category_detail(request, category, products_page)
+
+
+async def product_list(request):
+    """Ürün listesi"""
+    # Katalog/arama indeksi worker'da kurulur, tam metin arka ucu ilk çağrıda veritabanını yoklar
+    products, keyset, category_filter, search_query = await _filter_products(request)
+    products_page = await _paginate(request, products, views.PRODUCTS_PER_PAGE, keyset)
+    return await _render_product_list(request, products_page, category_filter, search_query)
+
+
+async def search_suggestions(request):
+    """Arama önerileri AJAX - indeks thread'de alınır, önek araması bellekte"""
+    index = await sync_to_async(get_suggestion_index)()
+    response = HttpResponse(index.lookup(request.GET.get('q', '')), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=views.SUGGESTIONS_MAX_AGE)
+    return response
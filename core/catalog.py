@@ -0,0 +1,332 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from .text import normalize_key
+
+logger = logging.getLogger(__name__)
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+
+# ManifestStaticFilesStorage kopyası: <ad>.<12 haneli md5>.<uzantı>
+_HASHED_COPY = re.compile(r'^(.+)\.[0-9a-f]{12}(\.[^.]+)$')
+
+# Kategori slug'ı -> dosya adında aranacak anahtar kelimeler (sıra önemli: ilk eşleşen kazanır)
+CATEGORY_KEYWORDS = {
+    'eyer': ['araba', 'hamut', 'fayton', 'takimi'],
+    'kosum-takimi': ['gem', 'getir', 'kolon', 'uzengi', 'dizgin', 'baslik', 'yular', 'martingal', 'gogusluk', 'araka', 'pert', 'tokatli', 'lastikli', 'ithal', 'yerli', 'dortlu', 'uclu', 'zincirli', 'capraz', 'v_alinsalik', 'burunsalik', 'metal_islemeli', 'rugan', 'zincir_islemeli'],
+    'timar': ['firca', 'kil', 'tarak', 'gebre', 'kasagi', 'maya', 'bicagi', 'temizleme', 'tuy', 'toplayici', 'plastik_firca', 'kil_firca', 'fircali', 'ahsap', 'plastik_kasagi'],
+    'bakim': ['bandaj', 'yele', 'blanket', 'ter', 'maskesi', 'absorbine', 'red_cell', 'elite', 'electroltyle', 'animalintex', 'cool_cast', 'powerflex', 'polar', 'at_maskesi', 'tam_boy', 'yarim_boy', 'ter_ve_su'],
+    'nalbant': ['nal', 'civi', 'cekm', 'pensesi', 'kerpeten', 'dovme', 'nalbant', 'acik_nal', 'kapali_nal'],
+    'binici': ['eyer', 'eldiven', 'togu', 'yelegi', 'chaps', 'mahmuz', 'binici', 'suvari', 'western', 'avrupa', 'alman', 'endurance', 'pony', 'konfor', 'idman', 'yaprak', 'pelus', 'uzengi_kayisi', 'krom_uzengi', 'plastik_uzengi', 'kazan_uzengi']
+}
+
+# Hiçbir anahtar kelimeye uymayan dosyaların düştüğü kategori
+FALLBACK_CATEGORY = 'diger'
+
+# sync_catalog_products komutunun görselleri kopyaladığı media alt klasörü
+CATALOG_MEDIA_DIR = 'products/catalog'
+
+
+def get_products_dir():
+    """Ürün görsellerinin bulunduğu dizin"""
+    static_root = getattr(settings, 'STATIC_ROOT', None)
+    if static_root:
+        return os.path.join(static_root, 'images', 'New folder')
+    return os.path.join(settings.BASE_DIR, 'static', 'images', 'New folder')
+
+
+class KeywordClassifier:
+    """Anahtar kelime tablosundan bir kez derlenen dosya -> kategori sınıflandırıcı.
+
+    Her kategori için tek bir alternation regex kurulur; dosya adı bir kez
+    küçük harfe çevrilir ve kategoriler tablo sırasıyla denenir (ilk eşleşen
+    kazanır). Hiçbir kategoriye uymayan dosyalar fallback kategorisine düşer.
+    """
+
+    def __init__(self, category_keywords, fallback=FALLBACK_CATEGORY):
+        self.categories = list(category_keywords)
+        self.fallback = fallback
+        self._searchers = []
+        for cat_slug, keywords in category_keywords.items():
+            keywords = _prune_keywords(keywords)
+            if not keywords:
+                continue
+            pattern = re.compile('|'.join(re.escape(k) for k in keywords))
+            self._searchers.append((cat_slug, pattern.search))
+
+    def classify(self, file_name):
+        """Tek bir dosyanın kategori slug'ı"""
+        name = file_name.lower()
+        for cat_slug, search in self._searchers:
+            if search(name):
+                return cat_slug
+        return self.fallback
+
+    def group(self, files):
+        """Dosyaları kategori sırasını koruyarak sıralı gruplara ayır"""
+        buckets = {cat_slug: [] for cat_slug in self.categories}
+        buckets[self.fallback] = []
+        classify = self.classify
+        for file in files:
+            buckets[classify(file)].append(file)
+        for cat_files in buckets.values():
+            cat_files.sort()
+        if not buckets[self.fallback]:
+            del buckets[self.fallback]
+        return buckets
+
+
+def _prune_keywords(keywords):
+    """Aynı kategorideki daha kısa bir kelimeyi zaten içeren kelimeleri at
+
+    Örn. 'kil' varken 'kil_firca' hiçbir zaman sonucu değiştirmez.
+    """
+    lowered = sorted({k.lower() for k in keywords if k}, key=len)
+    kept = []
+    for keyword in lowered:
+        if not any(short in keyword for short in kept):
+            kept.append(keyword)
+    return kept
+
+
+_classifier = KeywordClassifier(CATEGORY_KEYWORDS)
+
+
+def classify_files(all_files):
+    """Dosyaları anahtar kelimelere göre kategorilere ayır"""
+    return _classifier.group(all_files)
+
+
+# Katalogdaki tek bir görselin kaydı (manifest satırı ile aynı sırada)
+CatalogEntry = namedtuple('CatalogEntry', ['name', 'category', 'display_name', 'slug', 'key', 'size', 'hash'])
+
+MANIFEST_FORMAT = 2
+
+
+def make_entry(file_name, category, size=None, content_hash=None):
+    """Dosya adından katalog kaydı oluştur"""
+    display_name = display_name_for(file_name)
+    return CatalogEntry(
+        file_name, category, display_name, slugify(display_name), normalize_key(display_name), size, content_hash
+    )
+
+
+def display_name_for(file_name):
+    """Dosya adından uzantısız görünen ad"""
+    return file_name.rsplit('.', 1)[0] if '.' in file_name else file_name
+
+
+def image_key_for(file_name):
+    """Dosya adının Product.image_key ile eşleşen anahtarı"""
+    return normalize_key(display_name_for(file_name))
+
+
+class CatalogIndex:
+    """Ürün görsel kataloğunun bellek içi indeksi.
+
+    Worker başına bir kez kurulur; dosya kayıtları, kategori grupları,
+    sıralı dosya listesi ve dosya -> kategori haritasını tutar.
+    İçerideki listeler paylaşılır, çağıranlar bunları değiştirmemelidir.
+    """
+
+    def __init__(self, entries, source=None, version=None):
+        self.source = source
+        self.version = version
+        self.entries = {entry.name: entry for entry in entries}
+
+        category_products = {cat_slug: [] for cat_slug in CATEGORY_KEYWORDS}
+        for entry in entries:
+            category_products.setdefault(entry.category, []).append(entry.name)
+        for cat_files in category_products.values():
+            cat_files.sort()
+        self.category_products = category_products
+
+        self.sorted_files = sorted(self.entries)
+        self.file_category = {entry.name: entry.category for entry in entries}
+
+    @classmethod
+    def from_files(cls, files, source=None, version=None):
+        """Dosya adlarını sınıflandırarak indeksi kur"""
+        classify = _classifier.classify
+        return cls([make_entry(f, classify(f)) for f in files], source=source, version=version)
+
+    @classmethod
+    def from_directory(cls, products_dir, version=None):
+        """Dizini bir kez tarayarak indeksi kur"""
+        return cls.from_files(list_image_files(products_dir), source=products_dir, version=version)
+
+    @classmethod
+    def from_manifest(cls, manifest_path, version=None):
+        """Build sırasında üretilen manifest dosyasından indeksi kur"""
+        return cls(load_manifest(manifest_path), source=manifest_path, version=version)
+
+    def __contains__(self, file_name):
+        return file_name in self.file_category
+
+    def __len__(self):
+        return len(self.sorted_files)
+
+    def get_category(self, file_name):
+        """Dosyanın kategori slug'ı (yoksa None)"""
+        return self.file_category.get(file_name)
+
+    def get_entry(self, file_name):
+        """Dosyanın katalog kaydı (yoksa None)"""
+        return self.entries.get(file_name)
+
+
+def list_image_files(products_dir):
+    """Dizindeki görsel dosyalarının adları
+
+    Manifestli static depolamanın collectstatic sırasında yazdığı içerik özetli
+    kopyalar (ad.<12 hane>.uzantı) ayrı ürün sayılmaz.
+    """
+    if not os.path.isdir(products_dir):
+        return []
+    names = {f for f in os.listdir(products_dir) if f.lower().endswith(IMAGE_EXTENSIONS)}
+    return [
+        f for f in names
+        if not ((match := _HASHED_COPY.match(f)) and match.group(1) + match.group(2) in names)
+    ]
+
+
+def file_hash(path):
+    """Dosya içeriğinin kısa md5 özeti (ManifestStaticFilesStorage ile aynı uzunlukta)"""
+    digest = hashlib.md5(usedforsecurity=False)
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def use_db_catalog():
+    """Listeleme sayfaları Product tablosundan mı beslensin (CATALOG_BACKEND='db')"""
+    return getattr(settings, 'CATALOG_BACKEND', 'static') == 'db'
+
+
+def catalog_file_for_image(image_name):
+    """sync_catalog_products ile oluşturulmuş main_image adından katalog dosya adını çıkar"""
+    prefix = CATALOG_MEDIA_DIR + '/'
+    if image_name and image_name.startswith(prefix):
+        return image_name[len(prefix):]
+    return None
+
+
+def get_manifest_path():
+    """Katalog manifest dosyasının yolu"""
+    return str(getattr(settings, 'CATALOG_MANIFEST_PATH', '') or '')
+
+
+def scan_directory(products_dir):
+    """Dizini tarayıp boyut ve içerik özetiyle birlikte tüm kayıtları üret"""
+    classify = _classifier.classify
+    entries = []
+    for file_name in sorted(list_image_files(products_dir)):
+        path = os.path.join(products_dir, file_name)
+        entries.append(make_entry(file_name, classify(file_name), os.path.getsize(path), file_hash(path)))
+    return entries
+
+
+def write_manifest(entries, manifest_path):
+    """Kayıtları kompakt JSON manifest olarak yaz (worker'lar yarım dosya görmesin diye atomik)"""
+    data = {
+        'format': MANIFEST_FORMAT,
+        'fields': list(CatalogEntry._fields),
+        'files': [list(entry) for entry in entries],
+    }
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_manifest(manifest_path):
+    """Manifest dosyasını okuyup kayıtları döndür"""
+    with open(manifest_path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    if data.get('format') != MANIFEST_FORMAT or data.get('fields') != list(CatalogEntry._fields):
+        raise ValueError(f'Desteklenmeyen katalog manifest formatı: {manifest_path}')
+    return [CatalogEntry(*row) for row in data['files']]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_catalog_stamp = 0
+
+
+def _path_version(path):
+    """Yolun sürüm damgası - dosya eklenip silindiğinde dizin mtime'ı, manifest yazıldığında dosya mtime'ı değişir"""
+    try:
+        return (os.stat(path).st_mtime_ns, _catalog_stamp)
+    except OSError:
+        return (None, _catalog_stamp)
+
+
+def _current_source():
+    """İndeksin kaynağı: manifest varsa manifest, yoksa ürün dizini"""
+    manifest_path = get_manifest_path()
+    if manifest_path:
+        version = _path_version(manifest_path)
+        if version[0] is not None:
+            return manifest_path, version, True
+    products_dir = get_products_dir()
+    return products_dir, _path_version(products_dir), False
+
+
+def _build_catalog(source, version, is_manifest):
+    if is_manifest:
+        try:
+            return CatalogIndex.from_manifest(source, version=version)
+        except (OSError, ValueError, TypeError) as exc:
+            # Bozuk manifest: dizini tara ama aynı manifest için tekrar denemeyelim
+            logger.warning('Katalog manifesti okunamadı, dizin taranacak: %s', exc)
+            catalog = CatalogIndex.from_directory(get_products_dir())
+            catalog.source, catalog.version = source, version
+            return catalog
+    return CatalogIndex.from_directory(source, version=version)
+
+
+def get_catalog():
+    """Worker'ın katalog indeksini döndür, kaynak değiştiyse yeniden kur
+
+    Build sırasında üretilen manifest varsa dosya sistemi taranmaz; yalnızca
+    manifest dosyasının mtime'ı kontrol edilir.
+    """
+    global _catalog
+
+    source, version, is_manifest = _current_source()
+
+    catalog = _catalog
+    if catalog is not None and catalog.source == source and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        catalog = _catalog
+        if catalog is None or catalog.source != source or catalog.version != version:
+            catalog = _build_catalog(source, version, is_manifest)
+            _catalog = catalog
+    return catalog
+
+
+def invalidate_catalog():
+    """Sürüm damgasını artırarak bir sonraki istekte indeksin yeniden kurulmasını sağla"""
+    global _catalog_stamp
+    with _catalog_lock:
+        _catalog_stamp += 1
@@ -0,0 +1,153 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+
+# Kategori adı -> CSS class, fallback görsel dosyası ve katalog klasör slug'ı
+CATEGORY_MAPPING = {
+    'At Koşu Ekipmanları': {
+        'css_class': 'cat--racing',
+        'image': 'kosum-takimi.jpg',
+        'slug_map': 'kosum-takimi'
+    },
+    'Tımar Ekipmanları': {
+        'css_class': 'cat--grooming',
+        'image': 'timar.jpg',
+        'slug_map': 'timar'
+    },
+    'At Bakım Ekipmanları': {
+        'css_class': 'cat--care',
+        'image': 'bakim.jpg',
+        'slug_map': 'bakim'
+    },
+    'Nalbant Ekipmanları': {
+        'css_class': 'cat--farrier',
+        'image': 'nalbant.jpg',
+        'slug_map': 'nalbant'
+    },
+    'Binici Ekipmanları': {
+        'css_class': 'cat--rider',
+        'image': 'binici.jpg',
+        'slug_map': 'binici'
+    },
+    'Araba ve Fayton Takımı': {
+        'css_class': 'cat--carriage',
+        'image': 'eyer.jpg',
+        'slug_map': 'eyer'
+    }
+}
+
+# Veritabanında bulunmayan (eski) kategori slug'larının katalog klasör slug'ları
+LEGACY_SLUG_MAP = {
+    'at-kosu-ekipmanlari': 'kosum-takimi',
+    'timar-ekipmanlari': 'timar',
+    'at-bakim-ekipmanlari': 'bakim',
+    'nalbant-ekipmanlari': 'nalbant',
+    'binici-ekipmanlari': 'binici',
+    'araba-ve-fayton-takimi': 'eyer',
+}
+
+# Menüde ve ana sayfada gösterilen kategori sayısı
+TOP_CATEGORY_COUNT = 6
+
+
+def _mapping_for(category):
+    mapping = dict(CATEGORY_MAPPING.get(category.name, {
+        'css_class': 'cat--racing',
+        'image': 'kosum-takimi.jpg',
+        'slug_map': category.slug,
+    }))
+    # Kategori modelinde görsel varsa şablon category.image.url kullanır
+    if category.image:
+        mapping['image'] = None
+        mapping['use_media_image'] = True
+    else:
+        mapping['use_media_image'] = False
+    return mapping
+
+
+class CategoryRegistry:
+    """Aktif kategoriler ve görünüm eşlemeleri (worker başına bir kez yüklenir)
+
+    ``active`` sort_order/isim sırasıyla, ``by_name`` isim sırasıyla tüm aktif
+    kategorileri; ``with_mapping`` menü/ana sayfa için ilk TOP_CATEGORY_COUNT
+    kategoriyi CSS/görsel/katalog eşlemesiyle birlikte tutar.
+    """
+
+    def __init__(self, categories):
+        self.active = list(categories)
+        self.by_name = sorted(self.active, key=lambda category: category.name)
+        self.by_slug = {category.slug: category for category in self.active}
+        self.mappings = {category.pk: _mapping_for(category) for category in self.active}
+        self.top = self.active[:TOP_CATEGORY_COUNT]
+        self.with_mapping = [
+            {'category': category, 'mapping': self.mappings[category.pk]}
+            for category in self.top
+        ]
+
+    def get(self, slug):
+        """Slug ile aktif kategori (yoksa None)"""
+        return self.by_slug.get(slug)
+
+    def catalog_slug(self, category):
+        """Kategorinin ürün görsellerinin bulunduğu katalog klasör slug'ı"""
+        return self.mappings[category.pk]['slug_map'] if category.pk in self.mappings else category.slug
+
+    def resolve_catalog_slug(self, slug):
+        """URL'deki kategori slug'ını katalog klasör slug'ına çevir (ürün listesi filtresi)"""
+        category = self.by_slug.get(slug)
+        if category is not None:
+            mapping = CATEGORY_MAPPING.get(category.name)
+            return mapping['slug_map'] if mapping else None
+        return LEGACY_SLUG_MAP.get(slug, slug)
+
+
+def _load_categories():
+    from .models import Category
+    return Category.objects.filter(is_active=True).order_by('sort_order', 'name')
+
+
+def _categories_version():
+    from .models import Category
+    stats = Category.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    return (stats['count'], stats['latest'])
+
+
+_registry = None
+_registry_lock = threading.Lock()
+_registry_stamp = None
+_checked_at = 0.0
+
+
+def get_category_registry():
+    """Worker'ın kategori kaydını döndür
+
+    Category kaydedilince/silinince sinyallerle sıfırlanır; diğer
+    worker'lardaki değişiklikler en fazla CACHE_CHECK_SECONDS
+    saniyede bir tek aggregate sorgusuyla kontrol edilir.
+    """
+    global _registry, _registry_stamp, _checked_at
+
+    check_interval = getattr(settings, 'CACHE_CHECK_SECONDS', 30)
+    now = time.monotonic()
+
+    registry = _registry
+    if registry is not None and now - _checked_at < check_interval:
+        return registry
+
+    with _registry_lock:
+        stamp = _categories_version()
+        _checked_at = now
+        if _registry is None or stamp != _registry_stamp:
+            _registry = CategoryRegistry(_load_categories())
+            _registry_stamp = stamp
+        return _registry
+
+
+def invalidate_categories():
+    """post_save/post_delete: bir sonraki istekte kategorileri yeniden yükle"""
+    global _registry
+    with _registry_lock:
+        _registry = None
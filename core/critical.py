@@ -0,0 +1,575 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+
+logger = logging.getLogger(__name__)
+
+# Tüm sayfaların kullandığı tek stil dosyası (static yolu)
+STYLESHEET = 'css/style.css'
+
+# Sayfanın ilk ekranda görünen kısmı: içerik bloğunun ilk kaç üst düzey öğesi
+# (breadcrumb/başlık + ilk bölüm + ilk ızgara satırları mobil ve masaüstünde ilk ekranı doldurur)
+ABOVE_THE_FOLD_BLOCKS = 3
+
+# Satır içi kritik CSS için varsayılan üst sınır (bayt; ilk TCP gidiş-dönüşüne sığacak kadar)
+DEFAULT_MAX_BYTES = 14 * 1024
+
+CRITICAL_MANIFEST_FORMAT = 2
+
+# Sayfa yüklenirken uygulanmayan, kullanıcı etkileşimine bağlı durumlar
+_STATEFUL_PSEUDO = re.compile(r':(?:hover|focus|focus-visible|focus-within|active|visited)(?![\w-])')
+_FUNCTIONAL_PSEUDO = re.compile(r':(?:not|is|where|has)\([^()]*\)')
+# Tek basit seçicili :not() (örn. :not(#vitrin)) öğe bazında değerlendirilir; '!' ile işaretlenir
+_SIMPLE_NOT = re.compile(r':not\(\s*([.#]?[a-zA-Z][\w-]*)\s*\)')
+_NEGATION = re.compile(r'!([.#]?)([\w-]+)')
+_ATTRIBUTE = re.compile(r'\[[^\]]*\]')
+_COMBINATOR_SPLIT = re.compile(r'\s*([>+~])\s*|\s+')
+_TYPE = re.compile(r'^(?:[a-zA-Z][\w-]*|\*)')
+_CLASS = re.compile(r'\.([\w-]+)')
+_ID = re.compile(r'#([\w-]+)')
+_ANIMATION = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+_TEMPLATE_COMMENT = re.compile(r'{%\s*comment\s*%}.*?{%\s*endcomment\s*%}|{#.*?#}', re.S)
+_TEMPLATE_TAG = re.compile(r'{%.*?%}|{{.*?}}', re.S)
+_BLOCK_TAG = re.compile(r'{%\s*(block\s+[\w-]+|endblock)(?:\s+[\w-]+)?\s*%}')
+_EXTENDS = re.compile(r'{%\s*extends\s+["\']([^"\']+)["\']\s*%}')
+
+# @media/@supports gibi içinde kural barındıran at-kuralları
+_NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+CssNode = namedtuple('CssNode', 'prelude body children')
+
+
+def parse_css(text):
+    """Stil dosyasını kural ağacına çevir
+
+    Her düğüm (prelude, body, children): sıradan kurallarda body bildirimlerdir,
+    @media gibi kapsayıcılarda children iç düğümlerdir; @import gibi tek satırlık
+    at-kurallarında ikisi de None'dır.
+    """
+    nodes, _ = _parse_block(_COMMENT.sub('', text), 0)
+    return nodes
+
+
+def _skip_string(text, pos):
+    quote = text[pos]
+    pos += 1
+    while pos < len(text) and text[pos] != quote:
+        pos += 2 if text[pos] == '\\' else 1
+    return pos
+
+
+def _parse_block(text, pos):
+    nodes = []
+    start = pos
+    while pos < len(text):
+        char = text[pos]
+        if char in '"\'':
+            pos = _skip_string(text, pos)
+        elif char == ';':
+            prelude = text[start:pos].strip()
+            if prelude:
+                nodes.append(CssNode(prelude, None, None))
+            start = pos + 1
+        elif char == '{':
+            prelude = text[start:pos].strip()
+            if prelude.split(None, 1)[0].lower() in _NESTED_AT_RULES:
+                children, pos = _parse_block(text, pos + 1)
+                nodes.append(CssNode(prelude, None, children))
+            else:
+                end = pos + 1
+                depth = 1
+                while end < len(text):
+                    if text[end] in '"\'':
+                        end = _skip_string(text, end)
+                    elif text[end] == '{':
+                        depth += 1
+                    elif text[end] == '}':
+                        depth -= 1
+                        if not depth:
+                            break
+                    end += 1
+                nodes.append(CssNode(prelude, text[pos + 1:end], None))
+                pos = end
+            start = pos + 1
+        elif char == '}':
+            return nodes, pos
+        pos += 1
+    return nodes, pos
+
+
+def split_selectors(prelude):
+    """Seçici listesini parantez içindeki virgüllere dokunmadan ayır"""
+    parts, depth, start = [], 0, 0
+    for pos, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            parts.append(prelude[start:pos])
+            start = pos + 1
+    parts.append(prelude[start:])
+    return [' '.join(part.split()) for part in parts if part.strip()]
+
+
+def _compact(declarations):
+    parts = []
+    for declaration in declarations.split(';'):
+        name, _, value = declaration.partition(':')
+        if value.strip():
+            parts.append(f'{name.strip()}:{" ".join(value.split())}')
+    return ';'.join(parts)
+
+
+class _Element:
+    """İşaretlemedeki bir öğe: etiket, bilinen sınıf/id'ler ve ağaçtaki yeri"""
+
+    __slots__ = ('tag', 'classes', 'class_prefixes', 'unknown_class', 'id', 'parent', 'children')
+
+    def __init__(self, tag, parent):
+        self.tag = tag
+        self.classes = set()
+        # Sınıfı şablon değişkeniyle tamamlanan öğeler için BEM değiştirici önekleri (örn. 'cat--')
+        self.class_prefixes = set()
+        # Tamamı şablon değişkeni olan bir sınıf değeri (class="{{ x }}")
+        self.unknown_class = False
+        self.id = None
+        self.parent = parent
+        self.children = []
+        if parent is not None:
+            parent.children.append(self)
+
+
+class PageUsage:
+    """Sayfanın ilk ekranında geçen öğeler (ağaç halinde) ve etiket, sınıf, id kümeleri"""
+
+    def __init__(self):
+        self.tags = {'html', 'body'}
+        self.classes = set()
+        self.ids = set()
+        self.class_prefixes = set()
+        self.elements = []
+
+    def add(self, element):
+        self.elements.append(element)
+        self.tags.add(element.tag)
+        self.classes |= element.classes
+        self.class_prefixes |= element.class_prefixes
+        if element.id:
+            self.ids.add(element.id)
+
+    def has_class(self, name):
+        return name in self.classes or name.startswith(tuple(self.class_prefixes))
+
+    def matches(self, selector):
+        """Seçici ilk ekrandaki öğelerden birine (ataları da uyarak) uyabiliyorsa True
+
+        Her bileşik seçici gerçek bir öğeye, alt/çocuk birleştiricileri o öğenin
+        atalarına uymalıdır; bir sınıfın sayfada herhangi bir yerde geçmesi
+        yetmez. Basit :not(.x) olumsuzlamaları uygulanır; özellik seçicileri,
+        :is()/:has() gibi ifadeler ve kardeş sırası yok sayılır (fazladan kural
+        almak, eksik almaktan iyidir); :hover gibi
+        etkileşim durumları ilk boyamada gerekmediği için alınmaz.
+        """
+        if _STATEFUL_PSEUDO.search(selector):
+            return False
+        selector = _ATTRIBUTE.sub('', _FUNCTIONAL_PSEUDO.sub('', _SIMPLE_NOT.sub(r'!\1', selector)))
+        parts = _COMBINATOR_SPLIT.split(selector.strip())
+        compounds = [_Compound(part.split(':', 1)[0]) for part in parts[::2]]
+        combinators = [(combinator or ' ').strip() or ' ' for combinator in parts[1::2]]
+        # Hızlı ön eleme: sayfada hiç geçmeyen etiket/sınıf/id
+        for compound in compounds:
+            if compound.tag and compound.tag not in self.tags:
+                return False
+            if not all(self.has_class(name) for name in compound.classes):
+                return False
+            if not all(name in self.ids for name in compound.ids):
+                return False
+        last = len(compounds) - 1
+        return any(self._matches_at(element, compounds, combinators, last) for element in self._candidates())
+
+    def _candidates(self):
+        # html/body şablonda yoksa da (kök öğeler) seçicilerin kökü sayılır
+        return self.elements or [_Element('html', None)]
+
+    def _element_has_class(self, element, name):
+        if name in element.classes or name.startswith(tuple(element.class_prefixes)):
+            return True
+        return element.unknown_class and self.has_class(name)
+
+    def _compound_matches(self, element, compound):
+        if compound.tag and element.tag != compound.tag:
+            return False
+        if compound.ids and compound.ids != {element.id}:
+            return False
+        if element.tag in compound.not_tags or element.id in compound.not_ids:
+            return False
+        if not compound.not_classes.isdisjoint(element.classes):
+            return False
+        return all(self._element_has_class(element, name) for name in compound.classes)
+
+    def _matches_at(self, element, compounds, combinators, index):
+        if not self._compound_matches(element, compounds[index]):
+            return False
+        if index == 0:
+            return True
+        combinator = combinators[index - 1]
+        if combinator == '>':
+            return element.parent is not None and self._matches_at(element.parent, compounds, combinators, index - 1)
+        if combinator in '+~':
+            siblings = element.parent.children if element.parent is not None else []
+            return any(
+                self._matches_at(sibling, compounds, combinators, index - 1)
+                for sibling in siblings if sibling is not element
+            )
+        ancestor = element.parent
+        while ancestor is not None:
+            if self._matches_at(ancestor, compounds, combinators, index - 1):
+                return True
+            ancestor = ancestor.parent
+        return False
+
+
+class _Compound:
+    """Bileşik seçicinin (örn. 'div.kart#ilk') etiket, sınıf ve id'leri"""
+
+    __slots__ = ('tag', 'classes', 'ids', 'not_tags', 'not_classes', 'not_ids')
+
+    def __init__(self, text):
+        negations = {'': set(), '.': set(), '#': set()}
+        for prefix, name in _NEGATION.findall(text):
+            negations[prefix].add(name.lower() if not prefix else name)
+        self.not_tags, self.not_classes, self.not_ids = negations[''], negations['.'], negations['#']
+        text = _NEGATION.sub('', text)
+        tag = _TYPE.match(text)
+        self.tag = tag.group().lower() if tag and tag.group() != '*' else None
+        self.classes = _CLASS.findall(text)
+        self.ids = set(_ID.findall(text))
+
+
+class _UsageParser(HTMLParser):
+    """Şablon işaretlemesindeki öğeleri PageUsage'a ekler
+
+    blocks verilirse yalnızca ilk blocks üst düzey öğe okunur; içerik tek bir
+    sarmalayıcıdaysa (<main>, .container) sarmalayıcının çocukları sayılır.
+    parents, içeriği saran (ana şablonda açık kalan) öğelerdir. Şablon
+    ifadeleri (\x00) bilinmeyen değer olarak atlanır.
+    """
+
+    VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+                     'track', 'wbr'}
+
+    def __init__(self, usage, blocks=None, parents=()):
+        super().__init__(convert_charrefs=True)
+        self.usage = usage
+        self.blocks = blocks
+        self.stack = list(parents)
+        self.base_depth = len(self.stack)
+        self.count_depth = None
+        self.top_level = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.blocks is not None:
+            if self.count_depth is None:
+                wrapper = tag == 'main' or 'container' in (dict(attrs).get('class') or '').split()
+                self.count_depth = 1 if wrapper else 0
+            if len(self.stack) - self.base_depth == self.count_depth:
+                self.top_level += 1
+            if self.top_level > self.blocks:
+                return
+        element = _Element(tag, self.stack[-1] if self.stack else None)
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == 'class':
+                self._add_classes(element, value)
+            elif name == 'id' and '\x00' not in value:
+                element.id = value.strip()
+        self.usage.add(element)
+        if tag not in self.VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_ELEMENTS and len(self.stack) > self.base_depth and self.stack[-1].tag == tag:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if any(element.tag == tag for element in self.stack[self.base_depth:]):
+            while self.stack.pop().tag != tag:
+                pass
+
+    @staticmethod
+    def _add_classes(element, value):
+        dynamic = '\x00' in value
+        for name in value.split():
+            if '\x00' in name:
+                if name == '\x00':
+                    element.unknown_class = True
+                continue
+            element.classes.add(name)
+            if dynamic and '--' not in name:
+                element.class_prefixes.add(f'{name}--')
+
+
+def get_templates_dir():
+    return Path(apps.get_app_config('core').path) / 'templates' / 'core'
+
+
+def get_stylesheet_path():
+    return finders.find(STYLESHEET) or ''
+
+
+def get_manifest_path():
+    return str(getattr(settings, 'CRITICAL_CSS_PATH', '') or '')
+
+
+def get_max_bytes():
+    return int(getattr(settings, 'CRITICAL_CSS_MAX_BYTES', DEFAULT_MAX_BYTES))
+
+
+def template_sources():
+    """'core/<ad>.html' -> kaynak (core/templates/core/ içindeki tüm şablonlar)"""
+    return {
+        f'core/{path.name}': path.read_text(encoding='utf-8')
+        for path in sorted(get_templates_dir().glob('*.html'))
+    }
+
+
+def sources_stamp(css, sources):
+    """Stil dosyası ve şablonların içerik özeti; biri değişince kritik CSS eskimiş olur"""
+    digest = hashlib.md5(usedforsecurity=False)
+    digest.update(f'{CRITICAL_MANIFEST_FORMAT}:{ABOVE_THE_FOLD_BLOCKS}:{get_max_bytes()}\n'.encode('ascii'))
+    digest.update(css.encode('utf-8'))
+    for name, source in sorted(sources.items()):
+        digest.update(f'\n{name}\n'.encode('utf-8'))
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _markup(source):
+    """Şablon kaynağını HTML ayrıştırıcıya hazırla: {{ }} -> \\x00 (bilinmeyen değer), {% %} silinir"""
+    source = _TEMPLATE_COMMENT.sub('', source)
+    return _TEMPLATE_TAG.sub(lambda match: '\x00' if match.group().startswith('{{') else ' ', source)
+
+
+def _block_bounds(source, name):
+    """{% block name %} içeriğinin (başlangıç, bitiş) konumu; blok yoksa None"""
+    start = None
+    depth = 0
+    for match in _BLOCK_TAG.finditer(source):
+        if match.group(1).startswith('block'):
+            if start is not None:
+                depth += 1
+            elif match.group(1).split()[1] == name:
+                start = match.end()
+        elif start is not None:
+            if not depth:
+                return start, match.start()
+            depth -= 1
+    return None
+
+
+def page_usage(name, sources, blocks=ABOVE_THE_FOLD_BLOCKS):
+    """Sayfanın ilk ekranında kullanılan seçiciler
+
+    Ana şablonun içerik bloğundan önceki kısmı (header, kategori menüsü) tamamen,
+    sayfanın içerik bloğundan ilk ``blocks`` üst düzey öğe okunur.
+    Betiklerin sonradan eklediği durum sınıfları (menü açık, slayt geçişi) tam
+    stil dosyası yüklendikten sonra devreye girdiği için alınmaz.
+    """
+    usage = PageUsage()
+    parents = ()
+    source = sources[name]
+    parent = _EXTENDS.search(source)
+    if parent and parent.group(1) in sources:
+        base = sources[parent.group(1)]
+        bounds = _block_bounds(base, 'content')
+        head = base[:bounds[0]] if bounds else base
+        parser = _UsageParser(usage)
+        parser.feed(_markup(head))
+        parser.close()
+        parents = parser.stack
+
+    bounds = _block_bounds(source, 'content')
+    if bounds:
+        parser = _UsageParser(usage, blocks, parents)
+        parser.feed(_markup(source[bounds[0]:bounds[1]]))
+        parser.close()
+    return usage
+
+
+def _select(nodes, usage, animations):
+    rules = []
+    for node in nodes:
+        prelude = ' '.join(node.prelude.split())
+        if node.children is not None:
+            inner = _select(node.children, usage, animations)
+            if inner:
+                rules.append(f'{prelude}{{{"".join(inner)}}}')
+        elif node.body is None:
+            rules.append(f'{prelude};')
+        elif prelude.startswith('@'):
+            keyword, _, name = prelude.partition(' ')
+            if keyword.lower().endswith('keyframes'):
+                if name in animations:
+                    rules.append(f'{prelude}{{{" ".join(node.body.split())}}}')
+            elif keyword.lower() == '@font-face':
+                rules.append(f'{prelude}{{{_compact(node.body)}}}')
+        else:
+            selectors = [selector for selector in split_selectors(node.prelude) if usage.matches(selector)]
+            declarations = _compact(node.body)
+            if selectors and declarations:
+                rules.append(f'{",".join(selectors)}{{{declarations}}}')
+    return rules
+
+
+def critical_css(nodes, usage):
+    """Kural ağacından sayfanın ilk ekranda ihtiyaç duyduğu kurallar (küçültülmüş CSS)
+
+    Kurallar stil dosyasındaki sırasıyla alınır (öncelik aynı kalır); seçici
+    listelerinden yalnızca uyan seçiciler kalır, @media blokları içlerinde kural
+    kaldıysa korunur, @keyframes yalnızca alınan kurallarda kullanılıyorsa eklenir.
+    """
+    rules = _select(nodes, usage, ())
+    animations = {
+        name for rule in rules for match in _ANIMATION.finditer(rule)
+        for name in re.findall(r'[\w-]+', match.group(1))
+    }
+    if animations:
+        rules = _select(nodes, usage, animations)
+    return ''.join(rules)
+
+
+def page_critical_css(nodes, name, sources, max_bytes):
+    """Sayfanın ``max_bytes`` sınırına sığan kritik CSS'i
+
+    Sığmazsa ilk ekran blok sayısı azaltılır; tek blokla da sığmıyorsa uyarı
+    yazılır ve '' döner: sayfa tam stil dosyasını normal <link> ile yükler
+    (ilk ekranın büyük kısmını satır içi taşımak kritik CSS'in amacını bozar).
+    """
+    for blocks in range(ABOVE_THE_FOLD_BLOCKS, 0, -1):
+        css = critical_css(nodes, page_usage(name, sources, blocks))
+        if len(css.encode('utf-8')) <= max_bytes:
+            return css
+    logger.warning(
+        '%s: kritik CSS %.1f KB, sınır %.1f KB; sayfa tam stil dosyasıyla yüklenecek.',
+        name, len(css.encode('utf-8')) / 1024, max_bytes / 1024,
+    )
+    return ''
+
+
+def build_pages(css, sources, max_bytes=None):
+    """Ana şablonu genişleten her şablon için kritik CSS: {şablon adı: css}"""
+    nodes = parse_css(css)
+    max_bytes = get_max_bytes() if max_bytes is None else max_bytes
+    return {
+        name: page_critical_css(nodes, name, sources, max_bytes)
+        for name, source in sources.items() if _EXTENDS.search(source)
+    }
+
+
+def write_critical_manifest(pages, stamp, manifest_path):
+    """Kritik CSS manifestini atomik olarak yaz"""
+    data = {'format': CRITICAL_MANIFEST_FORMAT, 'stamp': stamp, 'pages': pages}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_critical_manifest(manifest_path):
+    """(özet, sayfalar); dosya yoksa ya da biçimi eskiyse (None, {})"""
+    try:
+        with open(manifest_path, encoding='utf-8') as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None, {}
+    if data.get('format') != CRITICAL_MANIFEST_FORMAT:
+        return None, {}
+    return data.get('stamp'), data.get('pages', {})
+
+
+class _CriticalState:
+    def __init__(self, pages, signature, checked_at):
+        self.pages = pages
+        self.signature = signature
+        self.checked_at = checked_at
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def _files_signature(css_path):
+    """Stil dosyası, şablonlar ve manifestin (yol, mtime, boyut) listesi"""
+    paths = [css_path, get_manifest_path(), *sorted(str(path) for path in get_templates_dir().glob('*.html'))]
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        signature.append((path, stat.st_mtime_ns, stat.st_size) if stat else (path, None, None))
+    return tuple(signature)
+
+
+def _load_pages(css_path):
+    if not css_path:
+        return {}
+    with open(css_path, encoding='utf-8') as fh:
+        css = fh.read()
+    sources = template_sources()
+    stamp = sources_stamp(css, sources)
+    manifest_stamp, pages = load_critical_manifest(get_manifest_path())
+    if manifest_stamp == stamp:
+        return pages
+    # build_critical_css çalışmamış ya da dosyalar sonradan değişmiş: bu worker'da hesapla
+    logger.info('Kritik CSS manifesti güncel değil; %s üzerinden yeniden hesaplanıyor.', css_path)
+    return build_pages(css, sources)
+
+
+def get_critical_css(template_name):
+    """Şablonun kritik CSS'i (yoksa '')
+
+    Stil dosyası ya da şablonlar değişince (en fazla CACHE_CHECK_SECONDS
+    içinde) manifest özeti tutmaz ve kritik CSS yeniden hesaplanır.
+    """
+    global _state
+
+    check_interval = getattr(settings, 'CACHE_CHECK_SECONDS', 30)
+    now = time.monotonic()
+    state = _state
+    if state is not None and now - state.checked_at < check_interval:
+        return state.pages.get(template_name, '')
+
+    with _state_lock:
+        state = _state
+        if state is None or now - state.checked_at >= check_interval:
+            css_path = get_stylesheet_path()
+            signature = _files_signature(css_path)
+            if state is not None and state.signature == signature:
+                state.checked_at = now
+            else:
+                state = _state = _CriticalState(_load_pages(css_path), signature, now)
+    return state.pages.get(template_name, '')
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from .placeholders import analyze
+
+
+logger = logging.getLogger(__name__)
+
+# Üretilen genişlikler (piksel); orijinalden büyük olanlar atlanır
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+
+# Biçim -> (Pillow biçimi, dosya uzantısı, MIME tipi, kayıt ayarları); tercih sırasıyla
+DERIVATIVE_FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif', {'quality': 55}),
+    'webp': ('WEBP', 'webp', 'image/webp', {'quality': 78, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+# Türevlerin yazıldığı klasörün STATIC_ROOT altındaki adı ve manifest dosyası
+DERIVATIVES_DIR = 'derivatives'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 2
+
+
+def available_formats():
+    """Kurulu Pillow'un yazabildiği türev biçimleri (AVIF eklenti/sürüm gerektirir)"""
+    Image.init()
+    return [name for name, (pil_format, *_) in DERIVATIVE_FORMATS.items() if pil_format in Image.SAVE]
+
+
+def get_derivatives_root():
+    """Türev görsellerin klasörü (IMAGE_DERIVATIVES_ROOT, varsayılan STATIC_ROOT/derivatives)"""
+    root = getattr(settings, 'IMAGE_DERIVATIVES_ROOT', None)
+    if root:
+        return str(root)
+    if settings.STATIC_ROOT:
+        return os.path.join(str(settings.STATIC_ROOT), DERIVATIVES_DIR)
+    return ''
+
+
+# Türev ve atlas dosya adları içerik özetini taşır (ad-<özet>-genişlik.uzantı, ad-<özet>.uzantı)
+FINGERPRINTED_NAME = re.compile(r'-[0-9a-f]{12}(?:-\d+)?\.\w+$')
+
+
+def is_derivative_file(full_path):
+    """Türev klasöründeki içerik özetli dosya mı (içerik değişince ad da değişir, süresiz önbelleklenebilir)"""
+    root = get_derivatives_root()
+    return bool(root) and full_path.startswith(os.path.join(root, '')) and bool(FINGERPRINTED_NAME.search(full_path))
+
+
+def get_derivatives_url():
+    return getattr(settings, 'IMAGE_DERIVATIVES_URL', None) or f'{settings.STATIC_URL}{DERIVATIVES_DIR}/'
+
+
+def derivative_name(key, content_hash, width, extension):
+    """İçerik özetli türev dosya adı (içerik değişince ad da değişir, süresiz önbelleklenebilir)"""
+    return f'{key}-{content_hash}-{width}.{extension}'
+
+
+def render_derivatives(job):
+    """Tek bir görselin tüm türevlerini üret (süreç havuzunda çalışır)
+
+    ``job`` = (kaynak yol, çıktı klasörü, anahtar, içerik özeti, biçimler).
+    Dönüş: {'width', 'height', 'placeholder', 'color', 'variants': {biçim: [[genişlik, dosya adı], ...]}}
+    ya da görsel okunamazsa None.
+    """
+    source_path, output_dir, key, content_hash, formats = job
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, ValueError) as exc:
+        logger.warning('Görsel okunamadı (%s): %s', source_path, exc)
+        return None
+
+    width, height = image.size
+    widths = [w for w in DERIVATIVE_WIDTHS if w < width] or [width]
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    placeholder, color = analyze(image)
+
+    variants = {name: [] for name in formats}
+    # Büyükten küçüğe küçült: her adım bir öncekinden yeniden örneklenir
+    current = image.convert('RGBA' if has_alpha else 'RGB')
+    for target in sorted(widths, reverse=True):
+        if target < current.width:
+            current = current.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+        for name in formats:
+            pil_format, extension, _, options = DERIVATIVE_FORMATS[name]
+            frame = current
+            if pil_format == 'JPEG' and frame.mode != 'RGB':
+                # JPEG saydamlık desteklemez; beyaz zemine yerleştir
+                background = Image.new('RGB', frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.getchannel('A'))
+                frame = background
+            file_name = derivative_name(key, content_hash, target, extension)
+            frame.save(os.path.join(output_dir, file_name), pil_format, **options)
+            variants[name].append([target, file_name])
+
+    for sizes in variants.values():
+        sizes.sort()
+    return {'width': width, 'height': height, 'placeholder': placeholder, 'color': color, 'variants': variants}
+
+
+def write_manifest(files, formats, manifest_path):
+    """Türev manifestini atomik olarak yaz"""
+    data = {'format': MANIFEST_FORMAT, 'formats': formats, 'files': files}
+    directory = os.path.dirname(manifest_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_manifest(manifest_path):
+    """Manifest dosyasını oku; yoksa ya da biçimi farklıysa boş sözlük"""
+    try:
+        with open(manifest_path, encoding='utf-8') as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != MANIFEST_FORMAT:
+        return {}
+    return data.get('files', {})
+
+
+class DerivativeIndex:
+    """Dosya adı -> türev listesi; şablon etiketleri srcset ve URL'leri buradan üretir"""
+
+    def __init__(self, files, base_url, version=None):
+        self.files = files
+        self.base_url = base_url
+        self.version = version
+
+    def __contains__(self, file_name):
+        return file_name in self.files
+
+    def variants(self, file_name, format_name):
+        record = self.files.get(file_name)
+        if record is None:
+            return []
+        return record['variants'].get(format_name, [])
+
+    def srcset(self, file_name, format_name):
+        """'url 320w, url 640w' biçiminde srcset değeri (türev yoksa boş)"""
+        return ', '.join(f'{self.base_url}{name} {width}w' for width, name in self.variants(file_name, format_name))
+
+    def url(self, file_name, format_name, width):
+        """İstenen genişliği karşılayan en küçük türevin URL'si (yoksa en büyüğü)"""
+        variants = self.variants(file_name, format_name)
+        if not variants:
+            return None
+        for variant_width, name in variants:
+            if variant_width >= width:
+                return self.base_url + name
+        return self.base_url + variants[-1][1]
+
+    def placeholder(self, file_name):
+        """(yer tutucu data URI, baskın renk) ya da yoksa (None, None)"""
+        record = self.files.get(file_name)
+        if record is None:
+            return None, None
+        return record.get('placeholder'), record.get('color')
+
+    def formats(self, file_name):
+        """Dosyanın türevi olan biçimler, tercih sırasıyla (avif > webp > jpeg)"""
+        record = self.files.get(file_name)
+        if record is None:
+            return []
+        return [name for name in DERIVATIVE_FORMATS if record['variants'].get(name)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_derivative_index():
+    """Worker'ın türev indeksini döndür (manifest dosyası değişince yeniden okunur)"""
+    global _index
+
+    root = get_derivatives_root()
+    manifest_path = os.path.join(root, MANIFEST_NAME) if root else ''
+    try:
+        version = os.stat(manifest_path).st_mtime_ns if manifest_path else None
+    except OSError:
+        version = None
+
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            files = load_manifest(manifest_path) if version is not None else {}
+            _index = DerivativeIndex(files, get_derivatives_url(), version)
+        return _index
@@ -0,0 +1,221 @@
+import logging
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .text import turkish_fold
+
+
+logger = logging.getLogger(__name__)
+
+# Model -> (alan, ağırlık) listesi; ilk alan başlık alanıdır (trigram benzerliği bunun üzerinden)
+SEARCH_FIELDS = {
+    'core.product': [('name', 'A'), ('short_description', 'B'), ('description', 'C')],
+    'core.blogpost': [('title', 'A'), ('excerpt', 'B'), ('content', 'C')],
+}
+
+# Postgres tsvector metin arama yapılandırması
+POSTGRES_CONFIG = 'turkish'
+
+# pg_trgm benzerlik eşiği (yazım hatalı aramalar için); her Postgres bağlantısında
+# pg_trgm.similarity_threshold olarak ayarlanır, indeksli % operatörü bunu kullanır
+TRIGRAM_THRESHOLD = 0.3
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def search_fields(model):
+    return SEARCH_FIELDS[model._meta.label_lower]
+
+
+def fts_table(model):
+    """Modelin SQLite FTS5 gölge tablosunun adı"""
+    return f'{model._meta.db_table}_fts'
+
+
+def query_terms(query):
+    """Arama metnindeki kelimeler"""
+    return _WORD.findall((query or '').lower())
+
+
+class BasicSearchBackend:
+    """Tam metin desteği olmayan veritabanları için icontains tabanlı yedek arka uç"""
+
+    def search(self, queryset, query):
+        """Sorgudaki tüm kelimeleri içeren kayıtlar"""
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for field, _ in search_fields(queryset.model):
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+    def index(self, instance):
+        """Kaydı indekse ekle/güncelle"""
+
+    def remove(self, instance):
+        """Kaydı indeksten çıkar"""
+
+    def rebuild(self, model):
+        """Modelin tüm indeksini baştan kur"""
+
+
+class SQLiteFTSBackend(BasicSearchBackend):
+    """SQLite FTS5 gölge tablosu üzerinden arama (tablo sinyallerle güncel tutulur)
+
+    Gölge tabloya Türkçe katlanmış metin yazılır; sorgu kelimeleri de aynı
+    şekilde katlanıp önek olarak (\"kelime\"*) aranır ve bm25 ile sıralanır.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def search(self, queryset, query):
+        terms = [turkish_fold(term) for term in query_terms(query)]
+        if not terms:
+            return queryset.none()
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        table = fts_table(queryset.model)
+        base_table = queryset.model._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT rank FROM {table} WHERE {table} MATCH %s AND rowid = "{base_table}"."id"',
+                [match],
+                output_field=FloatField(),
+            )
+        ).order_by('search_rank', 'pk')
+
+    def _row(self, instance):
+        return [turkish_fold(getattr(instance, field) or '') for field, _ in search_fields(type(instance))]
+
+    def index(self, instance):
+        table = fts_table(type(instance))
+        fields = search_fields(type(instance))
+        columns = ', '.join(field for field, _ in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {columns}) VALUES (%s, {placeholders})',
+                [instance.pk, *self._row(instance)],
+            )
+
+    def remove(self, instance):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {fts_table(type(instance))} WHERE rowid = %s', [instance.pk])
+
+    def rebuild(self, model):
+        table = fts_table(model)
+        fields = search_fields(model)
+        columns = ', '.join(field for field, _ in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        rows = [
+            [pk, *(turkish_fold(value or '') for value in values)]
+            for pk, *values in model._default_manager.using(self.using).values_list('pk', *(f for f, _ in fields))
+        ]
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.executemany(f'INSERT INTO {table} (rowid, {columns}) VALUES (%s, {placeholders})', rows)
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    """Postgres tsvector (GIN indeksli, generated sütun) + pg_trgm benzerlik araması
+
+    search_vector sütunu veritabanı tarafından otomatik güncellenir, bu yüzden
+    index/remove/rebuild işlem yapmaz.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+        self._has_trigram = None
+
+    def has_trigram(self):
+        if self._has_trigram is None:
+            with connections[self.using].cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                self._has_trigram = cursor.fetchone() is not None
+        return self._has_trigram
+
+    def search(self, queryset, query):
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        table = queryset.model._meta.db_table
+        title_field = search_fields(queryset.model)[0][0]
+        vector = f'"{table}"."search_vector"'
+
+        match_sql = f"{vector} @@ to_tsquery('{POSTGRES_CONFIG}', %s)"
+        rank_sql = f"ts_rank({vector}, to_tsquery('{POSTGRES_CONFIG}', %s))"
+        match_params = [tsquery]
+        rank_params = [tsquery]
+        if self.has_trigram():
+            # Yazım hatalarına karşı başlık alanında trigram benzerliği; % operatörü gin_trgm_ops
+            # indeksini kullanır (similarity() > eşik her satırı tarardı), similarity() yalnızca sıralamada
+            match_sql += f' OR "{table}"."{title_field}" %% %s'
+            rank_sql += f' + similarity("{table}"."{title_field}", %s)'
+            match_params.append(query)
+            rank_params.append(query)
+
+        return queryset.alias(
+            search_match=RawSQL(match_sql, match_params, output_field=BooleanField()),
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(rank_sql, rank_params, output_field=FloatField()),
+        ).order_by('-search_rank', 'pk')
+
+
+def set_trigram_threshold(connection):
+    """Bağlantının pg_trgm benzerlik eşiğini TRIGRAM_THRESHOLD yap (connection_created)"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, false)", [str(TRIGRAM_THRESHOLD)])
+
+
+_backends = {}
+
+
+def _sqlite_has_fts(using):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)",
+            [f'{table}_fts' for table in ('core_product', 'core_blogpost')],
+        )
+        return cursor.fetchone()[0] == 2
+
+
+def get_search_backend(using='default'):
+    """DATABASES ayarına göre arama arka ucunu seç (bağlantı başına bir kez)
+
+    SEARCH_BACKEND ayarı 'basic' ise her veritabanında icontains kullanılır.
+    """
+    backend = _backends.get(using)
+    if backend is not None:
+        return backend
+
+    vendor = connections[using].vendor
+    if getattr(settings, 'SEARCH_BACKEND', 'auto') == 'basic':
+        backend = BasicSearchBackend()
+    elif vendor == 'postgresql':
+        backend = PostgresSearchBackend(using)
+    elif vendor == 'sqlite' and _sqlite_has_fts(using):
+        backend = SQLiteFTSBackend(using)
+    else:
+        logger.info('Tam metin arama desteklenmiyor (%s), icontains kullanılacak.', vendor)
+        backend = BasicSearchBackend()
+
+    _backends[using] = backend
+    return backend
+
+
+def search(queryset, query):
+    """Görünümlerin kullandığı tek arama API'si: sorguya uyan kayıtlar, alaka sırasıyla"""
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -0,0 +1,84 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog import CATEGORY_KEYWORDS, FALLBACK_CATEGORY, KeywordClassifier
+
+
+def legacy_classify(all_files):
+    """Eski iç içe döngü - karşılaştırma için referans uygulama"""
+    category_products = {}
+
+    matched_files_all = set()
+    for cat_slug, keywords in CATEGORY_KEYWORDS.items():
+        matched_files = [
+            file for file in all_files
+            if file not in matched_files_all
+            and any(keyword.lower() in file.lower() for keyword in keywords)
+        ]
+        for file in matched_files:
+            matched_files_all.add(file)
+        category_products[cat_slug] = sorted(matched_files)
+
+    unmatched = [f for f in all_files if f not in matched_files_all]
+    if unmatched:
+        category_products[FALLBACK_CATEGORY] = sorted(unmatched)
+
+    return category_products
+
+
+def synthetic_filenames(count, seed=0):
+    """Gerçek kataloğa benzeyen rastgele dosya adları üret"""
+    rng = random.Random(seed)
+    keywords = [k for words in CATEGORY_KEYWORDS.values() for k in words]
+    filler = ['Deri', 'Siyah', 'Kahverengi', 'Buyuk', 'Kucuk', 'Ozel', 'Set', 'Model', 'Pro', 'Klasik']
+    extensions = ['.jpg', '.jpeg', '.png', '.JPG']
+    names = set()
+    while len(names) < count:
+        parts = rng.sample(filler, rng.randint(1, 3))
+        # Dosyaların bir kısmı hiçbir anahtar kelimeye uymasın (diger)
+        if rng.random() < 0.8:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(keywords).title())
+        names.add('_'.join(parts) + f'_{len(names)}' + rng.choice(extensions))
+    return list(names)
+
+
+class Command(BaseCommand):
+    help = 'Görsel -> kategori sınıflandırıcısının hızını ölçer ve eski döngüyle karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[200, 10000, 100000],
+                            help='Denenecek dosya sayıları')
+        parser.add_argument('--repeat', type=int, default=3, help='Her ölçüm için tekrar sayısı')
+        parser.add_argument('--skip-legacy', action='store_true',
+                            help='Eski döngüyü ölçme (büyük boyutlarda yavaştır)')
+
+    def handle(self, *args, **options):
+        classifier = KeywordClassifier(CATEGORY_KEYWORDS)
+        repeat = max(1, options['repeat'])
+
+        self.stdout.write(f"{'dosya':>8} {'derlenmiş':>12} {'dosya/sn':>12} {'eski':>12} {'hızlanma':>9}")
+        for size in options['sizes']:
+            files = synthetic_filenames(size)
+
+            compiled_time = self._best_of(repeat, lambda: classifier.group(files))
+            line = f'{size:>8} {compiled_time * 1000:>10.1f}ms {size / compiled_time:>12,.0f}'
+
+            if not options['skip_legacy']:
+                legacy_time = self._best_of(1, lambda: legacy_classify(files))
+                if classifier.group(files) != legacy_classify(files):
+                    raise CommandError(f'{size} dosyada sınıflandırma sonuçları farklı')
+                line += f' {legacy_time * 1000:>10.1f}ms {legacy_time / compiled_time:>8.1f}x'
+
+            self.stdout.write(line)
+
+    @staticmethod
+    def _best_of(repeat, func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
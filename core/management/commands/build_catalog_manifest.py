@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog import get_manifest_path, get_products_dir, scan_directory, write_manifest
+
+
+class Command(BaseCommand):
+    help = 'Ürün görsel klasöründen katalog manifestini üretir (collectstatic sonrasında çalıştırın)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Görsel klasörü (varsayılan: STATIC_ROOT/images/New folder)')
+        parser.add_argument('--output', help='Manifest dosyası (varsayılan: CATALOG_MANIFEST_PATH)')
+
+    def handle(self, *args, **options):
+        source = options['source'] or get_products_dir()
+        output = options['output'] or get_manifest_path()
+        if not output:
+            raise CommandError('CATALOG_MANIFEST_PATH ayarlanmamış; --output verin.')
+
+        start = time.perf_counter()
+        entries = scan_directory(source)
+        write_manifest(entries, output)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if not entries:
+            self.stdout.write(self.style.WARNING(f'{source} içinde görsel bulunamadı; boş manifest yazıldı.'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(entries)} ürün görseli {output} dosyasına yazıldı ({elapsed:.0f} ms).'
+        ))
@@ -0,0 +1,74 @@
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog import get_catalog, get_products_dir
+from core.derivatives import DERIVATIVE_FORMATS
+from core.sprites import (
+    SPRITE_FORMATS, SPRITE_MANIFEST_NAME, SPRITE_TILE_COUNT, get_sprites_root, load_sprite_manifest,
+    render_sprite, sprite_key, write_sprite_manifest,
+)
+
+
+# render_sprite() ile üretilmiş dosyalar: <slug>-<12 haneli özet>.<uzantı>
+SPRITE_FILE = re.compile(
+    r'^.+-[0-9a-f]{12}\.(?:%s)$' % '|'.join(DERIVATIVE_FORMATS[name][1] for name in SPRITE_FORMATS)
+)
+
+
+class Command(BaseCommand):
+    help = ('Ana sayfadaki kategori şeritleri için kategori başına tek görsel atlası (WebP + JPEG) ve '
+            'atlas manifestini üretir (build_catalog_manifest sonrasında çalıştırın)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Atlas klasörü (varsayılan: türev klasörü/sprites)')
+        parser.add_argument('--force', action='store_true', help='Değişmemiş olsa da tüm atlasları yeniden üret')
+
+    def handle(self, *args, **options):
+        output_dir = options['output'] or get_sprites_root()
+        if not output_dir:
+            raise CommandError('STATIC_ROOT ya da IMAGE_DERIVATIVES_ROOT ayarlanmamış; --output verin.')
+        os.makedirs(output_dir, exist_ok=True)
+
+        products_dir = get_products_dir()
+        catalog = get_catalog()
+        if not len(catalog):
+            # collectstatic çalışmamışsa mevcut atlaslar silinmesin
+            self.stdout.write(self.style.WARNING(f'{products_dir} içinde görsel bulunamadı; atlaslara dokunulmadı.'))
+            return
+
+        manifest_path = os.path.join(output_dir, SPRITE_MANIFEST_NAME)
+        previous = {} if options['force'] else load_sprite_manifest(manifest_path)
+
+        start = time.perf_counter()
+        sprites = {}
+        built = 0
+        for slug, files in sorted(catalog.category_products.items()):
+            entries = [catalog.get_entry(name) for name in files[:SPRITE_TILE_COUNT]]
+            entries = [entry for entry in entries if os.path.exists(os.path.join(products_dir, entry.name))]
+            if not entries:
+                continue
+            key = sprite_key(entries)
+            record = previous.get(slug)
+            if (record and record['key'] == key
+                    and all(os.path.exists(os.path.join(output_dir, name)) for name in record['variants'].values())):
+                sprites[slug] = record
+                continue
+            variants = render_sprite([os.path.join(products_dir, entry.name) for entry in entries], output_dir, slug, key)
+            sprites[slug] = {'key': key, 'files': [entry.name for entry in entries], 'variants': variants}
+            built += 1
+
+        write_sprite_manifest(sprites, manifest_path)
+        keep = {name for record in sprites.values() for name in record['variants'].values()}
+        removed = 0
+        for name in os.listdir(output_dir):
+            if name not in keep and SPRITE_FILE.match(name):
+                os.remove(os.path.join(output_dir, name))
+                removed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{built} kategori atlası üretildi, {len(sprites) - built} atlas değişmediği için atlandı, '
+            f'{removed} eski atlas silindi ({time.perf_counter() - start:.1f} sn).'
+        ))
@@ -0,0 +1,48 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.critical import (
+    build_pages, get_manifest_path, get_stylesheet_path, load_critical_manifest, sources_stamp, template_sources,
+    write_critical_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = ('core/templates/core/ içindeki her sayfa için ilk ekranda kullanılan kurallardan kritik CSS '
+            'üretir ve manifeste yazar (stil dosyası ya da şablonlar değişince yeniden çalıştırın)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Manifest dosyası (varsayılan: CRITICAL_CSS_PATH)')
+        parser.add_argument('--force', action='store_true', help='Kaynaklar değişmemiş olsa da yeniden üret')
+
+    def handle(self, *args, **options):
+        manifest_path = options['output'] or get_manifest_path()
+        if not manifest_path:
+            raise CommandError('CRITICAL_CSS_PATH ayarlanmamış; --output verin.')
+        css_path = get_stylesheet_path()
+        if not css_path:
+            raise CommandError('Stil dosyası static dosyalar arasında bulunamadı.')
+
+        start = time.perf_counter()
+        with open(css_path, encoding='utf-8') as fh:
+            css = fh.read()
+        sources = template_sources()
+        stamp = sources_stamp(css, sources)
+        if not options['force'] and load_critical_manifest(manifest_path)[0] == stamp:
+            self.stdout.write('Stil dosyası ve şablonlar değişmemiş; kritik CSS güncel.')
+            return
+
+        pages = build_pages(css, sources)
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        write_critical_manifest(pages, stamp, manifest_path)
+        for name, page_css in sorted(pages.items()):
+            if page_css:
+                self.stdout.write(f'{name}: {len(page_css.encode("utf-8")) / 1024:.1f} KB')
+            else:
+                self.stdout.write(self.style.WARNING(f'{name}: sınırı aşıyor, tam stil dosyası kullanılacak'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pages)} sayfa için kritik CSS üretildi (tam stil dosyası '
+            f'{len(css.encode("utf-8")) / 1024:.1f} KB, {time.perf_counter() - start:.2f} sn).'
+        ))
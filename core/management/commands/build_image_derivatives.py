@@ -0,0 +1,111 @@
+import os
+import re
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog import file_hash, get_catalog, get_products_dir
+from core.derivatives import (
+    DERIVATIVE_FORMATS, MANIFEST_NAME, available_formats, get_derivatives_root, load_manifest,
+    render_derivatives, write_manifest,
+)
+
+
+# derivative_name() ile üretilmiş dosyalar: <anahtar>-<12 haneli özet>-<genişlik>.<uzantı>
+DERIVATIVE_FILE = re.compile(
+    r'^.+-[0-9a-f]{12}-\d+\.(?:%s)$' % '|'.join(extension for _, extension, _, _ in DERIVATIVE_FORMATS.values())
+)
+
+
+class Command(BaseCommand):
+    help = ('Ürün görselleri için genişlik kademeli WebP/JPEG (destekleniyorsa AVIF) türevleri ve '
+            'türev manifestini üretir (build_catalog_manifest sonrasında çalıştırın)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Türev klasörü (varsayılan: IMAGE_DERIVATIVES_ROOT ya da STATIC_ROOT/derivatives)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Paralel süreç sayısı')
+        parser.add_argument('--formats', help=f"Virgülle ayrılmış biçimler ({', '.join(DERIVATIVE_FORMATS)})")
+        parser.add_argument('--force', action='store_true', help='İçerik değişmemiş olsa da tüm türevleri yeniden üret')
+
+    def handle(self, *args, **options):
+        output_dir = options['output'] or get_derivatives_root()
+        if not output_dir:
+            raise CommandError('STATIC_ROOT ya da IMAGE_DERIVATIVES_ROOT ayarlanmamış; --output verin.')
+        os.makedirs(output_dir, exist_ok=True)
+
+        supported = available_formats()
+        formats = [f.strip() for f in options['formats'].split(',')] if options['formats'] else supported
+        unsupported = [f for f in formats if f not in supported]
+        if unsupported:
+            raise CommandError(f"Bu Pillow kurulumu şu biçimleri yazamıyor: {', '.join(unsupported)}")
+
+        products_dir = get_products_dir()
+        catalog = get_catalog()
+        if not len(catalog):
+            # collectstatic çalışmamışsa mevcut türevler silinmesin
+            self.stdout.write(self.style.WARNING(f'{products_dir} içinde görsel bulunamadı; türevlere dokunulmadı.'))
+            return
+
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        previous = {} if options['force'] else load_manifest(manifest_path)
+
+        start = time.perf_counter()
+        files = {}
+        jobs = {}
+        for file_name in catalog.sorted_files:
+            entry = catalog.get_entry(file_name)
+            source_path = os.path.join(products_dir, file_name)
+            if not os.path.exists(source_path):
+                continue
+            content_hash = entry.hash or file_hash(source_path)
+
+            # İçerik özeti ve biçimler aynıysa ve dosyalar duruyorsa yeniden üretme
+            record = previous.get(file_name)
+            if (record and record.get('hash') == content_hash
+                    and sorted(record['variants']) == sorted(formats)
+                    and all(os.path.exists(os.path.join(output_dir, name))
+                            for sizes in record['variants'].values() for _, name in sizes)):
+                files[file_name] = record
+                continue
+            jobs[file_name] = (source_path, output_dir, entry.key, content_hash, formats)
+
+        failed = []
+        if jobs:
+            names = list(jobs)
+            if options['workers'] > 1 and len(jobs) > 1:
+                with Pool(options['workers']) as pool:
+                    results = pool.map(render_derivatives, [jobs[name] for name in names], chunksize=4)
+            else:
+                results = [render_derivatives(jobs[name]) for name in names]
+            for file_name, result in zip(names, results):
+                if result is None:
+                    failed.append(file_name)
+                    continue
+                result['hash'] = jobs[file_name][3]
+                files[file_name] = result
+
+        write_manifest(files, formats, manifest_path)
+        removed = self._prune(output_dir, files)
+        elapsed = time.perf_counter() - start
+
+        if failed:
+            self.stdout.write(self.style.WARNING(
+                f"{len(failed)} görsel okunamadı: {', '.join(failed[:10])}{' ...' if len(failed) > 10 else ''}"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(jobs) - len(failed)} görselin türevleri üretildi, {len(files) - len(jobs) + len(failed)} görsel '
+            f'değişmediği için atlandı, {removed} eski türev silindi ({", ".join(formats)}; {elapsed:.1f} sn).'
+        ))
+
+    @staticmethod
+    def _prune(output_dir, files):
+        """Manifestte artık yer almayan türev dosyalarını sil (yalnızca türev adı taşıyanlar)"""
+        keep = {name for record in files.values() for sizes in record['variants'].values() for _, name in sizes}
+        removed = 0
+        for name in os.listdir(output_dir):
+            path = os.path.join(output_dir, name)
+            if name not in keep and DERIVATIVE_FILE.match(name) and os.path.isfile(path):
+                os.remove(path)
+                removed += 1
+        return removed
@@ -0,0 +1,74 @@
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.catalog import get_catalog, get_products_dir
+from core.models import Product, ProductNeighbors
+from core.products import RELATED_CANDIDATES
+from core.similarity import COLOR_BINS, color_histogram, combine, product_tokens, text_vectors, top_k_neighbors
+
+
+class Command(BaseCommand):
+    help = ('Katalogdaki her ürün için benzer ürünleri (dosya adı/ürün alanı kelimeleri ve görsel renk '
+            'histogramları) hesaplayıp ProductNeighbors tablosuna yazar')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=RELATED_CANDIDATES, help='Ürün başına saklanacak komşu sayısı')
+        parser.add_argument('--batch-size', type=int, default=1024, help='Benzerlik matrisinin blok satır sayısı')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Renk histogramları için paralel süreç sayısı')
+        parser.add_argument('--no-images', action='store_true', help='Renk histogramı hesaplama (yalnızca kelimeler)')
+        parser.add_argument('--dry-run', action='store_true', help='Veritabanına yazmadan süreleri göster')
+
+    def handle(self, *args, **options):
+        catalog = get_catalog()
+        entries = [catalog.get_entry(name) for name in catalog.sorted_files]
+        if not entries:
+            self.stdout.write(self.style.WARNING('Katalogda ürün yok.'))
+            return
+
+        started = time.perf_counter()
+        attributes = {
+            image_key: values
+            for image_key, *values in Product.objects.filter(
+                is_active=True, image_key__isnull=False
+            ).values_list('image_key', 'material', 'color', 'brand__name')
+        }
+        text = text_vectors([product_tokens(entry, attributes.get(entry.key)) for entry in entries])
+
+        if options['no_images']:
+            colors = np.zeros((len(entries), COLOR_BINS ** 3), dtype=np.float32)
+        else:
+            products_dir = get_products_dir()
+            paths = [os.path.join(products_dir, entry.name) for entry in entries]
+            if options['workers'] > 1:
+                with Pool(options['workers']) as pool:
+                    colors = np.vstack(pool.map(color_histogram, paths, chunksize=64))
+            else:
+                colors = np.vstack([color_histogram(path) for path in paths])
+        features_done = time.perf_counter()
+
+        neighbors = top_k_neighbors(combine(text, colors), options['top_k'], options['batch_size'])
+        similarity_done = time.perf_counter()
+
+        rows = [
+            ProductNeighbors(image_key=entry.key, neighbors=[entries[i].key for i in neighbors[row]])
+            for row, entry in enumerate(entries)
+        ]
+        # Aynı anahtara düşen dosyalardan (Acik_Nal.jpg / Açık_Nal.png) ilki saklanır
+        unique_rows = list({row.image_key: row for row in reversed(rows)}.values())
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                ProductNeighbors.objects.all().delete()
+                ProductNeighbors.objects.bulk_create(unique_rows, batch_size=1000)
+
+        prefix = '[DRY-RUN] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{len(unique_rows)} ürün için benzer ürünler hesaplandı '
+            f'(özellikler {features_done - started:.1f} sn, benzerlik {similarity_done - features_done:.1f} sn).'
+        ))
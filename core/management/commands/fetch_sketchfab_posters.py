@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sketchfab import POSTER_MAX_AGE, ensure_posters, model_uids, normalize_uid
+
+
+class Command(BaseCommand):
+    help = ('3D modeli olan ürünler ve vitrin modelleri için Sketchfab poster görsellerini ve meta '
+            'verilerini indirip MEDIA_ROOT/sketchfab altında saklar (sayfalar bu posterleri gösterir)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Güncel olanlar dahil tüm posterleri yeniden indir')
+        parser.add_argument('--max-age', type=float, default=POSTER_MAX_AGE / 86400,
+                            help='Bu kadar günden eski posterleri yenile')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        uids = {normalize_uid(uid) for uid in model_uids()} - {None}
+        fetched = ensure_posters(uids, max_age=options['max_age'] * 86400, force=options['force'])
+        failed = [uid for uid, record in fetched.items() if record.get('error')]
+        for uid in failed:
+            self.stdout.write(self.style.WARNING(f'{uid}: {fetched[uid]["error"]}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(fetched) - len(failed)} poster indirildi, {len(failed)} poster alınamadı, '
+            f'{len(uids) - len(fetched)} poster güncel ({time.perf_counter() - start:.1f} sn).'
+        ))
@@ -0,0 +1,85 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mediaimages import IMAGE_FIELDS, claim, enqueue, image_names, process, requeue_stale
+from core.models import MediaImage
+from core.sketchfab import ensure_posters, model_uids
+
+
+class Command(BaseCommand):
+    help = ('Admin\'den yüklenen görselleri arka planda işler: EXIF\'i temizler, JPEG\'leri progressive '
+            'kaydeder, boyutları kaydeder ve /thumb/ küçük görsellerini önceden üretir; boşta kaldıkça '
+            'yeni eklenen 3D modellerin Sketchfab posterlerini indirir')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Kuyruk boşalınca çık (varsayılan: sürekli çalış)')
+        parser.add_argument('--interval', type=float, default=5.0, help='Kuyruk boşken bekleme süresi (saniye)')
+        parser.add_argument('--batch-size', type=int, default=10, help='Tek seferde alınacak görsel sayısı')
+        parser.add_argument('--enqueue-existing', action='store_true',
+                            help='Mevcut tüm kayıtların görsellerini de kuyruğa ekle')
+        parser.add_argument('--reprocess', action='store_true',
+                            help='İşlenmiş görselleri yeniden kuyruğa al (yer tutucu/renk yeniden hesaplanır)')
+        parser.add_argument('--poster-interval', type=float, default=300.0,
+                            help='Eksik Sketchfab posterlerinin kontrol aralığı (saniye, 0: kapalı)')
+
+    def handle(self, *args, **options):
+        if options['enqueue_existing']:
+            self._enqueue_existing()
+        if options['reprocess']:
+            count = MediaImage.objects.filter(status=MediaImage.STATUS_DONE).update(
+                status=MediaImage.STATUS_PENDING, attempts=0,
+            )
+            self.stdout.write(f'{count} görsel yeniden kuyruğa alındı.')
+
+        processed = failed = 0
+        posters_checked = None
+        try:
+            while True:
+                requeue_stale()
+                batch = claim(options['batch_size'])
+                if not batch:
+                    if options['poster_interval'] and (
+                            posters_checked is None
+                            or time.monotonic() - posters_checked >= options['poster_interval']):
+                        posters_checked = time.monotonic()
+                        self._fetch_posters()
+                    if options['once']:
+                        break
+                    # Uzun beklemelerde kopmuş veritabanı bağlantısı yeniden açılsın
+                    close_old_connections()
+                    time.sleep(options['interval'])
+                    continue
+                for media_image in batch:
+                    started = time.perf_counter()
+                    if process(media_image):
+                        processed += 1
+                        self.stdout.write(
+                            f'{media_image.name}: {media_image.width}x{media_image.height} '
+                            f'({(time.perf_counter() - started) * 1000:.0f} ms)'
+                        )
+                    else:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f'{media_image.name}: {media_image.error}'))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'{processed} görsel işlendi, {failed} görsel işlenemedi.'))
+
+    def _fetch_posters(self):
+        for uid, record in ensure_posters(model_uids()).items():
+            if record.get('error'):
+                self.stdout.write(self.style.WARNING(f'Sketchfab {uid}: {record["error"]}'))
+            else:
+                self.stdout.write(f'Sketchfab {uid}: poster indirildi ({record["poster"]})')
+
+    def _enqueue_existing(self):
+        total = 0
+        for model_name, fields in IMAGE_FIELDS.items():
+            model = apps.get_model('core', model_name)
+            for instance in model.objects.only('pk', *fields).iterator(chunk_size=500):
+                names = image_names(instance)
+                enqueue(names)
+                total += len(names)
+        self.stdout.write(f'{total} görsel kuyruğa eklendi (önceden eklenmiş olanlar atlandı).')
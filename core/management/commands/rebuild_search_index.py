@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.fulltext import get_search_backend
+from core.models import BlogPost, Product
+
+
+class Command(BaseCommand):
+    help = 'Ürün ve blog tam metin arama indeksini baştan kurar'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        for model in (Product, BlogPost):
+            backend.rebuild(model)
+        self.stdout.write(self.style.SUCCESS(
+            f'Arama indeksi yenilendi ({type(backend).__name__}).'
+        ))
@@ -0,0 +1,154 @@
+import os
+import sys
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from core.catalog import CATALOG_MEDIA_DIR, FALLBACK_CATEGORY, get_catalog, get_products_dir
+from core.categories import CATEGORY_MAPPING
+from core.fulltext import get_search_backend
+from core.models import Category, Product
+
+
+# Veritabanında henüz olmayan katalog kategorileri bu adlarla oluşturulur
+CATEGORY_NAMES = {mapping['slug_map']: name for name, mapping in CATEGORY_MAPPING.items()}
+CATEGORY_NAMES[FALLBACK_CATEGORY] = 'Diğer Ürünler'
+
+
+class Command(BaseCommand):
+    help = 'Ürün görsel klasöründeki dosyalardan Product kayıtlarını oluşturur/günceller (tekrar çalıştırılabilir)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Veritabanına yazmadan ne yapılacağını göster')
+        parser.add_argument('--no-copy', action='store_true',
+                            help='Görselleri media klasörüne kopyalama (main_image yalnızca isim olarak ayarlanır)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Windows konsol encoding sorununu çöz
+        if sys.platform == 'win32':
+            import io
+            sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+            sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+        catalog = get_catalog()
+        products_dir = get_products_dir()
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        categories = Category.objects.in_bulk(list(catalog.category_products), field_name='slug')
+        new_categories = self._missing_categories(catalog, categories)
+        for category in new_categories:
+            if not dry_run:
+                # Tek tek kaydedilir: sinyaller kategori kaydını ve önbellekli sayfaları yeniler
+                category.save()
+            categories[category.slug] = category
+
+        existing = Product.objects.in_bulk([e.key for e in catalog.entries.values()], field_name='image_key')
+        taken_slugs = set(Product.objects.filter(
+            slug__in=[e.slug for e in catalog.entries.values()]
+        ).exclude(image_key__in=list(existing)).values_list('slug', flat=True))
+
+        to_create = []
+        to_update = []
+        duplicates = []
+        admin_owned = []
+        seen_keys = set()
+
+        for file_name in catalog.sorted_files:
+            entry = catalog.get_entry(file_name)
+            category = categories[entry.category]
+
+            # Aynı anahtara düşen ikinci dosya (örn. Acik_Nal.jpg / Açık_Nal.png) ya da
+            # slug'ı başka bir ürünce kullanılan yeni dosya atlanır
+            product = existing.get(entry.key)
+            if entry.key in seen_keys or (product is None and entry.slug in taken_slugs):
+                duplicates.append(file_name)
+                continue
+            seen_keys.add(entry.key)
+
+            image_name = f'{CATALOG_MEDIA_DIR}/{file_name}'
+            if product is not None and not product.main_image.name.startswith(CATALOG_MEDIA_DIR + '/'):
+                # Görseli admin'den yüklenmiş ürün: admin'de girilen bilgilere dokunma
+                admin_owned.append(product.name)
+                continue
+            if product is None:
+                taken_slugs.add(entry.slug)
+                to_create.append(Product(
+                    name=entry.display_name.replace('_', ' '),
+                    slug=entry.slug,
+                    image_key=entry.key,
+                    description='',
+                    category=category,
+                    price=0,
+                    main_image=image_name,
+                    is_active=True,
+                ))
+            elif product.category_id != category.pk or product.main_image.name != image_name:
+                # Yalnızca katalogdan türeyen alanları güncelle
+                product.category = category
+                product.main_image = image_name
+                to_update.append(product)
+
+            if not dry_run and not options['no_copy']:
+                self._copy_image(products_dir, file_name, image_name)
+
+        if not dry_run:
+            with transaction.atomic():
+                Product.objects.bulk_create(to_create, batch_size=batch_size)
+                Product.objects.bulk_update(to_update, ['category', 'main_image'], batch_size=batch_size)
+            if to_create or to_update:
+                # bulk_create/bulk_update sinyal göndermez; tam metin indeksini topluca yenile
+                get_search_backend().rebuild(Product)
+
+        prefix = '[DRY-RUN] ' if dry_run else ''
+        for category in new_categories:
+            self.stdout.write(self.style.WARNING(
+                f"{prefix}'{category.slug}' kategorisi veritabanında yoktu, '{category.name}' adıyla oluşturuldu."
+            ))
+        if admin_owned:
+            self.stdout.write(
+                f"{prefix}{len(admin_owned)} ürünün görseli admin'den yüklendiği için dokunulmadı: "
+                f"{', '.join(admin_owned[:10])}{' ...' if len(admin_owned) > 10 else ''}"
+            )
+        if duplicates:
+            self.stdout.write(self.style.WARNING(
+                f"{prefix}{len(duplicates)} görsel başka bir ürünle aynı ada sahip olduğu için atlandı: "
+                f"{', '.join(duplicates[:10])}{' ...' if len(duplicates) > 10 else ''}"
+            ))
+        unchanged = len(catalog) - len(to_create) - len(to_update) - len(admin_owned) - len(duplicates)
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{len(to_create)} ürün oluşturuldu, {len(to_update)} ürün güncellendi, '
+            f'{unchanged} ürün zaten güncel.'
+        ))
+
+    @staticmethod
+    def _missing_categories(catalog, categories):
+        """Katalogda ürünü olup veritabanında bulunmayan kategoriler (kaydedilmemiş, menü sonuna)"""
+        missing = [slug for slug, files in catalog.category_products.items() if files and slug not in categories]
+        if not missing:
+            return []
+        sort_order = Category.objects.aggregate(last=Max('sort_order'))['last'] or 0
+        return [
+            Category(
+                name=CATEGORY_NAMES.get(slug, slug.replace('-', ' ').title()),
+                slug=slug,
+                sort_order=sort_order + number,
+                is_active=True,
+            )
+            for number, slug in enumerate(missing, 1)
+        ]
+
+    @staticmethod
+    def _copy_image(products_dir, file_name, image_name):
+        """Görseli media depolamasına kopyala (zaten varsa atla)"""
+        if default_storage.exists(image_name):
+            return
+        source_path = os.path.join(products_dir, file_name)
+        if not os.path.exists(source_path):
+            return
+        with open(source_path, 'rb') as fh:
+            default_storage.save(image_name, File(fh))
@@ -0,0 +1,205 @@
+import io
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+
+# Media dosyaları için varsayılan tarayıcı/proxy önbellek süresi (saniye).
+# Dosyalar yerinde güncellenebildiği için (process_media_images) immutable değil; ETag ile doğrulanır.
+MEDIA_MAX_AGE = 7 * 24 * 3600
+
+# Volume'deki içerik özetli türev/atlas dosyaları için (ad değişmeden içerik değişmez)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(stat):
+    """Dosyanın güçlü ETag'i (mtime + boyut; içerik değişince ikisi de değişir)"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Range başlığından (başlangıç, bitiş) (bitiş dahil)
+
+    Başlık yoksa ya da birden çok aralık istenmişse None (tüm dosya 200 ile
+    gönderilir), aralık dosyanın dışındaysa False döner.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.group(1), match.group(2)
+    if start == '':
+        # bytes=-N: son N bayt
+        length = int(end)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_passes(request, etag, last_modified):
+    """If-Range yoksa ya da doğrulayıcı hâlâ geçerliyse True (geçersizse tüm dosya gönderilir)"""
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def accel_path(full_path):
+    """X-Accel-Redirect için iç (internal) URL; dosya MEDIA_ROOT dışındaysa None"""
+    media_root = os.path.join(str(settings.MEDIA_ROOT), '')
+    if not full_path.startswith(media_root):
+        return None
+    prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+    return prefix + quote(full_path[len(media_root):].replace(os.sep, '/'))
+
+
+class _FileRange(io.RawIOBase):
+    """Açık dosyanın [start, start + length) dilimi
+
+    FileResponse uzunluğu seek/tell ile bu dilimden hesaplar; gunicorn
+    wsgi.file_wrapper fileno() üzerinden dilimi os.sendfile ile, diğer
+    sunucular read() ile gönderir.
+    """
+
+    def __init__(self, fh, start, length):
+        self._fh = fh
+        self._end = start + length
+        fh.seek(start)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def tell(self):
+        return self._fh.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            return self._fh.seek(self._end + offset)
+        return self._fh.seek(offset, whence)
+
+    def read(self, size=-1):
+        remaining = self._end - self._fh.tell()
+        if remaining <= 0:
+            return b''
+        return self._fh.read(remaining if size is None or size < 0 else min(size, remaining))
+
+    def close(self):
+        self._fh.close()
+        super().close()
+
+
+async def _aread_chunks(filelike, chunk_size=FileResponse.block_size):
+    """Dosyayı parça parça thread'de oku; ASGI sunucusu parçaları olay döngüsünden gönderir"""
+    read = sync_to_async(filelike.read, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        filelike.close()
+
+
+def serve_file(request, full_path, content_type=None, max_age=MEDIA_MAX_AGE, immutable=False):
+    """Diskteki dosyayı koşullu istek, Range ve proxy devri desteğiyle gönder
+
+    MEDIA_SERVE_OFFLOAD='x-accel' (nginx) ya da 'x-sendfile' (Apache/lighttpd)
+    ise aktarım ön proxy'ye bırakılır; aksi halde FileResponse ile gönderilir
+    (gunicorn bunu os.sendfile ile yapar). ASGI altında dosya async bir
+    iteratörle akıtılır; Django senkron iteratörleri belleğe topladığı için
+    FileResponse kullanılmaz.
+    """
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Dosya bulunamadı")
+    if not os.path.isfile(full_path):
+        raise Http404("Dosya bulunamadı")
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    content_type = content_type or mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(request, full_path, stat, etag, last_modified, content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if response.status_code < 400:
+        patch_cache_control(response, public=True, max_age=max_age)
+        if immutable:
+            patch_cache_control(response, immutable=True)
+    return response
+
+
+def _file_response(request, full_path, stat, etag, last_modified, content_type):
+    offload = getattr(settings, 'MEDIA_SERVE_OFFLOAD', '')
+    if offload == 'x-accel' and accel_path(full_path):
+        # nginx Range ve aktarımı kendisi yapar; gövde boş
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_path(full_path)
+        return response
+    if offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    size = stat.st_size
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is not None and not _if_range_passes(request, etag, last_modified):
+        byte_range = None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = max(0, end - start + 1)
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        fh = open(full_path, 'rb')
+        filelike = _FileRange(fh, start, length) if byte_range else fh
+        if isinstance(request, ASGIRequest):
+            response = StreamingHttpResponse(_aread_chunks(filelike), content_type=content_type)
+        else:
+            response = FileResponse(filelike, content_type=content_type)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def media_path(path):
+    """MEDIA_ROOT altındaki dosyanın mutlak yolu (dışarı çıkan yollar 404)"""
+    try:
+        return safe_join(str(settings.MEDIA_ROOT), path)
+    except SuspiciousFileOperation:
+        raise Http404("Dosya bulunamadı")
@@ -0,0 +1,195 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .catalog import CATALOG_MEDIA_DIR
+from .models import MediaImage
+from .placeholders import analyze_file
+from .thumbnails import warm_thumbnails
+
+
+logger = logging.getLogger(__name__)
+
+# Arka planda işlenen görsel alanları: model adı -> ImageField adları
+IMAGE_FIELDS = {
+    'Product': ('main_image', 'image_2', 'image_3'),
+    'Category': ('image',),
+    'Brand': ('logo',),
+    'BlogPost': ('image',),
+}
+
+# Önceden üretilecek /thumb/ boyutları (kartlar ve küçük karolar 640, detay ve büyük karolar 1280)
+WARM_SIZES = ((640, 0), (1280, 0))
+
+# Bu kadar denemede işlenemeyen görsel 'failed' olarak bırakılır
+MAX_ATTEMPTS = 3
+
+# Bu süreden uzun 'processing' kalan kayıtlar (çöken worker) yeniden kuyruğa alınır
+STALE_AFTER = timedelta(minutes=10)
+
+JPEG_QUALITY = 85
+
+
+def image_names(instance):
+    """Model örneğindeki işlenecek media görsel adları (katalog kopyaları hariç)"""
+    names = []
+    for field_name in IMAGE_FIELDS.get(type(instance).__name__, ()):
+        name = getattr(instance, field_name).name
+        if name and not name.startswith(CATALOG_MEDIA_DIR + '/'):
+            names.append(name)
+    return names
+
+
+def enqueue(names):
+    """Görselleri kuyruğa ekle; daha önce eklenmiş olanlara dokunulmaz (tek sorgu)"""
+    if names:
+        MediaImage.objects.bulk_create([MediaImage(name=name) for name in names], ignore_conflicts=True)
+
+
+def requeue_stale():
+    """Çöken worker'dan kalan 'processing' kayıtlarını yeniden kuyruğa al"""
+    return MediaImage.objects.filter(
+        status=MediaImage.STATUS_PROCESSING, updated_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status=MediaImage.STATUS_PENDING)
+
+
+def claim(limit):
+    """Bekleyen en fazla ``limit`` kaydı bu worker'a ayır
+
+    Her kayıt status='pending' koşullu UPDATE ile alınır; aynı anda çalışan
+    worker'lar bir görseli iki kez işlemez.
+    """
+    claimed = []
+    pending = MediaImage.objects.filter(status=MediaImage.STATUS_PENDING).order_by('id')
+    for pk in pending.values_list('pk', flat=True)[:limit]:
+        updated = MediaImage.objects.filter(pk=pk, status=MediaImage.STATUS_PENDING).update(
+            status=MediaImage.STATUS_PROCESSING, attempts=F('attempts') + 1, updated_at=timezone.now(),
+        )
+        if updated:
+            claimed.append(MediaImage.objects.get(pk=pk))
+    return claimed
+
+
+# EXIF yön etiketi; 1 = döndürme gerekmez
+EXIF_ORIENTATION = 0x0112
+
+
+def optimize_original(path):
+    """Orijinali gerektiğinde yerinde iyileştir; dönüş: (genişlik, yükseklik)
+
+    JPEG; EXIF taşıyorsa (konum, kamera bilgisi, yön) ya da progressive
+    değilse bir kez yeniden kodlanır: yön uygulanır, metadata atılır,
+    progressive kaydedilir. Sonuç bu koşulların hiçbirini taşımadığından
+    yeniden denemelerde dosyaya dokunulmaz, kalite kaybı birikmez. PNG
+    kayıpsız yeniden sıkıştırılır ve yalnızca küçülürse yazılır.
+    """
+    with Image.open(path) as image:
+        pil_format = image.format
+        if pil_format not in ('JPEG', 'PNG'):
+            return image.size
+        exif = image.getexif()
+        rotated = exif.get(EXIF_ORIENTATION, 1) != 1
+        if pil_format == 'JPEG' and not (rotated or exif or not image.info.get('progressive')):
+            return image.size
+        icc_profile = image.info.get('icc_profile')
+        frame = ImageOps.exif_transpose(image) if rotated else image
+        if pil_format == 'JPEG':
+            if frame.mode not in ('RGB', 'L', 'CMYK'):
+                frame = frame.convert('RGB')
+            options = {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+        else:
+            options = {'optimize': True}
+        if icc_profile:
+            options['icc_profile'] = icc_profile
+        size = frame.size
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                frame.save(fh, pil_format, **options)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    if pil_format == 'PNG' and not rotated and os.path.getsize(tmp_path) >= os.path.getsize(path):
+        os.remove(tmp_path)
+        return size
+    os.replace(tmp_path, path)
+    return size
+
+
+def process(media_image):
+    """Tek görseli işle: orijinali iyileştir, boyutlarını kaydet, küçük görselleri üret"""
+    try:
+        path = default_storage.path(media_image.name)
+    except NotImplementedError:  # Uzak depolama: yerel dosya yolu yok
+        path = None
+
+    if path is None or not os.path.exists(path):
+        media_image.status = MediaImage.STATUS_FAILED
+        media_image.error = 'Dosya bulunamadı'
+    else:
+        try:
+            media_image.width, media_image.height = optimize_original(path)
+            placeholder, color = analyze_file(path)
+            media_image.placeholder, media_image.color = placeholder or '', color or ''
+            warm_thumbnails(media_image.name, WARM_SIZES)
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            logger.warning('Görsel işlenemedi (%s): %s', media_image.name, exc)
+            media_image.error = str(exc)
+            media_image.status = (MediaImage.STATUS_FAILED if media_image.attempts >= MAX_ATTEMPTS
+                                  else MediaImage.STATUS_PENDING)
+        else:
+            media_image.error = ''
+            media_image.status = MediaImage.STATUS_DONE
+    media_image.save(update_fields=['width', 'height', 'placeholder', 'color', 'status', 'error', 'updated_at'])
+    return media_image.status == MediaImage.STATUS_DONE
+
+
+def _placeholders_version():
+    return tuple(MediaImage.objects.filter(status=MediaImage.STATUS_DONE).aggregate(
+        count=Count('id'), latest=Max('updated_at'),
+    ).values())
+
+
+_placeholders = None
+_placeholders_stamp = None
+_placeholders_lock = threading.Lock()
+_checked_at = 0.0
+
+
+def get_media_placeholders():
+    """Dosya adı -> (yer tutucu, baskın renk) sözlüğü (işlenmiş media görselleri)
+
+    Görseller ayrı worker sürecinde işlendiğinden sözlük en fazla
+    CACHE_CHECK_SECONDS saniyede bir tek aggregate sorgusuyla
+    kontrol edilip değiştiyse yeniden yüklenir.
+    """
+    global _placeholders, _placeholders_stamp, _checked_at
+
+    check_interval = getattr(settings, 'CACHE_CHECK_SECONDS', 30)
+    now = time.monotonic()
+    if _placeholders is not None and now - _checked_at < check_interval:
+        return _placeholders
+
+    with _placeholders_lock:
+        if _placeholders is None or now - _checked_at >= check_interval:
+            stamp = _placeholders_version()
+            if _placeholders is None or stamp != _placeholders_stamp:
+                _placeholders = {
+                    name: (placeholder, color)
+                    for name, placeholder, color in MediaImage.objects.filter(
+                        status=MediaImage.STATUS_DONE,
+                    ).exclude(color='').values_list('name', 'placeholder', 'color')
+                }
+                _placeholders_stamp = stamp
+            _checked_at = now
+        return _placeholders
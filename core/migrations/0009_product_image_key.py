@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+from core.text import normalize_key
+
+
+def populate_image_key(apps, schema_editor):
+    """Mevcut ürünlerin image_key alanını doldur (çakışanlar boş bırakılır)"""
+    Product = apps.get_model('core', 'Product')
+    prefix = 'products/catalog/'
+    seen = set()
+    for product in Product.objects.order_by('-created_at').only('pk', 'name', 'main_image'):
+        image_name = product.main_image.name or ''
+        if image_name.startswith(prefix):
+            source = image_name[len(prefix):].rsplit('.', 1)[0]
+        else:
+            source = product.name
+        key = normalize_key(source) or None
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        Product.objects.filter(pk=product.pk).update(image_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_product_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_key',
+            field=models.CharField(editable=False, help_text='Katalog görsel dosyasıyla eşleşme anahtarı (Türkçe karakterler normalize edilir).', max_length=200, null=True, unique=True, verbose_name='Görsel Anahtarı'),
+        ),
+        migrations.RunPython(populate_image_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations, transaction
+from django.db.utils import DatabaseError
+
+from core.text import turkish_fold
+
+
+# (tablo, [(alan, ağırlık), ...]) - ilk alan başlık alanıdır
+SEARCH_TABLES = [
+    ('core_product', [('name', 'A'), ('short_description', 'B'), ('description', 'C')]),
+    ('core_blogpost', [('title', 'A'), ('excerpt', 'B'), ('content', 'C')]),
+]
+
+
+def _create_postgres(schema_editor):
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        has_trigram = True
+    except DatabaseError:
+        # Eklenti kurma yetkisi yoksa yalnızca tsvector araması kullanılır
+        has_trigram = False
+
+    for table, fields in SEARCH_TABLES:
+        vector = ' || '.join(
+            f"setweight(to_tsvector('turkish', coalesce({field}, '')), '{weight}')" for field, weight in fields
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        schema_editor.execute(f'CREATE INDEX {table}_search_vector_idx ON {table} USING GIN (search_vector)')
+        if has_trigram:
+            title = fields[0][0]
+            schema_editor.execute(f'CREATE INDEX {table}_{title}_trgm_idx ON {table} USING GIN ({title} gin_trgm_ops)')
+
+
+def _create_sqlite(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, fields in SEARCH_TABLES:
+            fts = f'{table}_fts'
+            columns = ', '.join(field for field, _ in fields)
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+                )
+            except DatabaseError:
+                # FTS5 derlenmemiş SQLite: arama icontains ile devam eder
+                return
+            cursor.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')")
+            cursor.execute(f'SELECT id, {columns} FROM {table}')
+            rows = [[row[0], *(turkish_fold(value or '') for value in row[1:])] for row in cursor.fetchall()]
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f'INSERT INTO {fts} (rowid, {columns}) VALUES (%s, {placeholders})', rows)
+
+
+def create_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _create_postgres(schema_editor)
+    elif vendor == 'sqlite':
+        _create_sqlite(schema_editor)
+
+
+def drop_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, fields in SEARCH_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{fields[0][0]}_trgm_idx')
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_idx')
+            schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_product_image_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_structures, drop_search_structures),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductNeighbors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_key', models.CharField(max_length=200, unique=True, verbose_name='Görsel Anahtarı')),
+                ('neighbors', models.JSONField(default=list, help_text='En benzerden başlayarak image_key listesi', verbose_name='Benzer Ürünler')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Benzer Ürünler',
+                'verbose_name_plural': 'Benzer Ürünler',
+            },
+        ),
+    ]
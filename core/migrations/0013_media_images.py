@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_product_neighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Dosya')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'İşleniyor'), ('done', 'Tamamlandı'), ('failed', 'Hatalı')], default='pending', max_length=20, verbose_name='Durum')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Genişlik')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Yükseklik')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Media Görseli',
+                'verbose_name_plural': 'Media Görselleri',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediaimage',
+            index=models.Index(fields=['status', 'id'], name='mediaimage_status_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_media_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaimage',
+            name='color',
+            field=models.CharField(blank=True, max_length=7, verbose_name='Baskın Renk'),
+        ),
+        migrations.AddField(
+            model_name='mediaimage',
+            name='placeholder',
+            field=models.TextField(blank=True, help_text='Bulanık küçük görsel (data URI)', verbose_name='Yer Tutucu'),
+        ),
+    ]
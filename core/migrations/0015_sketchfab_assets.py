@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:15
+
+import logging
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from core.sketchfab import normalize_uid
+
+
+logger = logging.getLogger(__name__)
+
+
+def link_sketchfab_assets(apps, schema_editor):
+    """Mevcut ürün ve vitrin modellerinin ID/URL girdilerini UID'e çevirip ortak kayda bağla
+
+    UID çıkarılamayan girdiler silinmez: sketchfab_model_id olduğu gibi kalır
+    (admin'de kaydederken doğrulama hatası gösterilir) ve uyarı olarak raporlanır.
+    """
+    SketchfabAsset = apps.get_model('core', 'SketchfabAsset')
+    for model_name in ('Product', 'ShowcaseModel'):
+        model = apps.get_model('core', model_name)
+        for pk, model_id in model.objects.exclude(sketchfab_model_id='').values_list('pk', 'sketchfab_model_id'):
+            uid = normalize_uid(model_id)
+            if uid is None:
+                logger.warning('%s #%s: Sketchfab model ID\'si tanınmadı, bağlanmadı: %r', model_name, pk, model_id)
+                continue
+            SketchfabAsset.objects.get_or_create(uid=uid)
+            model.objects.filter(pk=pk).update(sketchfab_model_id=uid, sketchfab_asset_id=uid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_media_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SketchfabAsset',
+            fields=[
+                ('uid', models.CharField(max_length=32, primary_key=True, serialize=False, verbose_name='Model UID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Sketchfab Modeli',
+                'verbose_name_plural': 'Sketchfab Modelleri',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sketchfab_asset',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='core.sketchfabasset', verbose_name='3D Model'),
+        ),
+        migrations.AddField(
+            model_name='showcasemodel',
+            name='sketchfab_asset',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='showcase_models', to='core.sketchfabasset', verbose_name='3D Model'),
+        ),
+        migrations.RunPython(link_sketchfab_assets, migrations.RunPython.noop),
+    ]
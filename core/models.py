@@ -1,7 +1,12 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
 from django.utils.text import slugify
 
+from .catalog import catalog_file_for_image, image_key_for
+from .sketchfab import embed_url, normalize_uid
+from .text import normalize_key
+
 
 class Category(models.Model):
     """At ekipmanları kategorileri"""
@@ -53,7 +58,59 @@ class Brand(models.Model):
         return self.name
 
 
-class Product(models.Model):
+class SketchfabAsset(models.Model):
+    """Sketchfab 3D modeli - ürünler ve vitrin modelleri bu kayda bağlanır
+
+    Birincil anahtar doğrulanmış UID'dir; bağlı kayıtların sketchfab_asset_id
+    alanı doğrudan UID'i taşır, şablonlar ek sorgu ya da ayrıştırma yapmaz.
+    """
+    uid = models.CharField(max_length=32, primary_key=True, verbose_name="Model UID")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Sketchfab Modeli"
+        verbose_name_plural = "Sketchfab Modelleri"
+
+    @classmethod
+    def for_uid(cls, uid):
+        asset, _ = cls.objects.get_or_create(uid=uid)
+        return asset
+
+    def __str__(self):
+        return self.uid
+
+
+class SketchfabMixin:
+    """sketchfab_model_id (admin girdisi) ve sketchfab_asset alanları olan modeller için ortak davranış"""
+
+    def clean_sketchfab(self):
+        if self.sketchfab_model_id.strip() and normalize_uid(self.sketchfab_model_id) is None:
+            raise ValidationError({
+                'sketchfab_model_id': 'Geçerli bir Sketchfab model ID\'si (32 karakter) ya da model URL\'si girin.',
+            })
+
+    def sync_sketchfab_asset(self):
+        """Girilen ID ya da URL'den UID'i bir kez çıkar, ortak 3D model kaydına bağla"""
+        uid = normalize_uid(self.sketchfab_model_id)
+        if uid is None:
+            self.sketchfab_asset = None
+            return
+        self.sketchfab_model_id = uid
+        if self.sketchfab_asset_id != uid:
+            self.sketchfab_asset = SketchfabAsset.for_uid(uid)
+
+    @property
+    def is_sketchfab(self):
+        """Sketchfab modeli mi kontrol et"""
+        return self.sketchfab_asset_id is not None
+
+    @property
+    def get_sketchfab_embed_url(self):
+        """Sketchfab embed URL'ini döndür - dokunmatik ve etkileşimli"""
+        return embed_url(self.sketchfab_asset_id) if self.sketchfab_asset_id else None
+
+
+class Product(SketchfabMixin, models.Model):
     """Ürünler"""
     STOCK_CHOICES = [
         ('in_stock', 'Stokta'),
@@ -96,12 +153,31 @@ class Product(models.Model):
         verbose_name="Sketchfab Model ID",
         help_text="Sketchfab model ID'si (örnek: 07882e7524534be984ae3e7faca25517). Ürün için 3D model göstermek isterseniz bu alanı doldurun."
     )
+    sketchfab_asset = models.ForeignKey(
+        SketchfabAsset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='products',
+        verbose_name="3D Model",
+    )
     
     # Durumlar
     is_featured = models.BooleanField(default=False, verbose_name="Öne Çıkan")
     is_new = models.BooleanField(default=False, verbose_name="Yeni Ürün")
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
     
+    # Katalog görseli eşleşmesi (kayıt sırasında doldurulur)
+    image_key = models.CharField(
+        max_length=200,
+        unique=True,
+        null=True,
+        editable=False,
+        verbose_name="Görsel Anahtarı",
+        help_text="Katalog görsel dosyasıyla eşleşme anahtarı (Türkçe karakterler normalize edilir)."
+    )
+    
     # SEO
     meta_title = models.CharField(max_length=200, blank=True, verbose_name="Meta Başlık")
     meta_description = models.TextField(blank=True, verbose_name="Meta Açıklama")
@@ -113,11 +189,62 @@ class Product(models.Model):
         verbose_name = "Ürün"
         verbose_name_plural = "Ürünler"
         ordering = ['-created_at']
+        indexes = [
+            # Veritabanı tabanlı listeleme (CATALOG_BACKEND='db') için isim sıralı sayfalama
+            models.Index(fields=['is_active', 'name'], name='product_active_name_idx'),
+            models.Index(fields=['category', 'is_active', 'name'], name='product_cat_active_name_idx'),
+            # İmleçli sayfalama (PAGINATION_MODE='cursor') için (created_at, id) anahtarı
+            models.Index(fields=['is_active', 'created_at', 'id'], name='product_active_created_idx'),
+            models.Index(fields=['category', 'is_active', 'created_at', 'id'], name='product_cat_created_idx'),
+        ]
+
+    def build_image_key(self):
+        """Katalog görselinden geldiyse dosya adından, yoksa ürün adından anahtar üret"""
+        file_name = catalog_file_for_image(self.main_image.name)
+        if file_name:
+            return image_key_for(file_name)
+        return normalize_key(self.name) or None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._image_key_source = instance._key_source()
+        return instance
+
+    def _key_source(self):
+        """Anahtarın türetildiği alanlar (ad, görsel); ertelenmiş alan varsa None"""
+        if self.get_deferred_fields() & {'name', 'main_image'}:
+            return None
+        return (self.name, self.main_image.name)
+
+    def clean(self):
+        super().clean()
+        self.clean_sketchfab()
 
     def save(self, *args, **kwargs):
+        """Anahtar yalnızca ad/görsel değişince ya da anahtar boşken yeniden hesaplanır
+
+        Adları aynı anahtara katlanan ürünlerden yalnızca ilki katalog görseliyle
+        eşleşir; diğerleri 0009 göçündeki gibi boş anahtarla kaydedilir. Çakışma
+        önceden sorgulanmaz, benzersizlik kısıtı yakalanır.
+        """
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        self.sync_sketchfab_asset()
+        source = self._key_source()
+        rebuild = self.image_key is None or source is None or source != getattr(self, '_image_key_source', None)
+        if rebuild:
+            self.image_key = self.build_image_key()
+        if rebuild and self.image_key:
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    super().save(*args, **kwargs)
+            except IntegrityError:
+                self.image_key = None
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._image_key_source = source
 
     def get_absolute_url(self):
         return reverse('core:product_detail', kwargs={'product_name': self.slug})
@@ -127,56 +254,55 @@ class Product(models.Model):
             return round(((self.old_price - self.price) / self.old_price) * 100)
         return 0
     
-    def _extract_sketchfab_model_id(self):
-        """Sketchfab model ID'sini çıkar - tam URL veya sadece ID kabul eder"""
-        if not self.sketchfab_model_id:
-            return None
-        
-        model_id = self.sketchfab_model_id.strip()
-        
-        # Eğer tam URL girildiyse, model ID'yi çıkar
-        if 'sketchfab.com' in model_id:
-            import re
-            match = re.search(r'/models/([a-fA-F0-9]+)', model_id)
-            if match:
-                return match.group(1)
-        
-        # Zaten sadece model ID girilmişse
-        return model_id
-    
-    @property
-    def is_sketchfab(self):
-        """Sketchfab modeli mi kontrol et"""
-        return bool(self._extract_sketchfab_model_id())
-    
-    @property
-    def get_sketchfab_embed_url(self):
-        """Sketchfab embed URL'ini döndür - dokunmatik ve etkileşimli"""
-        model_id = self._extract_sketchfab_model_id()
-        if model_id:
-            params = [
-                "autostart=1",
-                "preload=1",
-                "autospin=0.2",
-                "ui_controls=1",
-                "ui_theme=dark",
-                "transparent=1",
-                "ui_watermark=0",  # Watermark'ı kaldır
-                "camera=0",
-                "scrollwheel=1",
-                "ui_infos=0",
-                "ui_hint=0",
-                "ui_stop=0",
-                "ui_fullscreen=1",
-                "dnt=1",  # izleme azaltma
-                "orbit_drag=1",  # mouse ile sürükleme
-                "pan_drag=1",  # pan için sürükleme
-                "pinch_to_zoom=1",  # mobil pinch zoom
-                "mouse_wheel=1",  # mouse wheel zoom
-                "fov=45"  # Normal görüş açısı
-            ]
-            return f"https://sketchfab.com/models/{model_id}/embed?{'&'.join(params)}"
-        return None
+    def __str__(self):
+        return self.name
+
+
+class ProductNeighbors(models.Model):
+    """Katalog görseli başına benzer ürünler (build_related_products komutuyla çevrimdışı hesaplanır)"""
+    image_key = models.CharField(max_length=200, unique=True, verbose_name="Görsel Anahtarı")
+    neighbors = models.JSONField(default=list, verbose_name="Benzer Ürünler",
+                                 help_text="En benzerden başlayarak image_key listesi")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Benzer Ürünler"
+        verbose_name_plural = "Benzer Ürünler"
+
+    def __str__(self):
+        return self.image_key
+
+
+class MediaImage(models.Model):
+    """Yüklenen media görseli ve arka planda işlenme durumu (process_media_images komutu)"""
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Bekliyor'),
+        (STATUS_PROCESSING, 'İşleniyor'),
+        (STATUS_DONE, 'Tamamlandı'),
+        (STATUS_FAILED, 'Hatalı'),
+    ]
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Dosya")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Durum")
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name="Genişlik")
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name="Yükseklik")
+    placeholder = models.TextField(blank=True, verbose_name="Yer Tutucu", help_text="Bulanık küçük görsel (data URI)")
+    color = models.CharField(max_length=7, blank=True, verbose_name="Baskın Renk")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme")
+    error = models.TextField(blank=True, verbose_name="Hata")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Media Görseli"
+        verbose_name_plural = "Media Görselleri"
+        indexes = [
+            models.Index(fields=['status', 'id'], name='mediaimage_status_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -199,6 +325,9 @@ class BlogPost(models.Model):
         verbose_name = "Blog Yazısı"
         verbose_name_plural = "Blog Yazıları"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'created_at', 'id'], name='blogpost_active_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -212,7 +341,7 @@ class BlogPost(models.Model):
         return self.title
 
 
-class ShowcaseModel(models.Model):
+class ShowcaseModel(SketchfabMixin, models.Model):
     """3D Model showcase - Sketchfab modelleri için"""
     title = models.CharField(max_length=200, verbose_name="Başlık")
     topic = models.CharField(max_length=100, verbose_name="Konu", help_text="Örn: Kalite ve Güven")
@@ -223,6 +352,15 @@ class ShowcaseModel(models.Model):
         verbose_name="Sketchfab Model ID",
         help_text="Sketchfab model ID'si ZORUNLUDUR (örnek: 07882e7524534be984ae3e7faca25517). Sadece Model ID'yi veya tam embed URL'yi girebilirsiniz."
     )
+    sketchfab_asset = models.ForeignKey(
+        SketchfabAsset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='showcase_models',
+        verbose_name="3D Model",
+    )
     button_text = models.CharField(max_length=100, default="KEŞFET", verbose_name="Buton Metni")
     button_url = models.CharField(max_length=200, default="/", verbose_name="Buton URL")
     badge_text = models.CharField(max_length=100, verbose_name="Rozet Metni", help_text="Örn: KALİTE GÜVENCE")
@@ -231,59 +369,13 @@ class ShowcaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    def _extract_sketchfab_model_id(self):
-        """Sketchfab model ID'sini çıkar - tam URL veya sadece ID kabul eder"""
-        if not self.sketchfab_model_id:
-            return None
-        
-        model_id = self.sketchfab_model_id.strip()
-        
-        # Eğer tam URL girildiyse, model ID'yi çıkar
-        if 'sketchfab.com' in model_id:
-            # https://sketchfab.com/models/4dd909743761457e8d916a142a1e3e95/embed
-            # veya
-            # https://sketchfab.com/models/4dd909743761457e8d916a142a1e3e95
-            import re
-            match = re.search(r'/models/([a-fA-F0-9]+)', model_id)
-            if match:
-                return match.group(1)
-        
-        # Zaten sadece model ID girilmişse
-        return model_id
-    
-    @property
-    def is_sketchfab(self):
-        """Sketchfab modeli mi kontrol et"""
-        return bool(self._extract_sketchfab_model_id())
-    
-    @property
-    def get_sketchfab_embed_url(self):
-        """Sketchfab embed URL'ini döndür - dokunmatik ve etkileşimli"""
-        model_id = self._extract_sketchfab_model_id()
-        if model_id:
-            params = [
-                "autostart=1",
-                "preload=1",
-                "autospin=0.2",
-                "ui_controls=1",
-                "ui_theme=dark",
-                "transparent=1",
-                "ui_watermark=0",  # Watermark'ı kaldır
-                "camera=0",
-                "scrollwheel=1",
-                "ui_infos=0",
-                "ui_hint=0",
-                "ui_stop=0",
-                "ui_fullscreen=1",
-                "dnt=1",  # izleme azaltma
-                "orbit_drag=1",  # mouse ile sürükleme
-                "pan_drag=1",  # pan için sürükleme
-                "pinch_to_zoom=1",  # mobil pinch zoom
-                "mouse_wheel=1",  # mouse wheel zoom
-                "fov=45"  # Normal görüş açısı
-            ]
-            return f"https://sketchfab.com/models/{model_id}/embed?{'&'.join(params)}"
-        return None
+    def clean(self):
+        super().clean()
+        self.clean_sketchfab()
+
+    def save(self, *args, **kwargs):
+        self.sync_sketchfab_asset()
+        super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = "Showcase 3D Model"
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .catalog import get_catalog
+
+try:
+    import brotli
+except ImportError:  # brotli kurulu değilse yalnızca gzip üretilir
+    brotli = None
+
+
+# Önbellekli sayfalar için tarayıcı/proxy önbellek süresi üst sınırı (saniye)
+PAGE_MAX_AGE = 60
+
+_ACCEPT_ENCODING = re.compile(r'\b(br|gzip)\b(?:\s*;\s*q\s*=\s*(0(?:\.0+)?)(?![\d.]))?')
+
+
+class RenderedPage:
+    """Bir kez render edilmiş sayfa: ham HTML, sıkıştırılmış varyantlar ve ETag"""
+
+    def __init__(self, content, content_type, expires_at):
+        self.content_type = content_type
+        self.expires_at = expires_at
+        self.variants = {None: content, 'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(content)
+        # Zayıf ETag: sıkıştırılmış varyantlar anlamca aynı içeriği taşır
+        self.etag = 'W/"%s"' % hashlib.md5(content).hexdigest()[:16]
+
+    def _encoding(self, request):
+        """İstemcinin kabul ettiği en iyi sıkıştırma (br > gzip > yok)"""
+        accepted = {
+            name for name, refused in _ACCEPT_ENCODING.findall(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if not refused
+        }
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return encoding
+        return None
+
+    def response(self, request):
+        max_age = max(0, min(PAGE_MAX_AGE, int(self.expires_at - time.time())))
+        if self.etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            encoding = self._encoding(request)
+            response = HttpResponse(self.variants[encoding], content_type=self.content_type)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = self.etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        patch_cache_control(response, public=True, max_age=max_age)
+        return response
+
+
+def _data_version():
+    from .models import Category, ShowcaseModel
+    stamps = []
+    for model in (Category, ShowcaseModel):
+        stats = model.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+        stamps.append((stats['count'], stats['latest']))
+    return tuple(stamps)
+
+
+_pages = {}
+_pages_lock = threading.Lock()
+_data_stamp = None
+_checked_at = 0.0
+
+
+def get_cached_page(name, bucket, expires_at, render):
+    """Önbellekteki sayfayı döndür, geçersizse ``render()`` ile yeniden üret
+
+    Sayfa; zaman dilimi (``bucket``) değişince, katalog değişince ya da
+    Category/ShowcaseModel kaydı değişince yeniden render edilir. Diğer
+    worker'lardaki model değişiklikleri en fazla CACHE_CHECK_SECONDS
+    saniyede bir tek aggregate sorgusuyla kontrol edilir.
+    """
+    global _data_stamp, _checked_at
+
+    catalog = get_catalog()
+    key = (bucket, catalog.source, catalog.version)
+    check_interval = getattr(settings, 'CACHE_CHECK_SECONDS', 30)
+    now = time.monotonic()
+
+    cached = _pages.get(name)
+    if cached is not None and cached[0] == key and now - _checked_at < check_interval:
+        return cached[1]
+
+    # Aynı anda gelen istekler sayfayı bir kez render eder
+    with _pages_lock:
+        if now - _checked_at >= check_interval:
+            data_stamp = _data_version()
+            _checked_at = now
+            if data_stamp != _data_stamp:
+                _pages.clear()
+                _data_stamp = data_stamp
+        cached = _pages.get(name)
+        if cached is None or cached[0] != key:
+            content, content_type = render()
+            cached = (key, RenderedPage(content, content_type, expires_at))
+            _pages[name] = cached
+        return cached[1]
+
+
+def invalidate_pages():
+    """Category/ShowcaseModel değişince önbellekli sayfaları bu worker'da at"""
+    global _checked_at
+    with _pages_lock:
+        _pages.clear()
+        _checked_at = 0.0
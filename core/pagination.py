@@ -0,0 +1,241 @@
+import base64
+import bisect
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+# Sayfalama sayımlarının önbellekte tutulma süresi (saniye)
+COUNT_CACHE_SECONDS = 60
+
+NEXT, PREVIOUS = 'n', 'p'
+
+
+def use_cursor_pagination():
+    """PAGINATION_MODE='cursor' ise listelemeler sayfa numarası yerine imleçle sayfalanır"""
+    return getattr(settings, 'PAGINATION_MODE', 'page') == 'cursor'
+
+
+def _count_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode('utf-8')).hexdigest()
+    return f'pagination-count:{digest}'
+
+
+def cached_count(queryset):
+    """Sorgunun satır sayısı - aynı SQL için COUNT_CACHE_SECONDS boyunca önbellekten"""
+    key = _count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_SECONDS)
+    return count
+
+
+async def acached_count(queryset):
+    """cached_count'un async karşılığı (ASGI görünümleri)"""
+    key = _count_key(queryset)
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, COUNT_CACHE_SECONDS)
+    return count
+
+
+def page_count(page):
+    """Sayfanın ait olduğu listenin toplam kayıt sayısı (her iki mod için)"""
+    if getattr(page, 'cursor_mode', False):
+        return page.count
+    return page.paginator.count
+
+
+class CachedCountPaginator(Paginator):
+    """COUNT(*) sonucunu önbellekten okuyan Paginator (sayfa numaralı mod için)"""
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return cached_count(self.object_list)
+        return len(self.object_list)
+
+    async def aget_page(self, number):
+        """get_page'in async karşılığı: sayım ve sayfa satırları async ORM ile okunur"""
+        if hasattr(self.object_list, 'query') and 'count' not in self.__dict__:
+            self.count = await acached_count(self.object_list)
+        page = self.get_page(number)
+        if hasattr(page.object_list, 'query'):
+            page.object_list = [obj async for obj in page.object_list]
+        return page
+
+
+def encode_cursor(direction, values):
+    """İmleç değerlerini URL'de taşınabilir opak bir metne çevir"""
+    raw = json.dumps([direction, values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token):
+    """encode_cursor'ın tersi; geçersiz imleçte None (ilk sayfa gösterilir)"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class CursorPage:
+    """İmleçli sayfa - şablonlar Paginator sayfası gibi has_next/has_previous kullanır
+
+    Sayfa numarası yoktur; önceki/sonraki bağlantılar previous_cursor ve
+    next_cursor ile kurulur.
+    """
+
+    cursor_mode = True
+
+    def __init__(self, object_list, previous_cursor, next_cursor, count):
+        self.object_list = object_list
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """QuerySet'i (created_at, id) gibi benzersiz bir anahtar üzerinden sayfala
+
+    OFFSET yerine "anahtar imleçten küçük/büyük" filtresi ve LIMIT kullanılır;
+    anahtar sütunları indeksliyse 500. sayfa 1. sayfa kadar ucuzdur. Anahtarın
+    son alanı benzersiz olmalıdır (genellikle id). Alanlar '-' ile azalan sıra
+    belirtir; tüm alanlar aynı yönde olmalıdır.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = ordering[0].startswith('-')
+        if any(name.startswith('-') != self.descending for name in ordering):
+            raise ValueError('Anahtar alanlarının hepsi aynı yönde sıralanmalı')
+        self.ordering = list(ordering)
+        self._model_fields = [queryset.model._meta.get_field(name) for name in self.fields]
+
+    def _key(self, obj):
+        return [field.value_to_string(obj) for field in self._model_fields]
+
+    def _parse(self, values):
+        if len(values) != len(self.fields):
+            raise ValueError('İmleç alan sayısı uyuşmuyor')
+        return [field.to_python(value) for field, value in zip(self._model_fields, values)]
+
+    def _after(self, values, forward):
+        """Anahtar sırasında imleçten sonra (forward) ya da önce gelen kayıtların koşulu"""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            term = Q(**{f'{name}__{lookup}': values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                term &= Q(**{prev_name: prev_value})
+            condition |= term
+        return condition
+
+    def _page_query(self, token):
+        """İmleçten sayfa sorgusu (bir fazla satır; sonraki sayfa var mı diye), yön ve anahtar değerleri"""
+        cursor = decode_cursor(token)
+        direction, values = cursor if cursor else (NEXT, None)
+        try:
+            values = self._parse(values) if values is not None else None
+        except (ValueError, TypeError, ValidationError):
+            direction, values = NEXT, None
+
+        forward = direction == NEXT
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._after(values, forward))
+        if forward:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*[name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering])
+
+        return queryset[:self.per_page + 1], forward, values
+
+    def _make_page(self, rows, forward, values, count):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = encode_cursor(NEXT, self._key(rows[-1])) if rows and has_next else None
+        previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0])) if rows and has_previous else None
+        return CursorPage(rows, previous_cursor, next_cursor, count)
+
+    def get_page(self, token):
+        queryset, forward, values = self._page_query(token)
+        return self._make_page(list(queryset), forward, values, cached_count(self.queryset))
+
+    async def aget_page(self, token):
+        """get_page'in async karşılığı (sorgular async ORM ile)"""
+        queryset, forward, values = self._page_query(token)
+        rows = [obj async for obj in queryset]
+        return self._make_page(rows, forward, values, await acached_count(self.queryset))
+
+
+class SortedListCursorPaginator:
+    """Sıralı bir listeyi (katalog dosya adları) imleçle sayfala
+
+    İmleç sayfanın ilk/son dosya adıdır; konumu ikili aramayla bulunur, liste
+    baştan taranmaz.
+    """
+
+    def __init__(self, sorted_items, per_page):
+        self.items = sorted_items
+        self.per_page = per_page
+
+    def get_page(self, token):
+        cursor = decode_cursor(token)
+        start = 0
+        if cursor and len(cursor[1]) == 1 and isinstance(cursor[1][0], str):
+            direction, (key,) = cursor
+            if direction == NEXT:
+                start = bisect.bisect_right(self.items, key)
+            else:
+                start = max(0, bisect.bisect_left(self.items, key) - self.per_page)
+
+        end = min(start + self.per_page, len(self.items))
+        rows = self.items[start:end]
+        next_cursor = encode_cursor(NEXT, [rows[-1]]) if rows and end < len(self.items) else None
+        previous_cursor = encode_cursor(PREVIOUS, [rows[0]]) if rows and start > 0 else None
+        return CursorPage(rows, previous_cursor, next_cursor, len(self.items))
+
+    async def aget_page(self, token):
+        """get_page ile aynı (liste bellekte); async görünümler tüm sayfalayıcıları aynı arayüzle çağırır"""
+        return self.get_page(token)
@@ -0,0 +1,70 @@
+import base64
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+
+# Yer tutucu ızgaranın uzun kenarındaki hücre sayısı (6 -> ~75 baytlık WebP)
+PLACEHOLDER_CELLS = 6
+
+# Analiz öncesi görselin küçültüleceği boyut (piksel)
+ANALYSIS_SIZE = 64
+
+# Baskın renk için kanal başına seviye sayısı (16 -> 4096 renk kutusu)
+COLOR_LEVELS = 16
+
+
+def analyze(image):
+    """Görselden (yer tutucu data URI, baskın renk '#rrggbb')
+
+    Saydam görsellerde yer tutucu saydam alanların arkasında kalacağından
+    (None, None) döner.
+    """
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        return None, None
+    small = image.convert('RGB')
+    if max(small.size) > ANALYSIS_SIZE:
+        small.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.uint8)
+    return placeholder_uri(block_means(pixels, PLACEHOLDER_CELLS)), dominant_color(pixels)
+
+
+def analyze_file(path):
+    """Dosyadaki görsel için analyze(); JPEG'ler küçük boyutta çözülür"""
+    with Image.open(path) as image:
+        image.draft('RGB', (ANALYSIS_SIZE, ANALYSIS_SIZE))
+        return analyze(ImageOps.exif_transpose(image))
+
+
+def block_means(pixels, cells):
+    """Pikselleri en-boy oranı korunan cells hücrelik ızgaraya ortalamayla indir (h x w x 3)"""
+    height, width = pixels.shape[:2]
+    if width >= height:
+        grid_w, grid_h = cells, max(1, round(cells * height / width))
+    else:
+        grid_w, grid_h = max(1, round(cells * width / height)), cells
+    grid_w, grid_h = min(grid_w, width), min(grid_h, height)
+
+    rows = np.linspace(0, height, grid_h + 1).astype(np.intp)
+    columns = np.linspace(0, width, grid_w + 1).astype(np.intp)
+    sums = np.add.reduceat(np.add.reduceat(pixels.astype(np.float32), rows[:-1], axis=0), columns[:-1], axis=1)
+    counts = np.outer(np.diff(rows), np.diff(columns))[..., None]
+    return sums / counts
+
+
+def placeholder_uri(means):
+    """Hücre ortalamalarını WebP data URI'sine çevir (tarayıcı büyütürken bulanıklaştırır)"""
+    buffer = io.BytesIO()
+    Image.fromarray(np.rint(means).astype(np.uint8), 'RGB').save(buffer, 'WEBP', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def dominant_color(pixels):
+    """En kalabalık renk kutusundaki piksellerin ortalaması ('#rrggbb')"""
+    flat = pixels.reshape(-1, 3)
+    quantized = (flat // (256 // COLOR_LEVELS)).astype(np.intp)
+    bins = (quantized[:, 0] * COLOR_LEVELS + quantized[:, 1]) * COLOR_LEVELS + quantized[:, 2]
+    top = np.bincount(bins, minlength=COLOR_LEVELS ** 3).argmax()
+    red, green, blue = np.rint(flat[bins == top].mean(axis=0)).astype(int)
+    return f'#{red:02x}{green:02x}{blue:02x}'
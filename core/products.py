@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .catalog import get_catalog
+from .categories import get_category_registry
+from .search import tokenize
+
+
+# Detay sayfasında gösterilen ilgili ürün sayısı
+RELATED_COUNT = 4
+
+# Kayıtta saklanan sıralı aday sayısı (DB modunda ürünü olmayan dosyalar atlanınca yedek)
+RELATED_CANDIDATES = 12
+
+# Bu kadar çok dosyada geçen kelimeler (örn. "at") benzerlik için sayılmaz
+COMMON_TOKEN_LIMIT = 500
+
+# Katalogdaki bir dosyanın detay sayfası için önceden hesaplanmış kaydı
+ProductRecord = namedtuple('ProductRecord', ['file_name', 'category', 'category_id', 'product_id', 'related'])
+
+
+def rank_related(files, count=RELATED_CANDIDATES):
+    """Aynı kategorideki dosyalar için ilgili ürün sıralaması
+
+    Dosya adlarındaki ortak kelime sayısına göre (çok -> az), eşitlikte
+    alfabetik sırayla; ortak kelimesi olmayanlar listeyi alfabetik tamamlar.
+    Kelime -> dosya listeleri üzerinden sayılır; çok yaygın kelimeler
+    atlandığı için kategori büyüdükçe tüm ikililer karşılaştırılmaz.
+    """
+    files = sorted(files)
+    tokens = {name: set(tokenize(name.rsplit('.', 1)[0])) for name in files}
+    postings = defaultdict(list)
+    for name in files:
+        for token in tokens[name]:
+            postings[token].append(name)
+
+    related = {}
+    for name in files:
+        shared = defaultdict(int)
+        for token in tokens[name]:
+            if len(postings[token]) > COMMON_TOKEN_LIMIT:
+                continue
+            for other in postings[token]:
+                if other != name:
+                    shared[other] += 1
+        ranked = sorted(shared, key=lambda other: (-shared[other], other))[:count]
+        if len(ranked) < count:
+            taken = set(ranked)
+            taken.add(name)
+            ranked.extend(other for other in files[:count + len(taken)] if other not in taken)
+            ranked = ranked[:count]
+        related[name] = tuple(ranked)
+    return related
+
+
+_related = (None, {})
+
+
+def _related_for(catalog, neighbors_stamp):
+    """Katalog ve komşu tablosu sürümü başına bir kez kurulan dosya -> ilgili dosyalar sözlüğü
+
+    build_related_products komutunun ProductNeighbors tablosuna yazdığı
+    komşular kullanılır; tabloda olmayan dosyalar için kategori içi kelime
+    sıralamasına (rank_related) düşülür.
+    """
+    global _related
+    version = (catalog.source, catalog.version, neighbors_stamp)
+    if _related[0] != version:
+        related = {}
+        for files in catalog.category_products.values():
+            related.update(rank_related(files))
+        key_to_file = {}
+        for entry in catalog.entries.values():
+            key_to_file.setdefault(entry.key, entry.name)
+        for image_key, keys in _load_neighbors():
+            file_name = key_to_file.get(image_key)
+            files = [key_to_file[key] for key in keys if key in key_to_file and key != image_key]
+            if file_name and files:
+                related[file_name] = tuple(files[:RELATED_CANDIDATES])
+        _related = (version, related)
+    return _related[1]
+
+
+class ProductRecords:
+    """Dosya adı -> ProductRecord sözlüğü (worker başına kurulur)
+
+    İlgili ürün sıralaması yalnızca katalog ya da komşu tablosu değişince
+    kurulur; Product ya da Category değişince yalnızca pk eşlemeleri yenilenir.
+    """
+
+    def __init__(self, catalog, registry, product_ids, neighbors_stamp=None):
+        self.catalog_version = (catalog.source, catalog.version)
+        self.registry = registry
+        self.records = {}
+        related = _related_for(catalog, neighbors_stamp)
+        for entry in catalog.entries.values():
+            category = registry.get(entry.category)
+            self.records[entry.name] = ProductRecord(
+                entry.name,
+                entry.category,
+                category.pk if category is not None else None,
+                product_ids.get(entry.key),
+                related[entry.name],
+            )
+
+    def get(self, file_name):
+        return self.records.get(file_name)
+
+
+def _load_product_ids():
+    from .models import Product
+    return dict(
+        Product.objects.filter(is_active=True, image_key__isnull=False).values_list('image_key', 'pk')
+    )
+
+
+def _load_neighbors():
+    from .models import ProductNeighbors
+    return ProductNeighbors.objects.values_list('image_key', 'neighbors').iterator(chunk_size=2000)
+
+
+def _products_version():
+    from .models import Product, ProductNeighbors
+    stats = Product.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    neighbors = ProductNeighbors.objects.aggregate(count=Count('id'), latest=Max('computed_at'))
+    return (stats['count'], stats['latest'], neighbors['count'], neighbors['latest'])
+
+
+_records = None
+_records_lock = threading.Lock()
+_products_stamp = None
+_checked_at = 0.0
+
+
+def get_product_records():
+    """Worker'ın ürün kayıtlarını döndür
+
+    Katalog ya da kategori kaydı değişince yeniden kurulur; Product
+    değişiklikleri bu worker'da sinyallerle, diğer worker'larda ve
+    build_related_products çalıştırıldığında en fazla
+    CACHE_CHECK_SECONDS saniyede bir aggregate sorgusuyla yakalanır.
+    """
+    global _records, _products_stamp, _checked_at
+
+    catalog = get_catalog()
+    catalog_version = (catalog.source, catalog.version)
+    registry = get_category_registry()
+    check_interval = getattr(settings, 'CACHE_CHECK_SECONDS', 30)
+    now = time.monotonic()
+
+    records = _records
+    if (records is not None and records.catalog_version == catalog_version
+            and records.registry is registry and now - _checked_at < check_interval):
+        return records
+
+    with _records_lock:
+        products_stamp = _products_version()
+        _checked_at = now
+        if (_records is None or _records.catalog_version != catalog_version
+                or _records.registry is not registry or products_stamp != _products_stamp):
+            _records = ProductRecords(catalog, registry, _load_product_ids(), products_stamp[2:])
+            _products_stamp = products_stamp
+        return _records
+
+
+def invalidate_product_records():
+    """Product kaydedilince/silinince bir sonraki istekte kayıtları yeniden kur"""
+    global _records
+    with _records_lock:
+        _records = None
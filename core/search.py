@@ -0,0 +1,252 @@
+import bisect
+import copy
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .catalog import get_catalog
+from .text import turkish_fold
+
+
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+# Alan ağırlıkları: dosya/ürün adı en önemli, açıklama en az
+FIELD_WEIGHTS = {
+    'file': 3,
+    'name': 3,
+    'material': 2,
+    'color': 2,
+    'short_description': 1,
+}
+
+# Tam kelime eşleşmesi önek eşleşmesinden daha değerlidir
+EXACT_MATCH_BONUS = 2
+
+PRODUCT_FIELDS = ('name', 'short_description', 'material', 'color')
+
+
+def tokenize(text):
+    """Türkçe katlama yapıp metni kelimelere ayır ('Açık_Nal' -> ['acik', 'nal'])"""
+    return [token for token in _TOKEN_SPLIT.split(turkish_fold(text)) if token]
+
+
+def _weigh(fields):
+    """(alan, metin) çiftlerinden kelime -> en yüksek ağırlık sözlüğü"""
+    weights = {}
+    for field, text in fields:
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            if weight > weights.get(token, 0):
+                weights[token] = weight
+    return weights
+
+
+def _product_weights(product):
+    return _weigh((field, getattr(product, field)) for field in PRODUCT_FIELDS)
+
+
+def _merge(base, extra):
+    """İki kelime -> ağırlık sözlüğünü birleştir (yüksek ağırlık kazanır)"""
+    weights = dict(base)
+    for token, weight in extra.items():
+        if weight > weights.get(token, 0):
+            weights[token] = weight
+    return weights
+
+
+class SearchIndex:
+    """Katalog için bellek içi ters indeks.
+
+    Belgeler katalogdaki dosya adlarıdır; her belge dosya adındaki kelimelerle
+    ve image_key ile eşleşen Product'ın ad, kısa açıklama, malzeme ve renk
+    alanlarıyla indekslenir. Sorgu kelimeleri sıralı kelime listesinde ikili
+    aramayla önek olarak eşleştirilir, tüm kelimeleri içeren belgeler puana
+    göre sıralanır.
+
+    Yayımlanmış indeks değiştirilmez: ürün güncellemeleri copy() ile alınan
+    kopyaya uygulanır (posting listeleri de kopyalanarak), kopya eskisinin
+    yerine konur. Kilitsiz arama yapan thread'ler tutarlı bir anlık görüntü okur.
+    """
+
+    def __init__(self, catalog, products=()):
+        self.catalog_version = (catalog.source, catalog.version)
+        self._postings = defaultdict(dict)
+        self._tokens = []
+        self._doc_tokens = {}
+        self._file_tokens = {}
+        self._product_docs = {}
+        self._key_to_file = {}
+
+        for entry in catalog.entries.values():
+            self._key_to_file[entry.key] = entry.name
+            self._file_tokens[entry.name] = _weigh([('file', entry.display_name)])
+        docs = dict(self._file_tokens)
+
+        for product in products:
+            doc = self._key_to_file.get(product.image_key) if product.is_active else None
+            if doc is not None:
+                docs[doc] = _merge(self._file_tokens[doc], _product_weights(product))
+                self._product_docs[product.pk] = doc
+
+        # İlk kurulumda posting listeleri toplu doldurulur, kelime listesi bir kez sıralanır
+        for doc, weights in docs.items():
+            for token, weight in weights.items():
+                self._postings[token][doc] = weight
+        self._doc_tokens = docs
+        self._tokens = sorted(self._postings)
+
+    def copy(self):
+        """Güncellenecek kopya - dosya kelimeleri ve anahtar eşlemesi paylaşılır, değişmezler"""
+        clone = copy.copy(self)
+        clone._postings = defaultdict(dict, self._postings)
+        clone._tokens = list(self._tokens)
+        clone._doc_tokens = dict(self._doc_tokens)
+        clone._product_docs = dict(self._product_docs)
+        return clone
+
+    def _set_doc(self, doc, weights):
+        """Belgenin kelimelerini değiştir, posting listelerini artımlı güncelle
+
+        Değişen posting listeleri yerinde değil kopyalanarak güncellenir; aynı
+        listeleri paylaşan önceki indeks etkilenmez.
+        """
+        old = self._doc_tokens.get(doc, {})
+        for token in old.keys() - weights.keys():
+            postings = {key: value for key, value in self._postings.get(token, {}).items() if key != doc}
+            if postings:
+                self._postings[token] = postings
+            else:
+                self._postings.pop(token, None)
+                index = bisect.bisect_left(self._tokens, token)
+                if index < len(self._tokens) and self._tokens[index] == token:
+                    del self._tokens[index]
+        for token, weight in weights.items():
+            postings = dict(self._postings.get(token) or {})
+            if not postings:
+                bisect.insort(self._tokens, token)
+            postings[doc] = weight
+            self._postings[token] = postings
+        self._doc_tokens[doc] = weights
+
+    def update_product(self, product):
+        """Product kaydının alanlarını eşleştiği katalog belgesine yansıt"""
+        previous_doc = self._product_docs.pop(product.pk, None)
+        if previous_doc is not None:
+            self._set_doc(previous_doc, self._file_tokens[previous_doc])
+
+        doc = self._key_to_file.get(product.image_key) if product.is_active else None
+        if doc is None:
+            return
+        self._product_docs[product.pk] = doc
+        self._set_doc(doc, _merge(self._file_tokens[doc], _product_weights(product)))
+
+    def remove_product(self, product):
+        """Silinen ürünün alanlarını belgeden çıkar"""
+        doc = self._product_docs.pop(product.pk, None)
+        if doc is not None:
+            self._set_doc(doc, self._file_tokens[doc])
+
+    def search(self, query, within=None):
+        """Sorgu kelimelerinin hepsini (önek olarak) içeren dosyaları puana göre sırala
+
+        ``within`` verilirse sonuçlar bu dosyalarla sınırlandırılır.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            term_scores = {}
+            index = bisect.bisect_left(self._tokens, term)
+            while index < len(self._tokens) and self._tokens[index].startswith(term):
+                token = self._tokens[index]
+                bonus = EXACT_MATCH_BONUS if token == term else 1
+                for doc, weight in self._postings.get(token, {}).items():
+                    score = weight * bonus
+                    if score > term_scores.get(doc, 0):
+                        term_scores[doc] = score
+                index += 1
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: scores[doc] + score for doc, score in term_scores.items() if doc in scores}
+            if not scores:
+                return []
+
+        if within is not None:
+            within = within if isinstance(within, (set, frozenset, dict)) else set(within)
+            scores = {doc: score for doc, score in scores.items() if doc in within}
+        return sorted(scores, key=lambda doc: (-scores[doc], doc))
+
+
+def _load_products():
+    from .models import Product
+    return Product.objects.filter(is_active=True, image_key__isnull=False).only('pk', 'image_key', 'is_active', *PRODUCT_FIELDS)
+
+
+def _products_version():
+    from .models import Product
+    stats = Product.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    return (stats['count'], stats['latest'])
+
+
+_index = None
+_index_lock = threading.Lock()
+_products_checked_at = 0.0
+_products_stamp = None
+
+
+def get_search_index():
+    """Worker'ın arama indeksini döndür
+
+    Katalog değişince yeniden kurulur. Product tablosu aynı worker'da
+    sinyallerle artımlı güncellenir; diğer worker'lardaki değişiklikler için
+    en fazla SEARCH_INDEX_CHECK_SECONDS saniyede bir tek bir aggregate sorgusu
+    yapılır.
+    """
+    global _index, _products_checked_at, _products_stamp
+
+    catalog = get_catalog()
+    catalog_version = (catalog.source, catalog.version)
+    check_interval = getattr(settings, 'SEARCH_INDEX_CHECK_SECONDS', 30)
+    now = time.monotonic()
+
+    index = _index
+    if index is not None and index.catalog_version == catalog_version and now - _products_checked_at < check_interval:
+        return index
+
+    with _index_lock:
+        products_stamp = _products_version()
+        _products_checked_at = now
+        if _index is None or _index.catalog_version != catalog_version or products_stamp != _products_stamp:
+            _index = SearchIndex(catalog, _load_products())
+            _products_stamp = products_stamp
+        return _index
+
+
+def product_saved(product):
+    """post_save: indeks kurulmuşsa ürünü artımlı güncelle"""
+    global _index, _products_stamp
+    with _index_lock:
+        if _index is not None:
+            index = _index.copy()
+            index.update_product(product)
+            _index = index
+            _products_stamp = _products_version()
+
+
+def product_deleted(product):
+    """post_delete: indeks kurulmuşsa ürünü belgeden çıkar"""
+    global _index, _products_stamp
+    with _index_lock:
+        if _index is not None:
+            index = _index.copy()
+            index.remove_product(product)
+            _index = index
+            _products_stamp = _products_version()
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import mediaimages, search
+from .categories import invalidate_categories
+from .fulltext import get_search_backend, set_trigram_threshold
+from .models import BlogPost, Brand, Category, Product, ShowcaseModel
+from .pagecache import invalidate_pages
+from .products import invalidate_product_records
+from .suggest import invalidate_suggestions
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """Yeni veritabanı bağlantısında arama ayarlarını uygula"""
+    set_trigram_threshold(connection)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    """Ürün kaydedilince arama indekslerini güncelle"""
+    search.product_saved(instance)
+    invalidate_suggestions()
+    invalidate_product_records()
+    get_search_backend(kwargs.get('using') or 'default').index(instance)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    """Ürün silinince arama indekslerinden çıkar"""
+    search.product_deleted(instance)
+    invalidate_suggestions()
+    invalidate_product_records()
+    get_search_backend(kwargs.get('using') or 'default').remove(instance)
+
+
+@receiver(post_save, sender=BlogPost)
+def blog_post_saved(sender, instance, **kwargs):
+    """Blog yazısı kaydedilince tam metin indeksini güncelle"""
+    get_search_backend(kwargs.get('using') or 'default').index(instance)
+
+
+@receiver(post_delete, sender=BlogPost)
+def blog_post_deleted(sender, instance, **kwargs):
+    """Blog yazısı silinince tam metin indeksinden çıkar"""
+    get_search_backend(kwargs.get('using') or 'default').remove(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Kategori değişince kategori kaydını, arama önerilerini ve önbellekli sayfaları yenile"""
+    invalidate_categories()
+    invalidate_suggestions()
+    invalidate_pages()
+
+
+@receiver(post_save, sender=ShowcaseModel)
+@receiver(post_delete, sender=ShowcaseModel)
+def showcase_changed(sender, instance, **kwargs):
+    """Vitrin modeli değişince önbellekli ana sayfayı yenile"""
+    invalidate_pages()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=BlogPost)
+def image_owner_saved(sender, instance, **kwargs):
+    """Yüklenen görselleri arka plan işleme kuyruğuna ekle (işlem commit edildikten sonra)"""
+    names = mediaimages.image_names(instance)
+    if names:
+        transaction.on_commit(lambda: mediaimages.enqueue(names), using=kwargs.get('using'))
@@ -0,0 +1,126 @@
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from .search import tokenize
+
+
+# Kelime özellikleri için hash'lenmiş vektör boyutu
+TEXT_DIMENSIONS = 256
+
+# Renk histogramı: kanal başına aralık sayısı (4 -> 4*4*4 = 64 boyut)
+COLOR_BINS = 4
+
+# Histogram için görselin küçültüleceği boyut (piksel)
+HISTOGRAM_IMAGE_SIZE = 64
+
+# Benzerlik = TEXT_WEIGHT * kelime benzerliği + COLOR_WEIGHT * renk benzerliği
+TEXT_WEIGHT = 0.7
+COLOR_WEIGHT = 0.3
+
+
+def product_tokens(entry, attributes=None):
+    """Katalog kaydı ve eşleşen Product alanlarından (malzeme, renk, marka) kelimeler
+
+    Kategori ayrı bir önekle eklenir; aynı kategorideki ürünler bu kelimeyi paylaşır.
+    """
+    tokens = tokenize(entry.display_name)
+    for value in (attributes or ()):
+        tokens.extend(tokenize(value))
+    tokens.append(f'kategori:{entry.category}')
+    return tokens
+
+
+def text_vectors(token_lists, dimensions=TEXT_DIMENSIONS):
+    """Kelime listelerinden L2 normalize, IDF ağırlıklı, hash'lenmiş vektörler (n x dimensions)"""
+    unique_lists = [set(tokens) for tokens in token_lists]
+    document_frequency = {}
+    for tokens in unique_lists:
+        for token in tokens:
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+
+    count = len(unique_lists)
+    buckets = {}
+    for token, frequency in document_frequency.items():
+        hashed = zlib.crc32(token.encode('utf-8'))
+        # Çakışan kelimelerin birbirini büyütmemesi için işaretli hash
+        sign = 1.0 if hashed & 0x80000000 else -1.0
+        buckets[token] = (hashed % dimensions, sign * (np.log((1 + count) / (1 + frequency)) + 1.0))
+
+    rows, columns, values = [], [], []
+    for row, tokens in enumerate(unique_lists):
+        for token in tokens:
+            column, weight = buckets[token]
+            rows.append(row)
+            columns.append(column)
+            values.append(weight)
+
+    vectors = np.zeros((count, dimensions), dtype=np.float32)
+    np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), values)
+    return _normalize(vectors)
+
+
+def color_histogram(path):
+    """Görselin renk histogramı (COLOR_BINS^3 boyut, Hellinger için karekökü alınmış)
+
+    Okunamayan görsellerde sıfır vektör döner; benzerlik yalnızca kelimelerden gelir.
+    """
+    size = COLOR_BINS ** 3
+    try:
+        with Image.open(path) as image:
+            # JPEG'lerde draft, çözümlemeyi küçük boyutta yapar
+            image.draft('RGB', (HISTOGRAM_IMAGE_SIZE, HISTOGRAM_IMAGE_SIZE))
+            image = image.convert('RGB')
+            image.thumbnail((HISTOGRAM_IMAGE_SIZE, HISTOGRAM_IMAGE_SIZE))
+            pixels = np.asarray(image, dtype=np.uint8).reshape(-1, 3)
+    except (OSError, ValueError):
+        return np.zeros(size, dtype=np.float32)
+
+    quantized = (pixels // (256 // COLOR_BINS)).astype(np.intp)
+    indexes = (quantized[:, 0] * COLOR_BINS + quantized[:, 1]) * COLOR_BINS + quantized[:, 2]
+    histogram = np.bincount(indexes, minlength=size).astype(np.float32)
+    total = histogram.sum()
+    return np.sqrt(histogram / total) if total else histogram
+
+
+def combine(text, colors):
+    """Kelime ve renk vektörlerini tek vektörde birleştir
+
+    Her iki parça birim uzunlukta olduğundan iç çarpım
+    TEXT_WEIGHT * kelime kosinüsü + COLOR_WEIGHT * renk kosinüsü olur.
+    """
+    return np.hstack([
+        np.float32(np.sqrt(TEXT_WEIGHT)) * text,
+        np.float32(np.sqrt(COLOR_WEIGHT)) * _normalize(colors),
+    ]).astype(np.float32)
+
+
+def top_k_neighbors(vectors, k, batch_size=1024):
+    """Her satır için en benzer k satırın indeksleri (benzerlik sırasıyla)
+
+    Benzerlikler batch_size satırlık bloklar halinde tek matris çarpımıyla
+    hesaplanır; bellek kullanımı batch_size x n ile sınırlıdır.
+    """
+    count = len(vectors)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.zeros((count, 0), dtype=np.intp)
+
+    neighbors = np.empty((count, k), dtype=np.intp)
+    for start in range(0, count, batch_size):
+        end = min(start + batch_size, count)
+        similarities = vectors[start:end] @ vectors.T
+        rows = np.arange(end - start)
+        # Ürünün kendisi komşu olmasın
+        similarities[rows, rows + start] = -np.inf
+        candidates = np.argpartition(similarities, -k, axis=1)[:, -k:]
+        order = np.argsort(-np.take_along_axis(similarities, candidates, axis=1), axis=1, kind='stable')
+        neighbors[start:end] = np.take_along_axis(candidates, order, axis=1)
+    return neighbors
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -0,0 +1,243 @@
+import functools
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import urllib.request
+
+from django.apps import apps
+from django.conf import settings
+from django.utils.module_loading import import_string
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+# Sketchfab model UID'i (32 haneli onaltılık); tam URL girildiyse içinden çıkarılır
+_UID = re.compile(r'^[0-9a-f]{32}$')
+_URL_UID = re.compile(r'models/(?:[\w-]*-)?([0-9a-f]{32})', re.I)
+
+# Posterlerin ve meta verilerin MEDIA_ROOT altındaki klasörü (thumbnail/serve_media ile sunulur)
+POSTERS_DIR = 'sketchfab'
+
+# Poster için istenen en küçük genişlik (piksel); kartlar /thumb/ ile küçültülür
+POSTER_WIDTH = 1024
+
+# Başarılı kayıtların yenilenme ve başarısız denemelerin tekrar süresi (saniye)
+POSTER_MAX_AGE = 7 * 24 * 3600
+RETRY_AFTER = 3600
+
+# Sketchfab'den gelen poster dosyası için üst sınır (bayt)
+MAX_POSTER_BYTES = 10 * 1024 * 1024
+
+_FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+class UrllibClient:
+    """Varsayılan HTTP istemcisi (standart kütüphane)
+
+    SKETCHFAB_HTTP_CLIENT ile aynı arayüzde (``Client(timeout)``,
+    ``get(url, max_bytes) -> bytes``, hata durumunda OSError) başka bir sınıf
+    verilebilir; testler SKETCHFAB_API_URL ile yerel bir sunucuya yönlenebilir.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def get(self, url, max_bytes=MAX_POSTER_BYTES):
+        request = urllib.request.Request(url, headers={'User-Agent': 'sarac-ihsan/1.0', 'Accept': '*/*'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = response.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise OSError(f'Yanıt çok büyük: {url}')
+        return data
+
+
+def get_client():
+    client_class = import_string(getattr(settings, 'SKETCHFAB_HTTP_CLIENT', 'core.sketchfab.UrllibClient'))
+    return client_class(timeout=getattr(settings, 'SKETCHFAB_HTTP_TIMEOUT', 10))
+
+
+def get_api_url():
+    return getattr(settings, 'SKETCHFAB_API_URL', 'https://api.sketchfab.com/v3').rstrip('/')
+
+
+def normalize_uid(value):
+    """Model ID'si ya da Sketchfab URL'sinden UID; geçersizse None"""
+    value = (value or '').strip()
+    if 'sketchfab.com' in value:
+        match = _URL_UID.search(value)
+        value = match.group(1) if match else ''
+    value = value.lower()
+    return value if _UID.match(value) else None
+
+
+# Embed iframe parametreleri - dokunmatik ve etkileşimli
+EMBED_PARAMS = (
+    "autostart=1",
+    "preload=1",
+    "autospin=0.2",
+    "ui_controls=1",
+    "ui_theme=dark",
+    "transparent=1",
+    "ui_watermark=0",  # Watermark'ı kaldır
+    "camera=0",
+    "scrollwheel=1",
+    "ui_infos=0",
+    "ui_hint=0",
+    "ui_stop=0",
+    "ui_fullscreen=1",
+    "dnt=1",  # izleme azaltma
+    "orbit_drag=1",  # mouse ile sürükleme
+    "pan_drag=1",  # pan için sürükleme
+    "pinch_to_zoom=1",  # mobil pinch zoom
+    "mouse_wheel=1",  # mouse wheel zoom
+    "fov=45",  # Normal görüş açısı
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def embed_url(uid):
+    """UID için embed URL'si (UID başına bir kez kurulur)"""
+    return f"https://sketchfab.com/models/{uid}/embed?{'&'.join(EMBED_PARAMS)}"
+
+
+def get_posters_root():
+    return os.path.join(str(settings.MEDIA_ROOT), POSTERS_DIR)
+
+
+def _record_path(uid):
+    return os.path.join(get_posters_root(), f'{uid}.json')
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_record(uid):
+    """Diskteki meta veri kaydı; yoksa None"""
+    try:
+        with open(_record_path(uid), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def needs_fetch(record, now=None, max_age=POSTER_MAX_AGE):
+    if record is None:
+        return True
+    age = (now or time.time()) - record.get('fetched_at', 0)
+    return age >= (RETRY_AFTER if record.get('error') else max_age)
+
+
+def _choose_image(images):
+    """Thumbnail listesinden POSTER_WIDTH'e yeten en küçük (yoksa en büyük) görsel"""
+    images = [image for image in images if image.get('url') and image.get('width')]
+    if not images:
+        return None
+    wide_enough = [image for image in images if image['width'] >= POSTER_WIDTH]
+    if wide_enough:
+        return min(wide_enough, key=lambda image: image['width'])
+    return max(images, key=lambda image: image['width'])
+
+
+def fetch_poster(uid, client=None):
+    """Modelin meta verisini ve poster görselini indirip diskte sakla
+
+    Başarısız denemeler de hata mesajıyla kaydedilir; RETRY_AFTER dolmadan
+    tekrar denenmez. Dönüş: yazılan kayıt.
+    """
+    client = client or get_client()
+    os.makedirs(get_posters_root(), exist_ok=True)
+    previous = load_record(uid) or {}
+    record = {'uid': uid, 'fetched_at': int(time.time())}
+    try:
+        data = json.loads(client.get(f'{get_api_url()}/models/{uid}', max_bytes=1024 * 1024))
+        record['name'] = data.get('name') or ''
+        record['author'] = (data.get('user') or {}).get('displayName') or ''
+        image = _choose_image((data.get('thumbnails') or {}).get('images') or [])
+        if image is None:
+            raise ValueError('Modelin poster görseli yok')
+        content = client.get(image['url'])
+        with Image.open(io.BytesIO(content)) as poster:
+            pil_format = poster.format
+            poster.verify()
+        extension = _FORMAT_EXTENSIONS.get(pil_format)
+        if extension is None:
+            raise ValueError(f'Desteklenmeyen poster biçimi: {pil_format}')
+        file_name = f'{uid}.{extension}'
+        _write_atomic(os.path.join(get_posters_root(), file_name), content)
+        record.update(poster=file_name, width=image['width'], height=image.get('height') or 0)
+        if previous.get('poster') and previous['poster'] != file_name:
+            try:
+                os.remove(os.path.join(get_posters_root(), previous['poster']))
+            except OSError:
+                pass
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Sketchfab posteri alınamadı (%s): %s', uid, exc)
+        # Eski poster varsa sunulmaya devam etsin
+        record.update({key: previous[key] for key in ('name', 'author', 'poster', 'width', 'height') if key in previous})
+        record['error'] = str(exc)[:500]
+    _write_atomic(_record_path(uid), json.dumps(record, ensure_ascii=False).encode('utf-8'))
+    _records.pop(uid, None)
+    return record
+
+
+def ensure_posters(uids, client=None, max_age=POSTER_MAX_AGE, force=False):
+    """Posteri olmayan ya da eskimiş modelleri indir; dönüş: {uid: kayıt} (yalnızca indirilenler)"""
+    client = client or get_client()
+    now = time.time()
+    fetched = {}
+    for uid in dict.fromkeys(uid for uid in map(normalize_uid, uids) if uid):
+        if force or needs_fetch(load_record(uid), now, max_age):
+            fetched[uid] = fetch_poster(uid, client)
+    return fetched
+
+
+def model_uids():
+    """3D modeli olan ürünlerin ve aktif vitrin modellerinin Sketchfab UID'leri (kayıtta doğrulanmış)"""
+    uids = []
+    for model_name, filters in (('Product', {}), ('ShowcaseModel', {'is_active': True})):
+        model = apps.get_model('core', model_name)
+        uids.extend(model.objects.filter(sketchfab_asset__isnull=False, **filters)
+                    .values_list('sketchfab_asset_id', flat=True).distinct())
+    return uids
+
+
+# uid -> (kayıt dosyası mtime_ns, kayıt); kayıt dosyası değişince yeniden okunur
+_records = {}
+
+
+def get_poster(uid):
+    """Render sırasında: diskteki kayıt ({'poster': 'sketchfab/<uid>.jpg', 'name', ...}) ya da None
+
+    Ağa çıkmaz; poster henüz indirilmemişse None döner.
+    """
+    uid = normalize_uid(uid)
+    if uid is None:
+        return None
+    try:
+        version = os.stat(_record_path(uid)).st_mtime_ns
+    except OSError:
+        return None
+    cached = _records.get(uid)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    record = load_record(uid)
+    if record is not None and record.get('poster'):
+        record = dict(record, poster=f"{POSTERS_DIR}/{record['poster']}")
+    else:
+        record = None
+    _records[uid] = (version, record)
+    return record
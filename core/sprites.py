@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from PIL import Image, ImageOps
+
+from .derivatives import DERIVATIVE_FORMATS, get_derivatives_root, get_derivatives_url
+
+
+# Ana sayfada kategori başına gösterilen ürün sayısı (şablon ve görünüm de 8 kullanır)
+SPRITE_TILE_COUNT = 8
+
+# Atlas hücresi (piksel): ~180x200'lük karolar için 2x yoğunlukta, 9:10 oranında
+SPRITE_CELL_SIZE = (360, 400)
+
+# Atlasların türev klasöründeki alt klasörü ve manifest dosyası
+SPRITES_DIR = 'sprites'
+SPRITE_MANIFEST_NAME = 'sprites.json'
+SPRITE_MANIFEST_FORMAT = 1
+
+# Atlas biçimleri (tercih sırasıyla); JPEG her tarayıcı için yedek
+SPRITE_FORMATS = ('webp', 'jpeg')
+
+
+def get_sprites_root():
+    root = get_derivatives_root()
+    return os.path.join(root, SPRITES_DIR) if root else ''
+
+
+def sprite_key(entries):
+    """Atlas içeriğinin özeti: dosya adları, içerik özetleri ve hücre boyutu
+
+    Katalog ya da kategori ataması değişince özet de değişir; eski atlas kullanılmaz.
+    """
+    digest = hashlib.md5(usedforsecurity=False)
+    digest.update(repr(SPRITE_CELL_SIZE).encode('ascii'))
+    for entry in entries:
+        digest.update(f'\n{entry.name}:{entry.hash or entry.size}'.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def render_sprite(paths, output_dir, slug, key):
+    """Görselleri yan yana tek atlasa yerleştirip SPRITE_FORMATS biçimlerinde yaz
+
+    Her görsel hücre oranına ortadan kırpılır (background-size: cover gibi).
+    Dönüş: {biçim: dosya adı}.
+    """
+    cell_width, cell_height = SPRITE_CELL_SIZE
+    atlas = Image.new('RGB', (cell_width * len(paths), cell_height), (255, 255, 255))
+    for position, path in enumerate(paths):
+        with Image.open(path) as image:
+            image.draft('RGB', (cell_width, cell_height))
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            cell = ImageOps.fit(image.convert('RGB'), SPRITE_CELL_SIZE, Image.LANCZOS)
+        atlas.paste(cell, (position * cell_width, 0))
+
+    variants = {}
+    for name in SPRITE_FORMATS:
+        pil_format, extension, _, options = DERIVATIVE_FORMATS[name]
+        file_name = f'{slug}-{key}.{extension}'
+        atlas.save(os.path.join(output_dir, file_name), pil_format, **options)
+        variants[name] = file_name
+    return variants
+
+
+def write_sprite_manifest(sprites, manifest_path):
+    """Atlas manifestini atomik olarak yaz"""
+    data = {'format': SPRITE_MANIFEST_FORMAT, 'sprites': sprites}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_sprite_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding='utf-8') as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != SPRITE_MANIFEST_FORMAT:
+        return {}
+    return data.get('sprites', {})
+
+
+class SpriteIndex:
+    """Katalog kategori slug'ı -> atlas kaydı ({'key', 'files', 'variants'})"""
+
+    def __init__(self, sprites, base_url, version=None):
+        self.sprites = sprites
+        self.base_url = base_url
+        self.version = version
+
+    def get(self, slug, entries):
+        """Verilen karo listesine birebir uyan atlas kaydı; yoksa ya da eskiyse None"""
+        record = self.sprites.get(slug)
+        if record is None or record['files'] != [entry.name for entry in entries]:
+            return None
+        if record['key'] != sprite_key(entries):
+            return None
+        return record
+
+    def url(self, record, format_name):
+        return self.base_url + record['variants'][format_name]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_sprite_index():
+    """Worker'ın atlas indeksini döndür (manifest dosyası değişince yeniden okunur)"""
+    global _index
+
+    root = get_sprites_root()
+    manifest_path = os.path.join(root, SPRITE_MANIFEST_NAME) if root else ''
+    try:
+        version = os.stat(manifest_path).st_mtime_ns if manifest_path else None
+    except OSError:
+        version = None
+
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            sprites = load_sprite_manifest(manifest_path) if version is not None else {}
+            _index = SpriteIndex(sprites, f'{get_derivatives_url()}{SPRITES_DIR}/', version)
+        return _index
@@ -0,0 +1,17 @@
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class FingerprintedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """İçerik özetli adlar + gzip/brotli ön sıkıştırma (whitenoise)
+
+    Manifestte olmayan bir yol (ör. silinmiş kategori görseli ya da
+    collectstatic sonrası üretilen bir dosya) ValueError ile sayfayı 500'e
+    düşürmek yerine özetsiz URL'ye çözülür.
+    """
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            return FileSystemStorage.url(self, name)
@@ -0,0 +1,181 @@
+import bisect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.urls import reverse
+
+from .catalog import get_catalog
+from .categories import get_category_registry
+from .search import tokenize
+
+
+MIN_QUERY_LENGTH = 2
+MAX_PRODUCTS = 5
+MAX_CATEGORIES = 3
+
+# Son sorguların sonuç aralığı ve hazır JSON yanıtı (önek uzadıkça aralık daraltılır)
+CACHE_SIZE = 2048
+
+EMPTY_PAYLOAD = b'{"suggestions":[]}'
+
+PRODUCT, CATEGORY = 0, 1
+TYPE_LABELS = {PRODUCT: 'Ürün', CATEGORY: 'Kategori'}
+
+
+class SuggestionIndex:
+    """Arama önerileri için bellek içi önek yapısı.
+
+    Her önerinin etiketi Türkçe katlanıp kelimelere ayrılır ve her kelimeden
+    başlayan son ek sıralı bir diziye eklenir; bir önek sorgusu iki ikili
+    aramayla bir aralığa dönüşür. URL'ler ve JSON parçaları kurulumda hazırlanır.
+    Son sorguların aralıkları saklanır; önek uzadığında arama tüm dizi yerine
+    önceki aralık içinde yapılır.
+    """
+
+    def __init__(self, suggestions):
+        self._items = []
+        keyed = []
+        for kind, label, url in suggestions:
+            tokens = tokenize(label)
+            if not tokens:
+                continue
+            item_id = len(self._items)
+            self._items.append((kind, len(label), label, {'name': label, 'url': url, 'type': TYPE_LABELS[kind]}))
+            for position in range(len(tokens)):
+                keyed.append((' '.join(tokens[position:]), position > 0, item_id))
+        keyed.sort()
+        self._keys = [key for key, _, _ in keyed]
+        self._refs = [(mid_word, item_id) for _, mid_word, item_id in keyed]
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _range(self, prefix):
+        """Öneki taşıyan anahtarların [lo, hi) aralığı - önbellekteki en uzun önekten daralt"""
+        lo, hi = 0, len(self._keys)
+        for length in range(len(prefix) - 1, MIN_QUERY_LENGTH - 1, -1):
+            cached = self._cache.get(prefix[:length])
+            if cached is not None:
+                lo, hi = cached[0], cached[1]
+                break
+        lo = bisect.bisect_left(self._keys, prefix, lo, hi)
+        hi = bisect.bisect_left(self._keys, prefix + '\uffff', lo, hi)
+        return lo, hi
+
+    def _select(self, lo, hi):
+        """Aralıktaki en iyi ürün ve kategori önerileri (kelime başı eşleşmesi ve kısa etiket önce)"""
+        best = {}
+        for mid_word, item_id in self._refs[lo:hi]:
+            if item_id not in best or mid_word < best[item_id]:
+                best[item_id] = mid_word
+        ranked = sorted(best, key=lambda i: (best[i], self._items[i][1], self._items[i][2]))
+        products = [self._items[i][3] for i in ranked if self._items[i][0] == PRODUCT][:MAX_PRODUCTS]
+        categories = [self._items[i][3] for i in ranked if self._items[i][0] == CATEGORY][:MAX_CATEGORIES]
+        return products + categories
+
+    def lookup(self, query):
+        """Sorgunun JSON yanıt gövdesi (bytes)"""
+        if len(query.strip()) < MIN_QUERY_LENGTH:
+            return EMPTY_PAYLOAD
+        prefix = ' '.join(tokenize(query))
+        if len(prefix) < MIN_QUERY_LENGTH:
+            return EMPTY_PAYLOAD
+
+        with self._cache_lock:
+            cached = self._cache.get(prefix)
+            if cached is not None:
+                self._cache.move_to_end(prefix)
+                return cached[2]
+            lo, hi = self._range(prefix)
+
+        payload = json.dumps(
+            {'suggestions': self._select(lo, hi)}, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+        with self._cache_lock:
+            self._cache[prefix] = (lo, hi, payload)
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return payload
+
+
+def _collect_suggestions():
+    """Katalog dosyaları, aktif ürünler ve kategoriler için (tür, etiket, url) üçlüleri"""
+    from .models import Product
+
+    catalog = get_catalog()
+    key_to_file = {entry.key: entry.name for entry in catalog.entries.values()}
+    linked_files = set()
+
+    suggestions = []
+    for name, slug, image_key in Product.objects.filter(is_active=True).values_list('name', 'slug', 'image_key'):
+        file_name = key_to_file.get(image_key)
+        if file_name:
+            # Katalog görseli olan ürün: dosya adlı URL her iki listeleme modunda da çalışır
+            linked_files.add(file_name)
+            url = reverse('core:product_detail', kwargs={'product_name': file_name})
+        else:
+            url = reverse('core:product_detail', kwargs={'product_name': slug})
+        suggestions.append((PRODUCT, name, url))
+
+    for entry in catalog.entries.values():
+        if entry.name not in linked_files:
+            url = reverse('core:product_detail', kwargs={'product_name': entry.name})
+            suggestions.append((PRODUCT, entry.display_name.replace('_', ' '), url))
+
+    for category in get_category_registry().active:
+        suggestions.append((CATEGORY, category.name, reverse('core:category_detail', kwargs={'slug': category.slug})))
+
+    return suggestions
+
+
+def _data_version():
+    from .models import Category, Product
+    products = Product.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    categories = Category.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    return (products['count'], products['latest'], categories['count'], categories['latest'])
+
+
+_index = None
+_index_catalog_version = None
+_index_lock = threading.Lock()
+_data_stamp = None
+_checked_at = 0.0
+
+
+def get_suggestion_index():
+    """Worker'ın öneri indeksini döndür
+
+    Katalog değişince ya da bu worker'da Product/Category kaydedilince
+    yeniden kurulur; diğer worker'lardaki değişiklikler en fazla
+    SEARCH_INDEX_CHECK_SECONDS saniyede bir kontrol edilir.
+    """
+    global _index, _index_catalog_version, _data_stamp, _checked_at
+
+    catalog = get_catalog()
+    catalog_version = (catalog.source, catalog.version)
+    check_interval = getattr(settings, 'SEARCH_INDEX_CHECK_SECONDS', 30)
+    now = time.monotonic()
+
+    index = _index
+    if index is not None and _index_catalog_version == catalog_version and now - _checked_at < check_interval:
+        return index
+
+    with _index_lock:
+        data_stamp = _data_version()
+        _checked_at = now
+        if _index is None or _index_catalog_version != catalog_version or data_stamp != _data_stamp:
+            _index = SuggestionIndex(_collect_suggestions())
+            _index_catalog_version = catalog_version
+            _data_stamp = data_stamp
+        return _index
+
+
+def invalidate_suggestions():
+    """Product/Category değişince bir sonraki istekte indeksi yeniden kur"""
+    global _index
+    with _index_lock:
+        _index = None
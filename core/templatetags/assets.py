@@ -0,0 +1,30 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.assets import static_url
+from core.critical import STYLESHEET, get_critical_css
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context):
+    """Sayfanın kritik CSS'ini satır içi ekle, style.css'i render'ı engellemeden yükle
+
+    Kritik CSS yoksa (stil dosyası bulunamadı ya da sayfa boyut sınırını aştı) düz
+    <link rel="stylesheet"> döner.
+    JavaScript kapalıysa <noscript> içindeki bağlantı kullanılır.
+    """
+    href = static_url(STYLESHEET)
+    page = getattr(context, 'template', None)
+    css = get_critical_css(page.name) if page is not None else ''
+    if not css:
+        return format_html('<link rel="stylesheet" href="{}" />', href)
+    return format_html(
+        '<style>{}</style>\n'
+        '  <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'" />\n'
+        '  <noscript><link rel="stylesheet" href="{}" /></noscript>',
+        mark_safe(css.replace('</', '<\\/')), href, href,
+    )
@@ -0,0 +1,168 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core.assets import static_url
+from core.derivatives import DERIVATIVE_FORMATS, get_derivative_index
+from core.mediaimages import get_media_placeholders
+from core.sketchfab import get_poster
+from core.sprites import SPRITE_FORMATS, get_sprite_index
+from core.thumbnails import thumbnail_url
+
+
+register = template.Library()
+
+# Ürün kartı görselinin yaklaşık ekran genişliği (srcset seçimi için)
+DEFAULT_SIZES = '(max-width: 600px) 100vw, 320px'
+
+
+def _original_url(file_name):
+    return static_url(f'images/New folder/{file_name}')
+
+
+def _layers(urls, placeholder, color):
+    """background-image değerinin sonuna yer tutucu katmanı ve baskın rengi ekle
+
+    Yer tutucu asıl görselin altında kalır; görsel gelene kadar bulanık hali,
+    o da yoksa baskın renk görünür.
+    """
+    if placeholder:
+        urls = format_html("{}, url('{}')", urls, placeholder)
+    return urls, format_html(' background-color: {};', color) if color else ''
+
+
+def _img_placeholder(placeholder, color):
+    """<img> için style niteliği: görsel çözülene kadar bulanık yer tutucu ve baskın renk"""
+    if not color:
+        return ''
+    if placeholder:
+        return format_html(' style="background: {} url(\'{}\') center / cover no-repeat;"', color, placeholder)
+    return format_html(' style="background-color: {};"', color)
+
+
+@register.simple_tag
+def product_picture(file_name, alt='', css_class='', sizes=DEFAULT_SIZES, lazy=True):
+    """Katalog görseli için <picture>: türev biçimleri <source srcset> olarak, JPEG <img srcset> olarak
+
+    Türev manifesti yoksa (build_image_derivatives çalışmamışsa) orijinal dosyayla düz <img> döner.
+    """
+    index = get_derivative_index()
+    formats = index.formats(file_name)
+    loading = 'lazy' if lazy else 'eager'
+    if not formats:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async" />',
+            _original_url(file_name), alt, css_class, loading,
+        )
+
+    record = index.files[file_name]
+    fallback = 'jpeg' if 'jpeg' in formats else formats[-1]
+    placeholder = _img_placeholder(*index.placeholder(file_name))
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((DERIVATIVE_FORMATS[name][2], index.srcset(file_name, name), sizes) for name in formats if name != fallback),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" '
+        'loading="{}" decoding="async"{} /></picture>',
+        sources,
+        index.url(file_name, fallback, 640),
+        index.srcset(file_name, fallback),
+        sizes,
+        record['width'],
+        record['height'],
+        alt,
+        css_class,
+        loading,
+        placeholder,
+    )
+
+
+@register.simple_tag
+def product_background(file_name, width):
+    """style niteliği için background-image bildirimleri
+
+    Önce JPEG türevi düz url() olarak verilir; image-set() destekleyen
+    tarayıcılar ikinci bildirimle WebP/AVIF ve 2x çözünürlüğü seçer.
+    """
+    index = get_derivative_index()
+    formats = index.formats(file_name)
+    if not formats:
+        return format_html("background-image: url('{}');", _original_url(file_name))
+
+    width = int(width)
+    fallback = 'jpeg' if 'jpeg' in formats else formats[-1]
+    candidates = []
+    for name in formats:
+        urls = []
+        for density in (1, 2):
+            url = index.url(file_name, name, width * density)
+            # Görsel 2x için yeterince büyük değilse aynı türev tekrar yazılmaz
+            if url not in urls:
+                urls.append(url)
+                candidates.append((url, DERIVATIVE_FORMATS[name][2], density))
+    candidates = format_html_join(', ', "url('{}') type('{}') {}x", candidates)
+    placeholder, color = index.placeholder(file_name)
+    plain, background_color = _layers(format_html("url('{}')", index.url(file_name, fallback, width)), placeholder, color)
+    image_set, _ = _layers(format_html('image-set({})', candidates), placeholder, color)
+    return format_html('background-image: {}; background-image: {};{}', plain, image_set, background_color)
+
+
+@register.filter
+def thumbnail(image, size):
+    """Media görseli için imzalı küçük görsel URL'si: {{ category.image|thumbnail:"960x0" }}"""
+    width, _, height = str(size).partition('x')
+    return thumbnail_url(image, width, height or 0)
+
+
+@register.simple_tag
+def media_background(image, size):
+    """Media görseli (ImageField) için style bildirimleri: küçük görsel, yer tutucu ve baskın renk"""
+    if not image:
+        return ''
+    placeholder, color = get_media_placeholders().get(image.name, (None, None))
+    urls, background_color = _layers(format_html("url('{}')", thumbnail(image, size)), placeholder, color)
+    return format_html('background-image: {};{}', urls, background_color)
+
+
+@register.simple_tag
+def media_placeholder(image):
+    """Media görselinin <img> etiketi için yer tutucu style niteliği (işlenmemişse boş)"""
+    if not image:
+        return ''
+    return _img_placeholder(*get_media_placeholders().get(image.name, (None, None)))
+
+
+@register.simple_tag
+def sprite_background(sprite, position, file_name):
+    """Kategori atlasındaki ``position``. hücre için style bildirimleri
+
+    Atlas karo genişliğinin hücre sayısı katı kadar büyütülür, hücre
+    background-position ile seçilir. Hücrenin yer tutucusu ayrı katman
+    olarak altta kalır.
+    """
+    index = get_sprite_index()
+    count = len(sprite['files'])
+    offset = 100 * position / (count - 1) if count > 1 else 0
+    image_set = format_html_join(
+        ', ', "url('{}') type('{}')",
+        ((index.url(sprite, name), DERIVATIVE_FORMATS[name][2]) for name in SPRITE_FORMATS),
+    )
+    placeholder, color = get_derivative_index().placeholder(file_name)
+    plain, background_color = _layers(format_html("url('{}')", index.url(sprite, SPRITE_FORMATS[-1])), placeholder, color)
+    layered, _ = _layers(format_html('image-set({})', image_set), placeholder, color)
+    sizes = f'{count * 100}% 100%' + (', cover' if placeholder else '')
+    positions = f'{offset:g}% 0' + (', center' if placeholder else '')
+    return format_html(
+        'background-image: {}; background-image: {}; background-size: {}; background-position: {};{}',
+        plain, layered, sizes, positions, background_color,
+    )
+
+
+@register.simple_tag
+def sketchfab_poster(model_id, size):
+    """Sketchfab modelinin diskte saklanan posteri için /thumb/ URL'si (henüz indirilmemişse '')
+
+    Kullanım: ``{% sketchfab_poster product.sketchfab_asset_id "640x0" as poster %}``
+    """
+    record = get_poster(model_id)
+    return thumbnail(record['poster'], size) if record else ''
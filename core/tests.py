@@ -1,3 +1,1344 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import re_path
+from django.utils import timezone
+from django.utils.http import http_date
+import numpy as np
+from PIL import Image, ImageColor
+
+from . import async_views, critical, fulltext, pagecache, placeholders, products, similarity, sketchfab, sprites, thumbnails, views
+from .catalog import (
+    CatalogIndex, get_catalog, image_key_for, invalidate_catalog, list_image_files, load_manifest, make_entry,
+    scan_directory, write_manifest,
+)
+from .categories import get_category_registry, invalidate_categories
+from .mediafiles import parse_range
+from .mediaimages import EXIF_ORIENTATION, optimize_original
+from .models import Category, Product, ProductNeighbors, SketchfabAsset
+from .pagination import (
+    NEXT, PREVIOUS, CachedCountPaginator, KeysetPaginator, SortedListCursorPaginator, decode_cursor, encode_cursor,
+)
+from .search import SearchIndex, tokenize
+from .storage import FingerprintedStaticFilesStorage
+from .suggest import CATEGORY, PRODUCT, SuggestionIndex
+from .text import normalize_key
+from .views import serve_media
+
+
+# MediaFileTests için: DEBUG'dan bağımsız olarak production /media/ görünümü
+urlpatterns = [
+    re_path(r'^media/(?P<path>.*)$', serve_media),
+]
+
+
+def make_product(name, category=None, **fields):
+    category = category or Category.objects.get_or_create(name='Test', slug='test')[0]
+    fields.setdefault('main_image', 'products/test.jpg')
+    fields.setdefault('description', '-')
+    return Product.objects.create(name=name, category=category, price=10, **fields)
+
+
+class SuggestionIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SuggestionIndex([
+            (PRODUCT, 'Fırçalı Eldiven Kaşağı', '/urun/eldiven/'),
+            (PRODUCT, 'Kıl Fırça', '/urun/kil-firca/'),
+            (PRODUCT, 'Maya Temizleme Fırçası', '/urun/maya/'),
+            (CATEGORY, 'Tımar Ekipmanları', '/kategori/timar/'),
+        ])
+
+    def names(self, query):
+        return [item['name'] for item in json.loads(self.index.lookup(query))['suggestions']]
+
+    def test_word_start_match_ranks_before_mid_word_match(self):
+        self.assertEqual(self.names('fir'), ['Fırçalı Eldiven Kaşağı', 'Kıl Fırça', 'Maya Temizleme Fırçası'])
+
+    def test_mid_word_only_match_is_returned(self):
+        self.assertEqual(self.names('temiz'), ['Maya Temizleme Fırçası'])
+        self.assertIn('Kıl Fırça', self.names('firca'))
+
+    def test_narrowed_prefix_uses_cached_range(self):
+        self.assertEqual(len(self.names('fi')), 3)
+        self.assertEqual(len(self.names('fir')), 3)
+        self.assertEqual(self.names('firc'), self.names('fırç'))
+
+    def test_categories_and_short_queries(self):
+        self.assertEqual(json.loads(self.index.lookup('tım'))['suggestions'][0]['type'], 'Kategori')
+        self.assertEqual(self.names('f'), [])
+        self.assertEqual(self.names('zzz'), [])
+
+
+class ProductImageKeyTests(TestCase):
+    def test_catalog_image_sets_key_from_file_name(self):
+        product = make_product('Herhangi', main_image='products/catalog/Açık_Nal.jpg')
+        self.assertEqual(product.image_key, normalize_key('Acik Nal'))
+
+    def test_duplicate_folded_name_keeps_key_empty(self):
+        first = make_product('Açık Nal')
+        second = make_product('Açik nal')
+        self.assertEqual(first.image_key, normalize_key('Acik Nal'))
+        self.assertIsNone(second.image_key)
+
+        # Yeniden kayıt ve admin doğrulaması çakışan ürünü engellemez
+        second.description = 'güncel'
+        second.full_clean()
+        second.save()
+        first.save()
+        first.refresh_from_db()
+        self.assertEqual(first.image_key, normalize_key('Acik Nal'))
+
+    def test_key_is_taken_when_it_becomes_free(self):
+        first = make_product('Açık Nal')
+        second = make_product('Açik nal')
+        first.delete()
+        second.save()
+        self.assertEqual(second.image_key, normalize_key('Acik Nal'))
+
+    def test_unchanged_save_does_not_look_up_key(self):
+        product = Product.objects.get(pk=make_product('Açık Nal').pk)
+        product.description = 'güncel'
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+        # Anahtar çakışması için ayrı sorgu yok
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT') and 'image_key' in query['sql']])
+        self.assertEqual(product.image_key, normalize_key('Acik Nal'))
+
+    def test_renamed_product_gets_new_key(self):
+        product = make_product('Açık Nal')
+        product.name = 'Kıl Fırça'
+        product.save()
+        self.assertEqual(Product.objects.get(pk=product.pk).image_key, normalize_key('Kil Firca'))
+
+        # Yeni ad başka ürünün anahtarına katlanıyorsa kısıt yakalanır, anahtar boş kalır
+        other = make_product('Açık Nal', slug='acik-nal')
+        other.name = 'kil firca'
+        other.save()
+        other.refresh_from_db()
+        self.assertEqual((other.name, other.image_key), ('kil firca', None))
+
+    def test_other_integrity_errors_are_raised(self):
+        make_product('Açık Nal', slug='nal')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_product('Kıl Fırça', slug='nal')
+
+
+class OptimizeOriginalTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def save_jpeg(self, name, orientation=None, progressive=False, tags=None):
+        path = os.path.join(self.tmp.name, name)
+        exif = Image.Exif()
+        if orientation:
+            exif[EXIF_ORIENTATION] = orientation
+        exif.update(tags or {})
+        Image.new('RGB', (40, 20), (200, 30, 30)).save(
+            path, 'JPEG', quality=95, exif=exif, progressive=progressive,
+        )
+        return path
+
+    def read(self, path):
+        with open(path, 'rb') as fh:
+            return fh.read()
+
+    def assertOptimized(self, path, size):
+        with Image.open(path) as image:
+            self.assertEqual(image.size, size)
+            self.assertFalse(image.getexif())
+            self.assertTrue(image.info.get('progressive'))
+
+    def test_upright_jpeg_with_exif_is_stripped_and_progressive(self):
+        path = self.save_jpeg('upright.jpg', tags={0x010F: 'Kamera', 0x0110: 'Model X'})
+        with Image.open(path) as image:
+            self.assertEqual(image.getexif().get(0x0110), 'Model X')
+        self.assertEqual(optimize_original(path), (40, 20))
+        self.assertOptimized(path, (40, 20))
+
+    def test_baseline_jpeg_without_exif_is_made_progressive(self):
+        path = self.save_jpeg('baseline.jpg')
+        optimize_original(path)
+        self.assertOptimized(path, (40, 20))
+
+    def test_optimized_jpeg_is_left_untouched(self):
+        path = self.save_jpeg('optimized.jpg', progressive=True)
+        original = self.read(path)
+        self.assertEqual(optimize_original(path), (40, 20))
+        self.assertEqual(self.read(path), original)
+
+    def test_rotated_jpeg_is_rewritten_once(self):
+        path = self.save_jpeg('rotated.jpg', orientation=6)
+        self.assertEqual(optimize_original(path), (20, 40))
+        self.assertOptimized(path, (20, 40))
+        # Yeniden deneme (sonraki adım hata verdiyse) dosyayı tekrar sıkıştırmaz
+        rewritten = self.read(path)
+        self.assertEqual(optimize_original(path), (20, 40))
+        self.assertEqual(self.read(path), rewritten)
+
+    def test_png_is_not_grown(self):
+        path = os.path.join(self.tmp.name, 'image.png')
+        Image.new('RGB', (30, 30), (0, 0, 255)).save(path, 'PNG', optimize=True)
+        size = os.path.getsize(path)
+        self.assertEqual(optimize_original(path), (30, 30))
+        self.assertLessEqual(os.path.getsize(path), size)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.catalog = CatalogIndex.from_files(['Açık_Nal.jpg', 'Kıl_Fırça.jpg', 'Yağlı_Kösele.jpg'])
+
+    def test_tokenize_folds_turkish_characters(self):
+        self.assertEqual(tokenize('Açık_Nal'), ['acik', 'nal'])
+        self.assertEqual(tokenize('KÖSELE yağı'), ['kosele', 'yagi'])
+
+    def test_prefix_and_folded_matching(self):
+        index = SearchIndex(self.catalog)
+        self.assertEqual(index.search('açı'), ['Açık_Nal.jpg'])
+        self.assertEqual(index.search('ACIK'), ['Açık_Nal.jpg'])
+        self.assertEqual(index.search('fır kıl'), ['Kıl_Fırça.jpg'])
+        self.assertEqual(index.search('nal fırça'), [])
+        self.assertEqual(index.search('  '), [])
+
+    def test_product_fields_and_within(self):
+        product = make_product('Açık Nal', main_image='products/catalog/Açık_Nal.jpg', material='Çelik')
+        index = SearchIndex(self.catalog, [product])
+        self.assertEqual(index.search('celik'), ['Açık_Nal.jpg'])
+        self.assertEqual(index.search('celik', within=['Kıl_Fırça.jpg']), [])
+
+    def test_update_does_not_change_published_copy(self):
+        product = make_product('Açık Nal', main_image='products/catalog/Açık_Nal.jpg', material='Çelik')
+        published = SearchIndex(self.catalog, [product])
+        product.material = 'Alüminyum'
+        updated = published.copy()
+        updated.update_product(product)
+        self.assertEqual(published.search('celik'), ['Açık_Nal.jpg'])
+        self.assertEqual(published.search('alum'), [])
+        self.assertEqual(updated.search('celik'), [])
+        self.assertEqual(updated.search('alum'), ['Açık_Nal.jpg'])
+        updated.remove_product(product)
+        self.assertEqual(updated.search('alum'), [])
+        self.assertEqual(updated.search('nal'), ['Açık_Nal.jpg'])
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        token = encode_cursor(NEXT, ['2026-01-01T00:00:00', '7'])
+        self.assertEqual(decode_cursor(token), (NEXT, ['2026-01-01T00:00:00', '7']))
+
+    def test_tampered_cursor_is_ignored(self):
+        self.assertIsNone(decode_cursor(''))
+        self.assertIsNone(decode_cursor('%%%'))
+        self.assertIsNone(decode_cursor(encode_cursor('x', ['1'])))
+        self.assertIsNone(decode_cursor(encode_cursor(NEXT, '1')))
+        self.assertIsNone(decode_cursor(encode_cursor(NEXT, ['1'])[:-3]))
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        for number in range(5):
+            make_product(f'Ürün {number}', slug=f'urun-{number}')
+        self.queryset = Product.objects.all()
+        self.ordered = [p.pk for p in self.queryset.order_by('-created_at', '-id')]
+        self.paginator = KeysetPaginator(self.queryset, 2)
+
+    def pks(self, page):
+        return [p.pk for p in page.object_list]
+
+    def test_forward_to_last_page(self):
+        first = self.paginator.get_page(None)
+        self.assertEqual(self.pks(first), self.ordered[:2])
+        self.assertEqual((first.has_previous(), first.has_next(), first.count), (False, True, 5))
+
+        second = self.paginator.get_page(first.next_cursor)
+        self.assertEqual(self.pks(second), self.ordered[2:4])
+        self.assertTrue(second.has_previous() and second.has_next())
+
+        last = self.paginator.get_page(second.next_cursor)
+        self.assertEqual(self.pks(last), self.ordered[4:])
+        self.assertFalse(last.has_next())
+        self.assertIsNone(last.next_cursor)
+        self.assertTrue(last.has_previous())
+
+    def test_previous_from_second_page(self):
+        second = self.paginator.get_page(self.paginator.get_page(None).next_cursor)
+        back = self.paginator.get_page(second.previous_cursor)
+        self.assertEqual(self.pks(back), self.ordered[:2])
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+        self.assertEqual(self.pks(self.paginator.get_page(back.next_cursor)), self.ordered[2:4])
+
+    def test_previous_from_last_page(self):
+        page = self.paginator.get_page(None)
+        page = self.paginator.get_page(page.next_cursor)
+        last = self.paginator.get_page(page.next_cursor)
+        back = self.paginator.get_page(last.previous_cursor)
+        self.assertEqual(self.pks(back), self.ordered[2:4])
+        self.assertTrue(back.has_previous() and back.has_next())
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        for token in ('bozuk', encode_cursor(NEXT, ['tarih-değil', 'x']), encode_cursor(PREVIOUS, ['1'])):
+            page = self.paginator.get_page(token)
+            self.assertEqual(self.pks(page), self.ordered[:2])
+            self.assertFalse(page.has_previous())
+
+
+class SortedListCursorPaginatorTests(SimpleTestCase):
+    def setUp(self):
+        self.items = ['a', 'b', 'c', 'd', 'e']
+        self.paginator = SortedListCursorPaginator(self.items, 2)
+
+    def test_forward_and_back(self):
+        first = self.paginator.get_page(None)
+        second = self.paginator.get_page(first.next_cursor)
+        last = self.paginator.get_page(second.next_cursor)
+        self.assertEqual([list(first), list(second), list(last)], [['a', 'b'], ['c', 'd'], ['e']])
+        self.assertFalse(last.has_next())
+        self.assertEqual(list(self.paginator.get_page(second.previous_cursor)), ['a', 'b'])
+        self.assertEqual(list(self.paginator.get_page(last.previous_cursor)), ['c', 'd'])
+        self.assertFalse(self.paginator.get_page(second.previous_cursor).has_previous())
+
+    def test_cursor_for_removed_item_still_positions(self):
+        token = encode_cursor(NEXT, ['bb'])
+        self.assertEqual(list(self.paginator.get_page(token)), ['c', 'd'])
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        for token in ('bozuk', encode_cursor(NEXT, [1]), encode_cursor(NEXT, ['a', 'b'])):
+            self.assertEqual(list(self.paginator.get_page(token)), ['a', 'b'])
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+
+    def test_unsatisfiable_and_ignored(self):
+        self.assertIs(parse_range('bytes=100-', 100), False)
+        self.assertIs(parse_range('bytes=-0', 100), False)
+        self.assertIs(parse_range('bytes=9-3', 100), False)
+        self.assertIsNone(parse_range(None, 100))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range('items=0-1', 100))
+        self.assertIsNone(parse_range('bytes=-', 100))
+
+
+class MediaFileTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, 'products'))
+        self.data = bytes(range(256)) * 4
+        self.path = os.path.join(tmp.name, 'products', 'dosya.bin')
+        with open(self.path, 'wb') as fh:
+            fh.write(self.data)
+        override = override_settings(ROOT_URLCONF=__name__, MEDIA_ROOT=tmp.name, MEDIA_SERVE_OFFLOAD='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, method='get', **headers):
+        response = getattr(self.client, method)('/media/products/dosya.bin', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.data)
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_range(self):
+        response = self.get(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.data[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_suffix_range(self):
+        response = self.get(Range='bytes=-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.data[-5:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range=f'bytes={len(self.data)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(Range='bytes=0-3', **{'If-Range': etag}).status_code, 206)
+        stale = self.get(Range='bytes=0-3', **{'If-Range': '"eski"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self.body(stale), self.data)
+        last_modified = self.get()['Last-Modified']
+        self.assertEqual(self.get(Range='bytes=0-3', **{'If-Range': last_modified}).status_code, 206)
+        old_date = http_date(0)
+        self.assertEqual(self.get(Range='bytes=0-3', **{'If-Range': old_date}).status_code, 200)
+
+    def test_head(self):
+        response = self.get('head')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+
+    def test_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_post_and_missing_paths(self):
+        self.assertEqual(self.client.post('/media/products/dosya.bin').status_code, 405)
+        self.assertEqual(self.client.get('/media/products/yok.bin').status_code, 404)
+        self.assertEqual(self.client.get('/media/products').status_code, 404)
+        self.assertEqual(self.client.get('/media/../tests.py').status_code, 404)
+
+    def test_fingerprinted_derivative_is_immutable(self):
+        media_root = os.path.dirname(os.path.dirname(self.path))
+        os.makedirs(os.path.join(media_root, 'derivatives'))
+        with open(os.path.join(media_root, 'derivatives', 'acik-nal-0123456789ab-640.webp'), 'wb') as fh:
+            fh.write(b'webp')
+        with self.settings(IMAGE_DERIVATIVES_ROOT=os.path.join(media_root, 'derivatives')):
+            response = self.client.get('/media/derivatives/acik-nal-0123456789ab-640.webp')
+            self.addCleanup(response.close)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertNotIn('immutable', self.get()['Cache-Control'])
+
+    def test_accel_offload(self):
+        with self.settings(MEDIA_SERVE_OFFLOAD='x-accel', MEDIA_ACCEL_REDIRECT_PREFIX='/internal/'):
+            response = self.get(Range='bytes=0-3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/internal/products/dosya.bin')
+        self.assertEqual(response.content, b'')
+
+
+class SketchfabAssetTests(TestCase):
+    UID = '07882e7524534be984ae3e7faca25517'
+
+    def test_url_is_normalized_and_asset_shared(self):
+        first = make_product('Nal', sketchfab_model_id=f'https://sketchfab.com/3d-models/nal-{self.UID}')
+        second = make_product('Nal 2', slug='nal-2', sketchfab_model_id=self.UID.upper())
+        self.assertEqual(first.sketchfab_model_id, self.UID)
+        self.assertEqual((first.sketchfab_asset_id, second.sketchfab_asset_id), (self.UID, self.UID))
+        self.assertEqual(SketchfabAsset.objects.count(), 1)
+
+    def test_embed_url_needs_no_query(self):
+        product = Product.objects.get(pk=make_product('Nal', sketchfab_model_id=self.UID).pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(product.is_sketchfab)
+            self.assertTrue(product.get_sketchfab_embed_url.startswith(f'https://sketchfab.com/models/{self.UID}/embed?'))
+
+    def test_invalid_id_is_rejected_and_cleared_id_detaches(self):
+        product = make_product('Nal', sketchfab_model_id=self.UID)
+        product.sketchfab_model_id = 'bozuk'
+        with self.assertRaises(ValidationError):
+            product.full_clean()
+        product.sketchfab_model_id = ''
+        product.save()
+        self.assertFalse(product.is_sketchfab)
+        self.assertIsNone(product.get_sketchfab_embed_url)
+
+
+def touch_category(category):
+    """Başka bir worker'daki değişiklik gibi: sinyal göndermeden updated_at'i ilerlet"""
+    Category.objects.filter(pk=category.pk).update(updated_at=timezone.now() + timedelta(minutes=1))
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Test', slug='test')
+        pagecache.invalidate_pages()
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return b'<p>sayfa %d</p>' % self.renders, 'text/html; charset=utf-8'
+
+    def get(self, bucket=1):
+        return pagecache.get_cached_page('test', bucket, 0, self.render)
+
+    def test_page_is_rendered_once_per_bucket(self):
+        self.assertIs(self.get(), self.get())
+        self.assertEqual(self.renders, 1)
+        self.get(bucket=2)
+        self.assertEqual(self.renders, 2)
+
+    def test_etag_and_compressed_variant(self):
+        page = self.get()
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0', HTTP_IF_NONE_MATCH=page.etag)
+        self.assertEqual(page.response(request).status_code, 304)
+        del request.META['HTTP_IF_NONE_MATCH']
+        self.assertNotIn('Content-Encoding', page.response(request))
+        request.META['HTTP_ACCEPT_ENCODING'] = 'gzip'
+        response = page.response(request)
+        self.assertEqual((response['Content-Encoding'], response['ETag']), ('gzip', page.etag))
+
+    @override_settings(CACHE_CHECK_SECONDS=0, SEARCH_INDEX_CHECK_SECONDS=3600)
+    def test_other_worker_changes_follow_cache_check_seconds(self):
+        self.get()
+        touch_category(self.category)
+        self.get()
+        self.assertEqual(self.renders, 2)
+
+    @override_settings(CACHE_CHECK_SECONDS=3600, SEARCH_INDEX_CHECK_SECONDS=0)
+    def test_search_interval_does_not_expire_pages(self):
+        self.get()
+        touch_category(self.category)
+        self.get()
+        self.assertEqual(self.renders, 1)
+
+
+class CategoryRegistryTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Test', slug='test')
+        invalidate_categories()
+
+    @override_settings(CACHE_CHECK_SECONDS=0, SEARCH_INDEX_CHECK_SECONDS=3600)
+    def test_other_worker_changes_follow_cache_check_seconds(self):
+        registry = get_category_registry()
+        touch_category(self.category)
+        self.assertIsNot(get_category_registry(), registry)
+
+    @override_settings(CACHE_CHECK_SECONDS=3600, SEARCH_INDEX_CHECK_SECONDS=0)
+    def test_search_interval_does_not_reload_registry(self):
+        registry = get_category_registry()
+        touch_category(self.category)
+        self.assertIs(get_category_registry(), registry)
+
+
+class FingerprintedStaticFilesStorageTests(SimpleTestCase):
+    def test_missing_manifest_entry_falls_back_to_plain_url(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = FingerprintedStaticFilesStorage(location=root, base_url='/static/')
+            self.assertEqual(storage.url('css/silinmis.css'), '/static/css/silinmis.css')
+
+
+class CatalogManifestTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.static_root = tmp.name
+        self.products_dir = os.path.join(tmp.name, 'images', 'New folder')
+        os.makedirs(self.products_dir)
+        for name in ('Açık_Nal.jpg', 'Kıl_Fırça.png', 'Açık_Nal.0123456789ab.jpg', 'notlar.txt'):
+            with open(os.path.join(self.products_dir, name), 'wb') as fh:
+                fh.write(name.encode())
+        self.manifest_path = os.path.join(tmp.name, 'catalog.json')
+        settings_override = override_settings(STATIC_ROOT=self.static_root, CATALOG_MANIFEST_PATH=self.manifest_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        invalidate_catalog()
+
+    def test_hashed_copies_are_not_products(self):
+        self.assertEqual(sorted(list_image_files(self.products_dir)), ['Açık_Nal.jpg', 'Kıl_Fırça.png'])
+
+    def test_manifest_round_trip(self):
+        entries = scan_directory(self.products_dir)
+        write_manifest(entries, self.manifest_path)
+        self.assertEqual(load_manifest(self.manifest_path), entries)
+        self.assertEqual(sorted(os.listdir(self.static_root)), ['catalog.json', 'images'])
+
+    def test_unknown_format_is_rejected(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as fh:
+            json.dump({'format': -1, 'fields': [], 'files': []}, fh)
+        with self.assertRaises(ValueError):
+            load_manifest(self.manifest_path)
+
+    def test_catalog_prefers_manifest(self):
+        write_manifest(scan_directory(self.products_dir)[:1], self.manifest_path)
+        catalog = get_catalog()
+        self.assertEqual(catalog.source, self.manifest_path)
+        self.assertEqual(len(catalog), 1)
+        self.assertIs(get_catalog(), catalog)
+
+    def test_corrupt_manifest_falls_back_to_directory(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as fh:
+            fh.write('{bozuk')
+        with self.assertLogs('core.catalog', 'WARNING'):
+            catalog = get_catalog()
+        self.assertEqual(len(catalog), 2)
+        self.assertIs(get_catalog(), catalog)
+
+    def test_directory_catalog_without_manifest(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.source, self.products_dir)
+        self.assertIn('Kıl_Fırça.png', catalog)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.nal = make_product('Açık Nal', short_description='Dövme çelik nal')
+        self.firca = make_product('Kıl Fırça', slug='kil-firca', description='Yumuşak kıl')
+
+    def search(self, query, backend=None):
+        products = Product.objects.all()
+        if backend is None:
+            return list(fulltext.search(products, query))
+        return list(backend.search(products, query))
+
+    def test_sqlite_uses_fts_backend(self):
+        self.assertIsInstance(fulltext.get_search_backend(), fulltext.SQLiteFTSBackend)
+
+    def test_folded_prefix_terms_must_all_match(self):
+        self.assertEqual(self.search('kil fir'), [self.firca])
+        self.assertEqual(self.search('DÖVME nal'), [self.nal])
+        self.assertEqual(self.search('nal fırça'), [])
+        self.assertEqual(self.search('  '), [])
+
+    def test_title_match_ranks_first(self):
+        other = make_product('Bandaj', slug='bandaj', description='Nal ile birlikte')
+        self.assertEqual(self.search('nal'), [self.nal, other])
+
+    def test_signals_keep_index_current(self):
+        self.firca.name = 'Plastik Kaşağı'
+        self.firca.save()
+        self.assertEqual(self.search('kasagi'), [self.firca])
+        self.firca.delete()
+        self.assertEqual(self.search('kasagi'), [])
+
+    def test_postgres_trigram_filter_is_indexable(self):
+        backend = fulltext.PostgresSearchBackend()
+        backend._has_trigram = True
+        sql = str(backend.search(Product.objects.all(), 'nal').query)
+        where = sql[sql.index(' WHERE '):]
+        self.assertIn('"core_product"."name" % nal', where)
+        self.assertNotIn('similarity(', where)
+        self.assertIn('similarity("core_product"."name", nal)', sql[:sql.index(' WHERE ')])
+
+    def test_basic_backend_matches_all_terms(self):
+        backend = fulltext.BasicSearchBackend()
+        self.assertEqual(self.search('dövme nal', backend), [self.nal])
+        self.assertEqual(self.search('nal fırça', backend), [])
+
+
+class ThumbnailTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = tmp.name
+        os.makedirs(os.path.join(tmp.name, 'products'))
+        Image.new('RGB', (800, 400), 'red').save(os.path.join(tmp.name, 'products', 'nal.jpg'))
+        Image.new('RGBA', (100, 100), (0, 0, 0, 0)).save(os.path.join(tmp.name, 'products', 'logo.png'))
+        override = override_settings(MEDIA_ROOT=tmp.name, THUMBNAIL_CACHE_ROOT=None)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch.object(thumbnails, '_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, accept=''):
+        response = self.client.get(url, headers={'Accept': accept})
+        self.addCleanup(response.close)
+        return response
+
+    def image(self, response):
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        with tempfile.TemporaryFile() as fh:
+            fh.write(body)
+            fh.seek(0)
+            with Image.open(fh) as image:
+                return image.format, image.size
+
+    def test_parse_size(self):
+        self.assertEqual(thumbnails.parse_size('400x0'), (400, 0))
+        self.assertEqual(thumbnails.parse_size('400x300'), (400, 300))
+        for size in ('0x100', '4000x10', '400', 'axb', '400x300x2'):
+            self.assertIsNone(thumbnails.parse_size(size), size)
+
+    def test_signature_binds_size_and_path(self):
+        signature = thumbnails.sign('400x0', 'products/nal.jpg')
+        self.assertTrue(thumbnails.verify('400x0', 'products/nal.jpg', signature))
+        self.assertFalse(thumbnails.verify('800x0', 'products/nal.jpg', signature))
+        self.assertFalse(thumbnails.verify('400x0', 'products/logo.png', signature))
+        self.assertFalse(thumbnails.verify('400x0', 'products/nal.jpg', ''))
+
+    def test_thumbnail_is_resized_and_cached(self):
+        url = thumbnails.thumbnail_url('products/nal.jpg', 200)
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('Accept', response['Vary'])
+        self.assertEqual(self.image(response), ('JPEG', (200, 100)))
+        cache_root = os.path.join(self.media_root, 'cache', 'thumbs')
+        cached = [name for _, _, names in os.walk(cache_root) for name in names]
+        self.assertEqual(len(cached), 1)
+        self.get(url)
+        self.assertEqual(len([name for _, _, names in os.walk(cache_root) for name in names]), 1)
+
+    def test_format_follows_accept_and_transparency(self):
+        response = self.get(thumbnails.thumbnail_url('products/nal.jpg', 100), accept='image/webp,*/*')
+        self.assertEqual(self.image(response)[0], 'WEBP')
+        response = self.get(thumbnails.thumbnail_url('products/logo.png', 50))
+        self.assertEqual(self.image(response), ('PNG', (50, 50)))
+
+    def test_bad_requests_are_not_found(self):
+        url = thumbnails.thumbnail_url('products/nal.jpg', 200)
+        self.assertEqual(self.get(url.replace('200x0', '300x0')).status_code, 404)
+        self.assertEqual(self.get(url.split('?')[0]).status_code, 404)
+        for path in ('products/yok.jpg', '../nal.jpg', 'products/nal.txt'):
+            size = '200x0'
+            url = f'/thumb/{size}/{path}?s={thumbnails.sign(size, path)}'
+            self.assertEqual(self.get(url).status_code, 404, path)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = thumbnails.ThumbnailCache(os.path.join(self.media_root, 'lru'), max_bytes=250)
+
+        def render(destination):
+            with open(destination, 'wb') as fh:
+                fh.write(b'x' * 100)
+            return 100
+
+        paths = []
+        for number in range(3):
+            paths.append(cache.get_or_create(f'{number:02d}' * 20, 'png', render))
+            os.utime(paths[-1], (number, number))
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+
+
+class AsyncPaginationTests(TestCase):
+    def setUp(self):
+        for number in range(5):
+            make_product(f'Ürün {number}', slug=f'urun-{number}')
+        self.queryset = Product.objects.order_by('name', 'id')
+
+    def test_keyset_aget_page_matches_get_page(self):
+        paginator = KeysetPaginator(Product.objects.all(), 2)
+        first = async_to_sync(paginator.aget_page)(None)
+        self.assertEqual(first.object_list, paginator.get_page(None).object_list)
+        second = async_to_sync(paginator.aget_page)(first.next_cursor)
+        self.assertEqual(second.object_list, paginator.get_page(first.next_cursor).object_list)
+        self.assertEqual(second.count, 5)
+
+    def test_cached_count_aget_page_matches_get_page(self):
+        page = async_to_sync(CachedCountPaginator(self.queryset, 2).aget_page)('3')
+        self.assertIsInstance(page.object_list, list)
+        self.assertEqual(page.object_list, list(CachedCountPaginator(self.queryset, 2).get_page('3').object_list))
+        self.assertEqual((page.number, page.paginator.count), (3, 5))
+
+
+@override_settings(CATALOG_BACKEND='db', PAGINATION_MODE='cursor')
+class AsyncViewTests(TestCase):
+    """ASGI görünümleri senkron karşılıklarıyla aynı sayfayı üretmeli"""
+
+    def setUp(self):
+        category = Category.objects.create(name='Nalbant', slug='nalbant')
+        for number in range(14):
+            make_product(f'Nal {number:02d}', category=category, slug=f'nal-{number:02d}')
+
+    def responses(self, sync_view, async_view, path, *args):
+        sync_request = RequestFactory().get(path)
+        async_request = AsyncRequestFactory().get(path)
+        sync_request.user = async_request.user = AnonymousUser()
+        return sync_view(sync_request, *args), async_to_sync(async_view)(async_request, *args)
+
+    def assertSameResponse(self, sync_view, async_view, path, *args):
+        sync_response, async_response = self.responses(sync_view, async_view, path, *args)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    def test_product_list(self):
+        self.assertSameResponse(views.product_list, async_views.product_list, '/urunler/')
+        self.assertSameResponse(views.product_list, async_views.product_list, '/urunler/?search=nal')
+
+    def test_category_detail(self):
+        sync_response, _ = self.responses(views.category_detail, async_views.category_detail, '/', 'nalbant')
+        # İmleç modunda en yeni ürünler önce; 14 ürünün son ikisi sonraki sayfada
+        self.assertContains(sync_response, 'Nal-13')
+        self.assertNotContains(sync_response, 'Nal-01')
+        self.assertContains(sync_response, '?cursor=')
+        self.assertSameResponse(views.category_detail, async_views.category_detail, '/', 'nalbant')
+        with self.assertRaises(Http404):
+            async_to_sync(async_views.category_detail)(AsyncRequestFactory().get('/'), 'yok')
+
+    @override_settings(CATALOG_BACKEND='static')
+    def test_static_catalog_pages(self):
+        self.assertSameResponse(views.product_list, async_views.product_list, '/urunler/?search=nal')
+        self.assertSameResponse(views.product_list, async_views.product_list, '/urunler/?category=nalbant')
+        self.assertSameResponse(views.category_detail, async_views.category_detail, '/', 'nalbant')
+
+    def test_search_suggestions(self):
+        sync_response, async_response = self.responses(
+            views.search_suggestions, async_views.search_suggestions, '/api/search-suggestions/?q=nal',
+        )
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response['Cache-Control'], sync_response['Cache-Control'])
+
+
+@override_settings(ROOT_URLCONF=__name__, MEDIA_SERVE_OFFLOAD='')
+class AsyncMediaFileTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data = os.urandom(200 * 1024)
+        with open(os.path.join(tmp.name, 'dosya.bin'), 'wb') as fh:
+            fh.write(self.data)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    async def body(self, response):
+        self.assertTrue(response.is_async)
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    async def test_file_is_streamed_asynchronously(self):
+        response = await self.async_client.get('/media/dosya.bin')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await self.body(response), self.data)
+
+    async def test_range_is_streamed_asynchronously(self):
+        response = await self.async_client.get('/media/dosya.bin', headers={'Range': 'bytes=100000-100099'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(await self.body(response), self.data[100000:100100])
+
+
+class SyncCatalogProductsTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        products_dir = os.path.join(tmp.name, 'static', 'images', 'New folder')
+        os.makedirs(products_dir)
+        for name in ('Acik_Nal.jpg', 'Kil_Firca.jpg', 'Tuhaf_Esya.jpg'):
+            Image.new('RGB', (4, 4)).save(os.path.join(products_dir, name))
+        override = override_settings(
+            STATIC_ROOT=os.path.join(tmp.name, 'static'), MEDIA_ROOT=os.path.join(tmp.name, 'media'),
+            CATALOG_MANIFEST_PATH='',
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        invalidate_catalog()
+        self.nalbant = Category.objects.create(name='Nalbant Ekipmanları', slug='nalbant', sort_order=4)
+        self.timar = Category.objects.create(name='Tımar Ekipmanları', slug='timar', sort_order=2)
+
+    def sync(self, *args):
+        out = StringIO()
+        call_command('sync_catalog_products', *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_products_and_missing_category_once(self):
+        output = self.sync()
+        self.assertIn('3 ürün oluşturuldu', output)
+        other = Category.objects.get(slug='diger')
+        self.assertEqual((other.name, other.sort_order), ('Diğer Ürünler', 5))
+        product = Product.objects.get(image_key=normalize_key('Acik Nal'))
+        self.assertEqual(product.category, self.nalbant)
+        self.assertEqual(product.main_image.name, 'products/catalog/Acik_Nal.jpg')
+        self.assertTrue(os.path.exists(product.main_image.path))
+
+        self.assertIn('0 ürün oluşturuldu, 0 ürün güncellendi, 3 ürün zaten güncel', self.sync())
+        self.assertEqual(Product.objects.count(), 3)
+
+    def test_dry_run_writes_nothing(self):
+        self.assertIn('[DRY-RUN] 3 ürün oluşturuldu', self.sync('--dry-run', '--no-copy'))
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Category.objects.filter(slug='diger').exists())
+
+    def test_catalog_fields_of_synced_products_are_updated(self):
+        self.sync('--no-copy')
+        Product.objects.filter(image_key=normalize_key('Acik Nal')).update(category=self.timar, price=99)
+        self.assertIn('0 ürün oluşturuldu, 1 ürün güncellendi', self.sync('--no-copy'))
+        product = Product.objects.get(image_key=normalize_key('Acik Nal'))
+        self.assertEqual((product.category, product.price), (self.nalbant, 99))
+
+    def test_admin_products_are_left_alone(self):
+        product = make_product('Açık Nal', category=self.timar, main_image='products/admin.jpg')
+        output = self.sync('--no-copy')
+        self.assertIn("1 ürünün görseli admin'den yüklendiği için dokunulmadı: Açık Nal", output)
+        product.refresh_from_db()
+        self.assertEqual((product.category, product.main_image.name), (self.timar, 'products/admin.jpg'))
+        self.assertEqual(Product.objects.filter(image_key=normalize_key('Acik Nal')).count(), 1)
+
+
+class StubSketchfabClient:
+    """SKETCHFAB_HTTP_CLIENT için ağa çıkmayan istemci: URL -> bayt ya da fırlatılacak hata"""
+
+    responses = {}
+    requested = []
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def get(self, url, max_bytes=sketchfab.MAX_POSTER_BYTES):
+        self.requested.append(url)
+        response = self.responses.get(url, OSError(f'HTTP Error 404: Not Found ({url})'))
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@override_settings(
+    SKETCHFAB_HTTP_CLIENT='core.tests.StubSketchfabClient', SKETCHFAB_API_URL='http://stub.test/v3/',
+)
+class SketchfabPosterTests(SimpleTestCase):
+    UID = '07882e7524534be984ae3e7faca25517'
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.root = os.path.join(tmp.name, 'sketchfab')
+        StubSketchfabClient.responses = {}
+        StubSketchfabClient.requested = []
+        sketchfab._records.clear()
+        self.api_url = f'http://stub.test/v3/models/{self.UID}'
+
+    def serve_model(self, image_format='JPEG'):
+        poster = tempfile.SpooledTemporaryFile()
+        Image.new('RGB', (8, 6), 'blue').save(poster, image_format)
+        poster.seek(0)
+        StubSketchfabClient.responses.update({
+            self.api_url: json.dumps({
+                'name': 'Eyer', 'user': {'displayName': 'Usta'},
+                'thumbnails': {'images': [
+                    {'url': 'http://stub.test/small.jpg', 'width': 200, 'height': 150},
+                    {'url': 'http://stub.test/large.jpg', 'width': 1920, 'height': 1080},
+                    {'url': 'http://stub.test/poster.jpg', 'width': 1024, 'height': 768},
+                ]},
+            }).encode(),
+            'http://stub.test/poster.jpg': poster.read(),
+        })
+
+    def test_poster_and_record_are_stored_under_media(self):
+        self.serve_model()
+        record = sketchfab.fetch_poster(self.UID)
+        self.assertEqual(StubSketchfabClient.requested, [self.api_url, 'http://stub.test/poster.jpg'])
+        self.assertEqual(
+            {key: record[key] for key in ('name', 'author', 'poster', 'width', 'height')},
+            {'name': 'Eyer', 'author': 'Usta', 'poster': f'{self.UID}.jpg', 'width': 1024, 'height': 768},
+        )
+        self.assertEqual(sorted(os.listdir(self.root)), [f'{self.UID}.jpg', f'{self.UID}.json'])
+        self.assertEqual(sketchfab.get_poster(self.UID)['poster'], f'sketchfab/{self.UID}.jpg')
+        self.assertEqual(sketchfab.get_poster(f'https://sketchfab.com/3d-models/eyer-{self.UID}')['name'], 'Eyer')
+
+    def fetch_failing(self):
+        with self.assertLogs('core.sketchfab', 'WARNING'):
+            return sketchfab.fetch_poster(self.UID)
+
+    def test_not_found_is_recorded_without_poster(self):
+        record = self.fetch_failing()
+        self.assertIn('404', record['error'])
+        self.assertNotIn('poster', record)
+        self.assertEqual(sketchfab.load_record(self.UID)['error'], record['error'])
+        self.assertIsNone(sketchfab.get_poster(self.UID))
+
+    def test_malformed_record_is_an_error(self):
+        StubSketchfabClient.responses[self.api_url] = b'{"name": '
+        self.assertIn('error', self.fetch_failing())
+        self.assertIsNone(sketchfab.get_poster(self.UID))
+
+    def test_timeout_keeps_previous_poster(self):
+        self.serve_model()
+        sketchfab.fetch_poster(self.UID)
+        StubSketchfabClient.responses['http://stub.test/poster.jpg'] = TimeoutError('timed out')
+        record = self.fetch_failing()
+        self.assertEqual((record['error'], record['poster']), ('timed out', f'{self.UID}.jpg'))
+        self.assertTrue(os.path.exists(os.path.join(self.root, f'{self.UID}.jpg')))
+        self.assertEqual(sketchfab.get_poster(self.UID)['poster'], f'sketchfab/{self.UID}.jpg')
+
+    def test_changed_format_replaces_old_poster(self):
+        self.serve_model()
+        sketchfab.fetch_poster(self.UID)
+        self.serve_model('PNG')
+        self.assertEqual(sketchfab.fetch_poster(self.UID)['poster'], f'{self.UID}.png')
+        self.assertEqual(sorted(os.listdir(self.root)), [f'{self.UID}.json', f'{self.UID}.png'])
+
+    def test_ensure_posters_fetches_only_missing_or_stale(self):
+        self.serve_model()
+        fetched = sketchfab.ensure_posters([self.UID, self.UID.upper(), 'bozuk', ''])
+        self.assertEqual(list(fetched), [self.UID])
+        self.assertEqual(sketchfab.ensure_posters([self.UID]), {})
+        self.assertEqual(list(sketchfab.ensure_posters([self.UID], force=True)), [self.UID])
+        self.assertEqual(list(sketchfab.ensure_posters([self.UID], max_age=0)), [self.UID])
+
+    def test_failed_fetch_is_retried_after_delay(self):
+        record = self.fetch_failing()
+        now = record['fetched_at']
+        self.assertFalse(sketchfab.needs_fetch(record, now + sketchfab.RETRY_AFTER - 1))
+        self.assertTrue(sketchfab.needs_fetch(record, now + sketchfab.RETRY_AFTER))
+        self.assertFalse(sketchfab.needs_fetch(dict(record, error=None), now + sketchfab.RETRY_AFTER))
+
+
+class CriticalCssTests(SimpleTestCase):
+    BASE = (
+        '<html><body><header class="site-header"><nav class="menu"></nav></header>'
+        '<main>{% block content %}{% endblock %}</main></body></html>'
+    )
+
+    def usage(self, content, blocks=critical.ABOVE_THE_FOLD_BLOCKS):
+        sources = {
+            'core/base.html': self.BASE,
+            'core/page.html': '{% extends "core/base.html" %}{% block content %}' + content + '{% endblock %}',
+        }
+        return critical.page_usage('core/page.html', sources, blocks)
+
+    def test_parse_nested_at_rules_comments_and_strings(self):
+        nodes = critical.parse_css(
+            '/* a { b } */ @import url("x.css");'
+            '.q::after { content: "}"; color: red }'
+            "@media (min-width: 600px) { @supports (display: grid) { .g { display: grid } } .m { margin: 0 } }"
+            '.z { }'
+        )
+        self.assertEqual([node.prelude for node in nodes], ['@import url("x.css")', '.q::after', '@media (min-width: 600px)', '.z'])
+        self.assertEqual((nodes[0].body, nodes[0].children), (None, None))
+        self.assertEqual(nodes[1].body.strip(), 'content: "}"; color: red')
+        media = nodes[2]
+        self.assertEqual([node.prelude for node in media.children], ['@supports (display: grid)', '.m'])
+        self.assertEqual(media.children[0].children[0], critical.CssNode('.g', ' display: grid ', None))
+
+    def test_split_selectors_ignores_commas_in_parentheses(self):
+        self.assertEqual(
+            critical.split_selectors('.a,\n .b  .c, :is(.d, .e) > p, [data-x="1,2"]'),
+            ['.a', '.b .c', ':is(.d, .e) > p', '[data-x="1,2"]'],
+        )
+
+    def test_selectors_must_match_element_and_ancestors(self):
+        usage = self.usage('<section class="hero"><h1 class="title">x</h1></section><div class="card"></div>')
+        self.assertTrue(usage.matches('.hero .title'))
+        self.assertTrue(usage.matches('main > .hero > h1'))
+        self.assertTrue(usage.matches('.site-header .menu'))
+        self.assertTrue(usage.matches('.hero:not(.card)'))
+        self.assertFalse(usage.matches('.card .title'))
+        self.assertFalse(usage.matches('.hero > .menu'))
+        self.assertFalse(usage.matches('.card:not(.card)'))
+        self.assertFalse(usage.matches('.hero:hover'))
+        self.assertFalse(usage.matches('.missing'))
+
+    def test_only_first_blocks_are_read(self):
+        usage = self.usage('<div class="a"></div><div class="b"></div><div class="c"></div>', blocks=2)
+        self.assertTrue(usage.matches('main .b'))
+        self.assertFalse(usage.matches('.c'))
+
+    def test_critical_css_keeps_matching_rules_media_and_keyframes(self):
+        nodes = critical.parse_css(
+            '.hero { animation: fade 1s }  .card { color: red }'
+            '@media (max-width: 600px) { .hero, .card { padding: 0 } .card { margin: 0 } }'
+            '@keyframes fade { from { opacity: 0 } to { opacity: 1 } } @keyframes spin { to { opacity: 0 } }'
+        )
+        self.assertEqual(
+            critical.critical_css(nodes, self.usage('<section class="hero"></section>')),
+            '.hero{animation:fade 1s}@media (max-width: 600px){.hero{padding:0}}'
+            '@keyframes fade{from { opacity: 0 } to { opacity: 1 }}',
+        )
+
+    def test_page_over_budget_falls_back_to_stylesheet(self):
+        sources = {
+            'core/base.html': self.BASE,
+            'core/page.html': '{% extends "core/base.html" %}{% block content %}'
+                              '<div class="a"></div><div class="b"></div>{% endblock %}',
+        }
+        nodes = critical.parse_css('.a { color: red } .b { background: url("%s") }' % ('x' * 200))
+        self.assertEqual(critical.page_critical_css(nodes, 'core/page.html', sources, 1024).count('{'), 2)
+        self.assertEqual(critical.page_critical_css(nodes, 'core/page.html', sources, 100), '.a{color:red}')
+        with self.assertLogs('core.critical', 'WARNING') as logs:
+            self.assertEqual(critical.page_critical_css(nodes, 'core/page.html', sources, 5), '')
+            self.assertEqual(critical.build_pages('.a { color: red }', sources, max_bytes=5), {'core/page.html': ''})
+        self.assertIn('core/page.html', logs.output[0])
+
+
+class SimilarityTests(SimpleTestCase):
+    def save_image(self, colors, size=(8, 8)):
+        """colors: sol/sağ yarılar için renkler; tek renk verilirse düz görsel"""
+        image = Image.new('RGB', size, colors[0])
+        if len(colors) > 1:
+            image.paste(colors[1], (size[0] // 2, 0, size[0], size[1]))
+        handle, path = tempfile.mkstemp(suffix='.png')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        image.save(path)
+        return path
+
+    def test_text_vectors_weight_rare_tokens_higher(self):
+        vectors = similarity.text_vectors(
+            [['ortak', 'nadir'], ['ortak', 'ahşap'], ['ortak', 'ahşap'], []], dimensions=1 << 20,
+        )
+        self.assertEqual(vectors.shape, (4, 1 << 20))
+        np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, rtol=1e-6)
+        self.assertFalse(vectors[3].any())
+        np.testing.assert_array_equal(vectors[1], vectors[2])
+        # 4 belge; ortak 3'ünde, nadir 1'inde -> idf = log(5/4) + 1 ve log(5/2) + 1
+        weights = sorted(np.abs(vectors[0][vectors[0] != 0]))
+        self.assertAlmostEqual(weights[1] / weights[0], (np.log(5 / 2) + 1) / (np.log(5 / 4) + 1), places=5)
+        self.assertGreater(vectors[1] @ vectors[2], vectors[0] @ vectors[1])
+
+    def test_text_vectors_ignore_repeated_tokens(self):
+        vectors = similarity.text_vectors([['kapı', 'kapı', 'kol'], ['kapı', 'kol']])
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+
+    def test_color_histogram_of_solid_and_two_color_images(self):
+        bins = similarity.COLOR_BINS
+        red = (bins - 1) * bins * bins
+        blue = bins - 1
+        solid = similarity.color_histogram(self.save_image([(255, 0, 0)]))
+        self.assertEqual(solid.shape, (bins ** 3,))
+        self.assertEqual(np.flatnonzero(solid).tolist(), [red])
+        self.assertAlmostEqual(float(solid[red]), 1.0)
+
+        mixed = similarity.color_histogram(self.save_image([(255, 0, 0), (0, 0, 255)]))
+        self.assertEqual(np.flatnonzero(mixed).tolist(), [blue, red])
+        np.testing.assert_allclose(mixed[[blue, red]], np.sqrt(0.5), rtol=1e-6)
+        self.assertAlmostEqual(float(np.linalg.norm(mixed)), 1.0, places=6)
+
+    def test_color_histogram_of_unreadable_image_is_zero(self):
+        histogram = similarity.color_histogram('/olmayan/gorsel.jpg')
+        self.assertEqual(histogram.shape, (similarity.COLOR_BINS ** 3,))
+        self.assertFalse(histogram.any())
+
+    def test_combine_weights_text_and_color(self):
+        text = np.array([[1, 0], [1, 0]], dtype=np.float32)
+        colors = np.array([[2, 0], [0, 3]], dtype=np.float32)
+        combined = similarity.combine(text, colors)
+        self.assertAlmostEqual(float(combined[0] @ combined[0]), 1.0, places=6)
+        self.assertAlmostEqual(float(combined[0] @ combined[1]), similarity.TEXT_WEIGHT, places=6)
+
+    def vectors(self, *degrees):
+        radians = np.radians(degrees)
+        return np.stack([np.cos(radians), np.sin(radians)], axis=1).astype(np.float32)
+
+    def test_top_k_neighbors_in_similarity_order(self):
+        vectors = self.vectors(0, 10, 30, 90)
+        self.assertEqual(similarity.top_k_neighbors(vectors, 2).tolist(), [[1, 2], [0, 2], [1, 0], [2, 1]])
+        neighbors = similarity.top_k_neighbors(vectors, 3, batch_size=1)
+        self.assertEqual(neighbors.tolist(), [[1, 2, 3], [0, 2, 3], [1, 0, 3], [2, 1, 0]])
+        for row, indexes in enumerate(neighbors):
+            self.assertNotIn(row, indexes)
+
+    def test_top_k_neighbors_excludes_identical_self(self):
+        vectors = self.vectors(0, 0, 60)
+        self.assertEqual(similarity.top_k_neighbors(vectors, 1)[:2].tolist(), [[1], [0]])
+
+    def test_top_k_neighbors_with_k_larger_than_catalog(self):
+        neighbors = similarity.top_k_neighbors(self.vectors(0, 10, 30), 10)
+        self.assertEqual(neighbors.shape, (3, 2))
+        self.assertEqual(similarity.top_k_neighbors(self.vectors(0), 5).shape, (1, 0))
+        self.assertEqual(similarity.top_k_neighbors(self.vectors(0, 10), 0).shape, (2, 0))
+
+
+class RelatedProductsTests(TestCase):
+    FILES = ['Zincir.jpg', 'Açık_Nal_Büyük.jpg', 'Kapalı_Nal_Büyük.jpg', 'Bant.jpg', 'Açık_Nal_Küçük.jpg']
+
+    def setUp(self):
+        patcher = mock.patch.object(products, '_related', (None, {}))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rank_by_shared_tokens_then_name(self):
+        related = products.rank_related(self.FILES, count=4)
+        self.assertEqual(related['Açık_Nal_Büyük.jpg'],
+                         ('Açık_Nal_Küçük.jpg', 'Kapalı_Nal_Büyük.jpg', 'Bant.jpg', 'Zincir.jpg'))
+        self.assertEqual(related['Açık_Nal_Küçük.jpg'],
+                         ('Açık_Nal_Büyük.jpg', 'Kapalı_Nal_Büyük.jpg', 'Bant.jpg', 'Zincir.jpg'))
+        # Ortak kelimesi olmayan dosya alfabetik komşularla tamamlanır
+        self.assertEqual(related['Zincir.jpg'],
+                         ('Açık_Nal_Büyük.jpg', 'Açık_Nal_Küçük.jpg', 'Bant.jpg', 'Kapalı_Nal_Büyük.jpg'))
+        self.assertEqual(products.rank_related(self.FILES, count=1)['Kapalı_Nal_Büyük.jpg'], ('Açık_Nal_Büyük.jpg',))
+        for name, ranked in related.items():
+            self.assertNotIn(name, ranked)
+
+    def test_common_tokens_are_not_counted(self):
+        with mock.patch.object(products, 'COMMON_TOKEN_LIMIT', 2):
+            related = products.rank_related(self.FILES, count=4)
+        self.assertEqual(related['Açık_Nal_Küçük.jpg'],
+                         ('Açık_Nal_Büyük.jpg', 'Bant.jpg', 'Kapalı_Nal_Büyük.jpg', 'Zincir.jpg'))
+
+    def test_small_category(self):
+        self.assertEqual(products.rank_related(['Tek.jpg']), {'Tek.jpg': ()})
+        self.assertEqual(products.rank_related(['A.jpg', 'B.jpg']), {'A.jpg': ('B.jpg',), 'B.jpg': ('A.jpg',)})
+
+    def records(self, neighbors_stamp=None):
+        catalog = CatalogIndex([make_entry(name, 'nal') for name in self.FILES], source='test', version=1)
+        return products.ProductRecords(catalog, get_category_registry(), {}, neighbors_stamp)
+
+    def test_records_fall_back_to_token_ranking_without_neighbors(self):
+        expected = products.rank_related(self.FILES)
+        records = self.records()
+        for name in self.FILES:
+            self.assertEqual(records.get(name).related, expected[name])
+
+    def test_records_prefer_precomputed_neighbors(self):
+        expected = products.rank_related(self.FILES)
+        zincir = image_key_for('Zincir.jpg')
+        ProductNeighbors.objects.create(image_key=zincir, neighbors=[
+            image_key_for('Bant.jpg'), 'olmayan', zincir, image_key_for('Kapalı_Nal_Büyük.jpg'),
+        ])
+        # Hiçbir anahtarı katalogda olmayan kayıt kelime sıralamasına düşer
+        ProductNeighbors.objects.create(image_key=image_key_for('Bant.jpg'), neighbors=['olmayan'])
+        records = self.records(neighbors_stamp=(2, None))
+        self.assertEqual(records.get('Zincir.jpg').related, ('Bant.jpg', 'Kapalı_Nal_Büyük.jpg'))
+        self.assertEqual(records.get('Bant.jpg').related, expected['Bant.jpg'])
+        self.assertEqual(records.get('Açık_Nal_Büyük.jpg').related, expected['Açık_Nal_Büyük.jpg'])
+
+
+class PlaceholderTests(SimpleTestCase):
+    RED = (200, 30, 40)
+    GREEN = (20, 180, 60)
+
+    def decode(self, uri):
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(uri.startswith(prefix))
+        data = base64.b64decode(uri[len(prefix):])
+        # Satır içi yer tutucu HTML'i şişirmemeli
+        self.assertLess(len(data), 200)
+        image = Image.open(io.BytesIO(data))
+        self.assertEqual(image.format, 'WEBP')
+        return image.convert('RGB')
+
+    def assertColorNear(self, actual, expected, tolerance=24):
+        self.assertTrue(all(abs(a - b) <= tolerance for a, b in zip(actual, expected)), f'{actual} != {expected}')
+
+    def test_solid_image(self):
+        uri, color = placeholders.analyze(Image.new('RGB', (120, 60), self.RED))
+        self.assertEqual(color, '#c81e28')
+        placeholder = self.decode(uri)
+        self.assertEqual(placeholder.size, (placeholders.PLACEHOLDER_CELLS, placeholders.PLACEHOLDER_CELLS // 2))
+        for pixel in placeholder.getdata():
+            self.assertColorNear(pixel, self.RED)
+
+    def test_two_color_image(self):
+        image = Image.new('RGB', (120, 60), self.RED)
+        image.paste(self.GREEN, (72, 0, 120, 60))
+        uri, color = placeholders.analyze(image)
+        # Baskın renk en çok alanı kaplayan renktir, karışımları değil
+        self.assertEqual(color, '#c81e28')
+        self.assertEqual(placeholders.dominant_color(np.array([[self.RED, self.GREEN, self.GREEN]], np.uint8)), '#14b43c')
+        placeholder = self.decode(uri)
+        self.assertColorNear(placeholder.getpixel((0, 1)), self.RED, tolerance=48)
+        self.assertColorNear(placeholder.getpixel((5, 1)), self.GREEN, tolerance=48)
+
+    def test_block_means_keep_aspect_ratio(self):
+        pixels = np.zeros((90, 30, 3), dtype=np.uint8)
+        pixels[45:] = 255
+        means = placeholders.block_means(pixels, 6)
+        self.assertEqual(means.shape, (6, 2, 3))
+        self.assertEqual((means[0, 0, 0], means[-1, -1, 0]), (0, 255))
+        self.assertEqual(placeholders.block_means(pixels[:2, :4], 6).shape, (2, 4, 3))
+
+    def test_transparent_image_has_no_placeholder(self):
+        self.assertEqual(placeholders.analyze(Image.new('RGBA', (10, 10), (0, 0, 0, 0))), (None, None))
+
+    def test_file_is_read_upright(self):
+        handle, path = tempfile.mkstemp(suffix='.jpg')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = 6
+        Image.new('RGB', (120, 60), self.RED).save(path, 'JPEG', exif=exif)
+        uri, color = placeholders.analyze_file(path)
+        self.assertEqual(self.decode(uri).size, (3, 6))
+        self.assertColorNear(ImageColor.getrgb(color), self.RED, tolerance=8)
+
+
+class CategorySpriteTests(TestCase):
+    FILES = ('Açık_Nal.jpg', 'Nal_Çivisi.jpg', 'Zincir.jpg')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.products_dir = os.path.join(tmp.name, 'images', 'New folder')
+        self.sprites_dir = os.path.join(tmp.name, 'derivatives', sprites.SPRITES_DIR)
+        os.makedirs(self.products_dir)
+        for position, name in enumerate(self.FILES):
+            self.save_image(name, (position * 80, 40, 40))
+        self.manifest_path = os.path.join(tmp.name, 'catalog.json')
+        settings_override = override_settings(
+            STATIC_ROOT=tmp.name, CATALOG_MANIFEST_PATH=self.manifest_path,
+            IMAGE_DERIVATIVES_ROOT=os.path.join(tmp.name, 'derivatives'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = mock.patch.object(sprites, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.write_catalog()
+
+    def save_image(self, name, color):
+        Image.new('RGB', (90, 100), color).save(os.path.join(self.products_dir, name), 'JPEG')
+
+    def write_catalog(self):
+        # build_catalog_manifest gibi: kayıtlar içerik özetini taşır
+        write_manifest(scan_directory(self.products_dir), self.manifest_path)
+        invalidate_catalog()
+
+    def build(self):
+        out = StringIO()
+        call_command('build_category_sprites', stdout=out)
+        return out.getvalue()
+
+    def sprite_manifest(self):
+        return sprites.load_sprite_manifest(os.path.join(self.sprites_dir, sprites.SPRITE_MANIFEST_NAME))
+
+    def lookup(self, slug):
+        catalog = get_catalog()
+        entries = [catalog.get_entry(name) for name in catalog.category_products[slug][:sprites.SPRITE_TILE_COUNT]]
+        return sprites.get_sprite_index().get(slug, entries)
+
+    def test_builds_atlas_per_category(self):
+        self.assertIn('2 kategori atlası üretildi', self.build())
+        record = self.sprite_manifest()['nalbant']
+        self.assertEqual(record['files'], ['Açık_Nal.jpg', 'Nal_Çivisi.jpg'])
+        self.assertEqual(set(record['variants']), set(sprites.SPRITE_FORMATS))
+        cell_width, cell_height = sprites.SPRITE_CELL_SIZE
+        for file_name in record['variants'].values():
+            self.assertIn(record['key'], file_name)
+            with Image.open(os.path.join(self.sprites_dir, file_name)) as atlas:
+                self.assertEqual(atlas.size, (cell_width * 2, cell_height))
+        self.assertEqual(self.lookup('nalbant'), record)
+        self.assertIn('0 kategori atlası üretildi, 2 atlas değişmediği için atlandı', self.build())
+
+    def test_changed_image_makes_atlas_stale(self):
+        self.build()
+        old = self.sprite_manifest()['nalbant']
+        self.save_image('Açık_Nal.jpg', (255, 255, 0))
+        self.write_catalog()
+        # Atlas yeniden üretilene kadar eski kayıt özet tutmadığı için kullanılmaz
+        self.assertIsNone(self.lookup('nalbant'))
+        self.assertIn('1 kategori atlası üretildi, 1 atlas değişmediği için atlandı, 2 eski atlas silindi', self.build())
+        new = self.sprite_manifest()['nalbant']
+        self.assertNotEqual(new['key'], old['key'])
+        self.assertEqual(self.lookup('nalbant'), new)
+        for file_name in old['variants'].values():
+            self.assertFalse(os.path.exists(os.path.join(self.sprites_dir, file_name)))
+
+    def test_home_falls_back_to_single_tiles(self):
+        Category.objects.create(name='Nalbant Ekipmanları', slug='nalbant-ekipmanlari')
+        invalidate_categories()
+        patcher = mock.patch('core.templatetags.assets.get_critical_css', return_value='')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def home():
+            request = RequestFactory().get('/')
+            request.user = AnonymousUser()
+            return views._render_home(request, 0)[0].decode()
+
+        self.assertIsNone(self.lookup('nalbant'))
+        self.assertNotIn('category-product__img--sprite', home())
+        self.build()
+        page = home()
+        self.assertEqual(page.count('category-product__img--sprite'), 2)
+        self.assertIn(self.sprite_manifest()['nalbant']['variants']['webp'], page)
+        # Kategoriye yeni görsel eklenince atlas eskir, karolar tek tek yüklenir
+        self.save_image('Nal_Kerpeteni.jpg', (0, 0, 200))
+        self.write_catalog()
+        self.assertNotIn('category-product__img--sprite', home())
@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+
+# Türkçe harflerin ASCII karşılıkları (ı/İ gibi harfler NFKD ile doğru ayrışmaz)
+_TURKISH_MAP = str.maketrans({
+    'ı': 'i', 'İ': 'i', 'I': 'i',
+    'ş': 's', 'Ş': 's',
+    'ğ': 'g', 'Ğ': 'g',
+    'ç': 'c', 'Ç': 'c',
+    'ö': 'o', 'Ö': 'o',
+    'ü': 'u', 'Ü': 'u',
+    'â': 'a', 'Â': 'a',
+    'î': 'i', 'Î': 'i',
+    'û': 'u', 'Û': 'u',
+})
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def turkish_fold(text):
+    """Metni Türkçe kurallarına göre küçült ve ASCII'ye indir (Işık -> isik)"""
+    text = (text or '').translate(_TURKISH_MAP).lower()
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def normalize_key(text):
+    """Dosya adı ve ürün adı için ortak eşleşme anahtarı
+
+    'Açık_Nal', 'Acik Nal' ve 'ACIK-NAL' aynı anahtarı ('acik-nal') üretir.
+    """
+    return _NON_ALNUM.sub('-', turkish_fold(text)).strip('-')
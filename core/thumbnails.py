@@ -0,0 +1,318 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils._os import safe_join
+from PIL import Image, ImageOps
+
+try:
+    import fcntl
+except ImportError:  # Windows: yalnızca aynı süreçteki istekler birleştirilir
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# İzin verilen en büyük küçük görsel kenarı (piksel)
+MAX_DIMENSION = 2000
+
+# Biçim -> (Pillow biçimi, uzantı, MIME tipi, kayıt ayarları)
+THUMBNAIL_FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif', {'quality': 55}),
+    'webp': ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'png', 'image/png', {'optimize': True}),
+}
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+
+_SIZE = re.compile(r'^(\d{1,4})x(\d{1,4})$')
+
+# Önbellek boyutu sınırı aşıldığında en eski dosyalar bu orana inene kadar silinir
+EVICT_TO_RATIO = 0.9
+
+# İsabetlerde mtime en fazla bu aralıkla güncellenir (LRU sırası için, saniye)
+TOUCH_INTERVAL = 3600
+
+
+def sign(size, path):
+    """Boyut ve yol için imza (URL'deki parametrelerin değiştirilmesini engeller)"""
+    return salted_hmac('core.thumbnails', f'{size}/{path}').hexdigest()[:16]
+
+
+def verify(size, path, signature):
+    return bool(signature) and constant_time_compare(sign(size, path), signature)
+
+
+def thumbnail_url(image, width, height=0):
+    """Media dosyası (ImageField değeri ya da göreli yol) için imzalı /thumb/ URL'si
+
+    height=0 ise en-boy oranı korunarak yalnızca genişlik sınırlanır.
+    """
+    name = getattr(image, 'name', image)
+    if not name:
+        return ''
+    size = f'{int(width)}x{int(height)}'
+    return f"{reverse('core:thumbnail', kwargs={'size': size, 'path': name})}?s={sign(size, name)}"
+
+
+def parse_size(size):
+    """'400x300' -> (400, 300); geçersizse None"""
+    match = _SIZE.match(size)
+    if not match:
+        return None
+    width, height = int(match.group(1)), int(match.group(2))
+    if not (0 < width <= MAX_DIMENSION and 0 <= height <= MAX_DIMENSION):
+        return None
+    return width, height
+
+
+def available_formats():
+    Image.init()
+    return {name for name, (pil_format, *_) in THUMBNAIL_FORMATS.items() if pil_format in Image.SAVE}
+
+
+def negotiate_format(accept, source, formats=None):
+    """Accept başlığına göre biçim: avif > webp > (saydamsa png, değilse jpeg)"""
+    formats = available_formats() if formats is None else formats
+    accept = accept or ''
+    for name in ('avif', 'webp'):
+        if f'image/{name}' in accept and name in formats:
+            return name
+    if source.lower().endswith(('.jpg', '.jpeg')):
+        return 'jpeg'
+    # Yalnızca başlık okunur; piksel verisi çözülmez
+    try:
+        with Image.open(source) as image:
+            return 'png' if _has_alpha(image) else 'jpeg'
+    except (OSError, ValueError):
+        return 'jpeg'
+
+
+def get_cache_root():
+    root = getattr(settings, 'THUMBNAIL_CACHE_ROOT', None)
+    return str(root) if root else os.path.join(str(settings.MEDIA_ROOT), 'cache', 'thumbs')
+
+
+def source_path(path):
+    """Media altındaki kaynak görselin mutlak yolu; geçersizse None"""
+    if not path.lower().endswith(SOURCE_EXTENSIONS):
+        return None
+    try:
+        full_path = safe_join(str(settings.MEDIA_ROOT), path)
+    except SuspiciousFileOperation:  # MEDIA_ROOT dışına çıkan yol
+        return None
+    if full_path.startswith(get_cache_root()) or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def render_thumbnail(source, destination, width, height, format_name):
+    """Kaynağı width x height kutusuna sığdırıp destination'a yaz (atomik)"""
+    pil_format, _, _, options = THUMBNAIL_FORMATS[format_name]
+    with Image.open(source) as image:
+        box = (width, height or MAX_DIMENSION)
+        image.draft('RGB', box)
+        image = ImageOps.exif_transpose(image)
+        alpha = _has_alpha(image)
+        image = image.convert('RGBA' if alpha and format_name != 'jpeg' else 'RGB')
+        image.thumbnail(box, Image.LANCZOS)
+
+    directory = os.path.dirname(destination)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            image.save(fh, pil_format, **options)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(destination)
+
+
+class ThumbnailCache:
+    """Boyut sınırlı disk önbelleği
+
+    Dosya adı kaynak yolu, kaynağın mtime'ı, boyut ve biçimden türetilir;
+    kaynak değişince yeni dosya üretilir. İsabetlerde mtime güncellenir ve
+    sınır aşılınca en eski mtime'lı dosyalar silinir (LRU). Aynı dosya için
+    eşzamanlı soğuk istekler worker içinde kilitle, worker'lar arasında
+    dosya kilidiyle (fcntl) tek üretime indirilir.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._size = None
+        self._size_lock = threading.Lock()
+
+    def key(self, source, size, format_name):
+        stat = os.stat(source)
+        raw = f'{source}:{stat.st_mtime_ns}:{stat.st_size}:{size}:{format_name}'
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, key, format_name):
+        return os.path.join(self.root, key[:2], f'{key}.{THUMBNAIL_FORMATS[format_name][1]}')
+
+    def _key_lock(self, key):
+        with self._locks_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _release_key_lock(self, key):
+        with self._locks_lock:
+            self._locks.pop(key, None)
+
+    def get_or_create(self, key, format_name, render):
+        """Önbellekteki dosyanın yolu; yoksa ``render(hedef)`` ile bir kez üret"""
+        path = self.path_for(key, format_name)
+        if self._touch(path):
+            return path
+
+        try:
+            with self._key_lock(key):
+                if not os.path.exists(path):
+                    self._create(path, render)
+        finally:
+            self._release_key_lock(key)
+        return path
+
+    def _create(self, path, render):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_path = f'{path}.lock'
+        with open(lock_path, 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Başka bir worker kilidi tutarken üretmiş olabilir
+                if not os.path.exists(path):
+                    self._added(render(path))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+    def _touch(self, path):
+        """Dosya varsa LRU sırası için mtime'ını güncelle"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False
+        current = time.time()
+        if current - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path, (current, current))
+            except OSError:
+                pass
+        return True
+
+    def _files(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(('.tmp', '.lock')):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _added(self, size):
+        with self._size_lock:
+            if self._size is None:
+                self._size = sum(file_size for _, file_size, _ in self._files())
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """En eski kullanılan dosyaları sınırın EVICT_TO_RATIO oranına inene kadar sil"""
+        files = sorted(self._files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * EVICT_TO_RATIO
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+def get_thumbnail(path, width, height, accept):
+    """İstek için önbellekteki küçük görsel: (dosya yolu, biçim, anahtar) ya da None
+
+    Kaynak yoksa ya da okunamıyorsa None döner.
+    """
+    source = source_path(path)
+    if source is None:
+        return None
+    format_name = negotiate_format(accept, source)
+    try:
+        file_path, key = cached_thumbnail(source, width, height, format_name)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Küçük görsel üretilemedi (%s): %s', source, exc)
+        return None
+    return file_path, format_name, key
+
+
+def cached_thumbnail(source, width, height, format_name):
+    """Önbellekteki küçük görselin (yolu, anahtarı); yoksa üretilir"""
+    cache = get_thumbnail_cache()
+    key = cache.key(source, f'{width}x{height}', format_name)
+    file_path = cache.get_or_create(
+        key, format_name, lambda destination: render_thumbnail(source, destination, width, height, format_name),
+    )
+    return file_path, key
+
+
+def warm_thumbnails(path, sizes):
+    """Verilen boyutların tarayıcıların isteyebileceği tüm biçimlerini önceden üret"""
+    source = source_path(path)
+    if source is None:
+        return 0
+    formats = [name for name in ('avif', 'webp') if name in available_formats()]
+    formats.append(negotiate_format('', source))
+    for width, height in sizes:
+        for format_name in formats:
+            cached_thumbnail(source, width, height, format_name)
+    return len(sizes) * len(formats)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_bytes = getattr(settings, 'THUMBNAIL_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+                _cache = ThumbnailCache(get_cache_root(), max_bytes)
+    return _cache
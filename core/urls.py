@@ -1,16 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'core'
 
+# ASGI modunda ana sayfa, listelemeler ve arama önerileri async görünümlerle sunulur
+listing_views = async_views if getattr(settings, 'ASGI_MODE', False) else views
+
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', listing_views.home, name='home'),
     path('kategoriler/', views.category_list, name='category_list'),
-    path('kategori/<slug:slug>/', views.category_detail, name='category_detail'),
-    path('urunler/', views.product_list, name='product_list'),
+    path('kategori/<slug:slug>/', listing_views.category_detail, name='category_detail'),
+    path('urunler/', listing_views.product_list, name='product_list'),
     path('urun/<str:product_name>/', views.product_detail, name='product_detail'),
     path('blog/', views.blog_list, name='blog_list'),
     path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
-    path('api/search-suggestions/', views.search_suggestions, name='search_suggestions'),
+    path('thumb/<str:size>/<path:path>', views.thumbnail, name='thumbnail'),
+    path('api/search-suggestions/', listing_views.search_suggestions, name='search_suggestions'),
     path('cikis/', views.logout_view, name='logout'),
 ]
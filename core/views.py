@@ -1,363 +1,394 @@
-import os
 import random
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.db.models import Q
+import time
 from django.conf import settings
-from django.utils.text import slugify
+from django.shortcuts import render, get_object_or_404, redirect
+from django.http import HttpResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.contrib.auth import logout
-from .models import Category, Product, ShowcaseModel
+from django.views.decorators.http import require_safe
+from .models import Product, BlogPost, ShowcaseModel
+from .catalog import get_catalog, use_db_catalog, catalog_file_for_image, display_name_for, image_key_for
+from .search import get_search_index
+from .suggest import get_suggestion_index
+from .categories import CATEGORY_MAPPING, get_category_registry
+from .products import RELATED_COUNT, get_product_records
+from .pagecache import get_cached_page
+from .sprites import SPRITE_TILE_COUNT, get_sprite_index
+from . import thumbnails
+from .derivatives import is_derivative_file
+from .mediafiles import IMMUTABLE_MAX_AGE, media_path, serve_file
+from . import fulltext
+from .pagination import (
+    CachedCountPaginator, KeysetPaginator, SortedListCursorPaginator, page_count, use_cursor_pagination,
+)
 
 
 def _get_products_by_category():
     """Kategorilere göre ürün dosyalarını getir - helper fonksiyon"""
-    # Ürün dosyalarını kategorilere göre grupla
-    category_products = {}
-    
-    static_root = getattr(settings, 'STATIC_ROOT', None)
-    if static_root:
-        products_dir = os.path.join(static_root, 'images', 'New folder')
-    else:
-        products_dir = os.path.join(settings.BASE_DIR, 'static', 'images', 'New folder')
-    
-    if not os.path.exists(products_dir):
-        return category_products
-    
-    all_files = [f for f in os.listdir(products_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif'))]
-    
-    category_keywords = {
-        'eyer': ['araba', 'hamut', 'fayton', 'takimi'],
-        'kosum-takimi': ['gem', 'getir', 'kolon', 'uzengi', 'dizgin', 'baslik', 'yular', 'martingal', 'gogusluk', 'araka', 'pert', 'tokatli', 'lastikli', 'ithal', 'yerli', 'dortlu', 'uclu', 'zincirli', 'capraz', 'v_alinsalik', 'burunsalik', 'metal_islemeli', 'rugan', 'zincir_islemeli'],
-        'timar': ['firca', 'kil', 'tarak', 'gebre', 'kasagi', 'maya', 'bicagi', 'temizleme', 'tuy', 'toplayici', 'plastik_firca', 'kil_firca', 'fircali', 'ahsap', 'plastik_kasagi'],
-        'bakim': ['bandaj', 'yele', 'blanket', 'ter', 'maskesi', 'absorbine', 'red_cell', 'elite', 'electroltyle', 'animalintex', 'cool_cast', 'powerflex', 'polar', 'at_maskesi', 'tam_boy', 'yarim_boy', 'ter_ve_su'],
-        'nalbant': ['nal', 'civi', 'cekm', 'pensesi', 'kerpeten', 'dovme', 'nalbant', 'acik_nal', 'kapali_nal'],
-        'binici': ['eyer', 'eldiven', 'togu', 'yelegi', 'chaps', 'mahmuz', 'binici', 'suvari', 'western', 'avrupa', 'alman', 'endurance', 'pony', 'konfor', 'idman', 'yaprak', 'pelus', 'uzengi_kayisi', 'krom_uzengi', 'plastik_uzengi', 'kazan_uzengi']
+    # Worker'daki katalog indeksinden oku (dizin her istekte taranmaz)
+    return get_catalog().category_products
+
+
+# Arama önerisi yanıtlarının tarayıcı/proxy önbellek süresi (saniye)
+SUGGESTIONS_MAX_AGE = 300
+
+# Küçük görsellerin önbellek süresi (saniye); kaynak değişirse URL aynı kalır, ETag değişir
+THUMBNAIL_MAX_AGE = 86400
+
+# Admin'den yüklenen ürün görselleri için küçük görsel genişlikleri (kartlar 2x ekranlar için)
+CARD_THUMBNAIL_WIDTH = 640
+DETAIL_THUMBNAIL_WIDTH = 1280
+
+
+def _resolve_db_products(file_names):
+    """Dosya adlarını Product objeleriyle toplu eşle - tek indeksli sorgu (image_key__in)"""
+    keys = {file_name: image_key_for(file_name) for file_name in file_names}
+    if not keys:
+        return {}
+    by_key = Product.objects.filter(is_active=True).in_bulk(set(keys.values()), field_name='image_key')
+    return {file_name: by_key[key] for file_name, key in keys.items() if key in by_key}
+
+
+def _db_product_card(product):
+    """Product kaydını şablonların beklediği ürün kartı sözlüğüne çevir"""
+    file_name = catalog_file_for_image(product.main_image.name)
+    if file_name:
+        return {'name': file_name, 'path': f'images/New folder/{file_name}', 'db_product': product}
+    # Admin'den eklenmiş ürün: görsel media'dan gelir, URL slug ile kurulur
+    return {
+        'name': product.slug,
+        'path': None,
+        'image_url': thumbnails.thumbnail_url(product.main_image, CARD_THUMBNAIL_WIDTH),
+        'db_product': product,
     }
-    
-    matched_files_all = set()
-    for cat_slug, keywords in category_keywords.items():
-        matched_files = [
-            file for file in all_files 
-            if file not in matched_files_all 
-            and any(keyword.lower() in file.lower() for keyword in keywords)
-        ]
-        for file in matched_files:
-            matched_files_all.add(file)
-        category_products[cat_slug] = sorted(matched_files)
-    
-    unmatched = [f for f in all_files if f not in matched_files_all]
-    if unmatched:
-        category_products['diger'] = sorted(unmatched)
-    
-    return category_products
+
+
+def _paginator(request, items, per_page, keyset=None):
+    """Liste/QuerySet için sayfalayıcı ve istenen sayfa: (paginator, sayfa numarası ya da imleç)
+    
+    PAGINATION_MODE='cursor' iken ``keyset`` verilmişse imleçle (?cursor=)
+    sayfalanır: QuerySet için anahtar alanları, sıralı dosya listesi için
+    True. Aksi halde sayfa numaralı (?page=) Paginator kullanılır; QuerySet
+    sayımı önbellekten gelir. Senkron görünümler ``get_page``, async
+    görünümler ``aget_page`` çağırır.
+    """
+    if keyset and use_cursor_pagination():
+        cursor = request.GET.get('cursor')
+        if keyset is True:
+            return SortedListCursorPaginator(items, per_page), cursor
+        return KeysetPaginator(items, per_page, keyset), cursor
+    return CachedCountPaginator(items, per_page), request.GET.get('page')
+
+
+def _paginate(request, items, per_page, keyset=None):
+    """Listeyi/QuerySet'i sayfala (bkz. _paginator)"""
+    paginator, number = _paginator(request, items, per_page, keyset)
+    return paginator.get_page(number)
+
+
+# İmleçli sayfalamada Product ve BlogPost anahtarı (created_at, id indeksli)
+KEYSET_ORDERING = ('-created_at', '-id')
+
+# Listeleme sayfalarında sayfa başına ürün
+PRODUCTS_PER_PAGE = 12
+
+
+def _product_cards(products_page, resolve=False):
+    """Sayfadaki Product kayıtlarını ya da katalog dosya adlarını şablonun ürün kartlarına çevir
+
+    ``resolve`` ise dosya adları sayfadaki ürünlerle tek sorguda eşlenir (Sketchfab için).
+    """
+    rows = list(products_page.object_list)
+    if rows and isinstance(rows[0], Product):
+        products_page.object_list = [_db_product_card(p) for p in rows]
+        return products_page
+    db_products = _resolve_db_products(rows) if resolve else {}
+    products_page.object_list = [
+        {'name': p, 'path': f'images/New folder/{p}', 'db_product': db_products.get(p)} for p in rows
+    ]
+    return products_page
 
 
 def home(request):
-    """Ana sayfa"""
-    showcase_models = ShowcaseModel.objects.filter(is_active=True).order_by('sort_order')[:8]
+    """Ana sayfa - render edilmiş HTML (ve gzip/br varyantları) worker'da önbellekten sunulur
     
-    # Kategori mapping: CSS class ve görsel dosya adları
-    category_mapping = {
-        'At Koşu Ekipmanları': {
-            'css_class': 'cat--racing',
-            'image': 'kosum-takimi.jpg',
-            'slug_map': 'kosum-takimi'
-        },
-        'Tımar Ekipmanları': {
-            'css_class': 'cat--grooming',
-            'image': 'timar.jpg',
-            'slug_map': 'timar'
-        },
-        'At Bakım Ekipmanları': {
-            'css_class': 'cat--care',
-            'image': 'bakim.jpg',
-            'slug_map': 'bakim'
-        },
-        'Nalbant Ekipmanları': {
-            'css_class': 'cat--farrier',
-            'image': 'nalbant.jpg',
-            'slug_map': 'nalbant'
-        },
-        'Binici Ekipmanları': {
-            'css_class': 'cat--rider',
-            'image': 'binici.jpg',
-            'slug_map': 'binici'
-        },
-        'Araba ve Fayton Takımı': {
-            'css_class': 'cat--carriage',
-            'image': 'eyer.jpg',
-            'slug_map': 'eyer'
-        }
-    }
-    
-    categories = Category.objects.filter(is_active=True).order_by('sort_order')[:6]
+    Öne çıkan ve yeni ürün seçimleri HOME_ROTATION_SECONDS'lik zaman dilimine
+    göre belirlenir; dilim değişince, katalog ya da Category/ShowcaseModel
+    değişince sayfa yeniden render edilir.
+    """
+    return _home_page(request).response(request)
+
+
+def _home_page(request):
+    """Ana sayfanın güncel zaman dilimine ait önbellekli sayfası (RenderedPage)"""
+    rotation = getattr(settings, 'HOME_ROTATION_SECONDS', 600)
+    bucket = int(time.time() // rotation)
+    return get_cached_page('home', bucket, (bucket + 1) * rotation, lambda: _render_home(request, bucket))
+
+
+def _rotating_pick(files, count, bucket, salt):
+    """Zaman dilimine göre deterministik seçim - aynı dilimde tüm worker'lar aynı ürünleri seçer"""
+    rng = random.Random(f'{salt}:{bucket}')
+    return rng.sample(files, min(count, len(files)))
+
+
+def _render_home(request, bucket):
+    """Ana sayfa HTML'i (bytes, content type)"""
+    showcase_models = ShowcaseModel.objects.filter(is_active=True).order_by('sort_order')[:8]
     
-    # Kategorilere mapping bilgisini ekle
-    categories_with_mapping = []
-    for category in categories:
-        mapping = category_mapping.get(category.name, {
-            'css_class': 'cat--racing',
-            'image': 'kosum-takimi.jpg',
-            'slug_map': category.slug if hasattr(category, 'slug') else category.name.lower().replace(' ', '-')
-        })
-        # Eğer kategori modelinde image varsa onu kullan, yoksa fallback static dosya kullan
-        if category.image:
-            mapping['image'] = None  # Template'te category.image.url kullanılacak
-            mapping['use_media_image'] = True
-        else:
-            mapping['use_media_image'] = False
-        categories_with_mapping.append({
-            'category': category,
-            'mapping': mapping
-        })
+    # Kategoriler ve CSS/görsel/katalog eşlemeleri worker'daki kategori kaydından
+    registry = get_category_registry()
+    categories = registry.top
+    categories_with_mapping = registry.with_mapping
     
+    catalog = get_catalog()
     category_products = _get_products_by_category()
+    sprites = get_sprite_index()
     
-    # Kategori bazında ürün listeleri oluştur (path'lerle birlikte)
+    # Kategori bazında ürün listeleri oluştur (path'lerle birlikte; şablon kategori başına 8 ürün gösterir).
+    # Karolar güncel bir atlas varsa kategori başına tek görselden (build_category_sprites) gelir.
     category_with_products = {}
     for cat_data in categories_with_mapping:
         category = cat_data['category']
         mapped_slug = cat_data['mapping']['slug_map']
         
-        products = category_products.get(mapped_slug, [])
-        # Her ürün için static path oluştur
+        products = category_products.get(mapped_slug, [])[:SPRITE_TILE_COUNT]
+        sprite = sprites.get(mapped_slug, [catalog.get_entry(p) for p in products]) if products else None
         # Django static tag otomatik olarak boşlukları encode eder, bu yüzden normal path kullan
-        products_with_paths = [{'name': p, 'path': f'images/New folder/{p}'} for p in products]
-        category_with_products[category.name] = products_with_paths
-    
-    # New Arrivals için rastgele ürün seç (path'lerle birlikte)
-    all_products = []
-    for products in category_products.values():
-        all_products.extend(products)
-    
-    # Eğer ürün varsa rastgele seç
-    if all_products:
-        random.shuffle(all_products)
-        new_arrivals_files = all_products[:4] if len(all_products) >= 4 else all_products
-        # Path'lerle birlikte hazırla
-        new_arrivals = [{'name': p, 'path': f'images/New folder/{p}'} for p in new_arrivals_files]
-    else:
-        new_arrivals = []
-    
-    # Öne çıkan ürünler - static dosyalardan rastgele 10-15 ürün
-    all_products_for_featured = []
-    for products in category_products.values():
-        all_products_for_featured.extend(products)
+        category_with_products[category.name] = [
+            {'name': p, 'path': f'images/New folder/{p}', 'sprite': sprite, 'tile': position}
+            for position, p in enumerate(products)
+        ]
     
-    if all_products_for_featured:
-        random.shuffle(all_products_for_featured)
-        featured_count = min(15, len(all_products_for_featured))
-        featured_products_files = all_products_for_featured[:featured_count]
-        featured_products_static = [{'name': p, 'path': f'images/New folder/{p}'} for p in featured_products_files]
-    else:
-        featured_products_static = []
+    # New Arrivals ve öne çıkan ürünler: zaman dilimine göre dönen seçim (katalog sırası sabit)
+    all_products = catalog.sorted_files
+    new_arrivals = [
+        {'name': p, 'path': f'images/New folder/{p}'}
+        for p in _rotating_pick(all_products, 4, bucket, 'new-arrivals')
+    ]
+    featured_products_static = [
+        {'name': p, 'path': f'images/New folder/{p}'}
+        for p in _rotating_pick(all_products, 15, bucket, 'featured')
+    ]
     
     context = {
         'showcase_models': showcase_models,
         'categories': categories,
         'categories_with_mapping': categories_with_mapping,
-        'category_mapping': category_mapping,
+        'category_mapping': CATEGORY_MAPPING,
         'category_with_products': category_with_products,
         'new_arrivals_files': new_arrivals,
         'featured_products_static': featured_products_static,
     }
     
-    return render(request, 'core/home.html', context)
+    response = render(request, 'core/home.html', context)
+    return response.content, response['Content-Type']
 
 
 def category_list(request):
     """Kategori listesi"""
-    categories = Category.objects.filter(is_active=True).order_by('sort_order', 'name')
+    categories = get_category_registry().active
     return render(request, 'core/category_list.html', {'categories': categories})
 
 
 def category_detail(request, slug):
     """Kategori detay sayfası - static dosyalardan ürünleri göster"""
-    category = get_object_or_404(Category, slug=slug, is_active=True)
-    
-    # Kategori adına göre slug bul
-    category_slug_map = {
-        'At Koşu Ekipmanları': 'kosum-takimi',
-        'Tımar Ekipmanları': 'timar',
-        'At Bakım Ekipmanları': 'bakim',
-        'Nalbant Ekipmanları': 'nalbant',
-        'Binici Ekipmanları': 'binici',
-        'Araba ve Fayton Takımı': 'eyer'
-    }
-    
-    mapped_slug = category_slug_map.get(category.name, slug)
-    category_products = _get_products_by_category()
-    product_files = category_products.get(mapped_slug, [])
-    
-    # Ürünleri path'lerle birlikte hazırla
-    products_with_paths = [{'name': p, 'path': f'images/New folder/{p}'} for p in product_files]
-    
-    # Sayfalama
-    paginator = Paginator(products_with_paths, 12)
-    page_number = request.GET.get('page')
-    products_page = paginator.get_page(page_number)
-    
+    registry = get_category_registry()
+    category = registry.get(slug)
+    if category is None:
+        raise Http404("Kategori bulunamadı")
+    
+    products, keyset = _category_products(registry, category)
+    products_page = _paginate(request, products, PRODUCTS_PER_PAGE, keyset)
+    return _render_category_detail(request, category, products_page)
+
+
+def _category_products(registry, category):
+    """Kategorinin sayfalanacak ürünleri ve imleç anahtarı: (QuerySet ya da dosya listesi, keyset)"""
+    if use_db_catalog():
+        products = Product.objects.filter(category=category, is_active=True).order_by('name', 'id')
+        return products, KEYSET_ORDERING
+    # Kategorinin katalog klasörü (dosya listesi ada göre sıralı; imleç modunda dosya adı anahtar)
+    return _get_products_by_category().get(registry.catalog_slug(category), []), True
+
+
+def _render_category_detail(request, category, products_page):
+    """Sayfalanmış kategori ürünlerinden kategori detay sayfası (senkron ve async görünümler)"""
     context = {
         'category': category,
-        'products': products_page,
-        'products_count': len(product_files),
+        'products': _product_cards(products_page),
+        'products_count': page_count(products_page),
     }
     return render(request, 'core/category_detail.html', context)
 
 
 def product_list(request):
     """Ürün listesi - static dosyalardan tüm ürünleri göster"""
-    category_products = _get_products_by_category()
+    products, keyset, category_filter, search_query = _filter_products(request)
+    products_page = _paginate(request, products, PRODUCTS_PER_PAGE, keyset)
+    return _render_product_list(request, products_page, category_filter, search_query)
+
+
+def _filter_products(request):
+    """Kategori ve arama filtresine uyan ürünler: (QuerySet ya da dosya listesi, keyset, kategori, arama metni)
+
+    Arama sonuçları puana göre sıralı olduğundan imleçle değil sayfa numarasıyla sayfalanır.
+    """
+    if use_db_catalog():
+        products, category_filter, search_query = _filter_db_products(request)
+        return products, None if search_query else KEYSET_ORDERING, category_filter, search_query
+    products, category_filter, search_query = _filter_catalog_products(request)
+    return products, not search_query, category_filter, search_query
+
+
+def _render_product_list(request, products_page, category_filter, search_query):
+    """Sayfalanmış ürünlerden ürün listesi sayfası (senkron ve async görünümler)
+
+    Katalog modunda yalnızca sayfadaki dosyalar Product objeleriyle eşleştirilir.
+    """
+    context = {
+        'products': _product_cards(products_page, resolve=True),
+        'categories': get_category_registry().by_name,
+        'current_category': category_filter,
+        'search_query': search_query,
+        'products_count': page_count(products_page),
+    }
+    return render(request, 'core/product_list.html', context)
+
+
+def _filter_catalog_products(request):
+    """Katalogdan kategori ve arama filtresine uyan dosyalar: (dosyalar, kategori, arama metni)"""
+    catalog = get_catalog()
+    category_products = catalog.category_products
     
-    # Tüm ürünleri birleştir
-    all_products = []
-    for products in category_products.values():
-        all_products.extend(products)
+    # Tüm ürünler (indekste önceden sıralı)
+    all_products = catalog.sorted_files
     
     # Kategori filtresi
     category_filter = request.GET.get('category')
     if category_filter:
-        category_obj = Category.objects.filter(slug=category_filter, is_active=True).first()
-        if category_obj:
-            category_name_map = {
-                'At Koşu Ekipmanları': 'kosum-takimi',
-                'Tımar Ekipmanları': 'timar',
-                'At Bakım Ekipmanları': 'bakim',
-                'Nalbant Ekipmanları': 'nalbant',
-                'Binici Ekipmanları': 'binici',
-                'Araba ve Fayton Takımı': 'eyer'
-            }
-            mapped_slug = category_name_map.get(category_obj.name)
-            if mapped_slug and mapped_slug in category_products:
-                all_products = category_products[mapped_slug]
-        else:
-            category_slug_map = {
-                'at-kosu-ekipmanlari': 'kosum-takimi',
-                'timar-ekipmanlari': 'timar',
-                'at-bakim-ekipmanlari': 'bakim',
-                'nalbant-ekipmanlari': 'nalbant',
-                'binici-ekipmanlari': 'binici',
-                'araba-ve-fayton-takimi': 'eyer'
-            }
-            mapped_slug = category_slug_map.get(category_filter, category_filter)
-            if mapped_slug in category_products:
-                all_products = category_products[mapped_slug]
+        mapped_slug = get_category_registry().resolve_catalog_slug(category_filter)
+        if mapped_slug and mapped_slug in category_products:
+            all_products = category_products[mapped_slug]
     
-    # Arama filtresi
+    # Arama filtresi (ters indeks: Türkçe katlama, önek eşleşmesi, puana göre sıralı)
     search_query = request.GET.get('search', '').strip()
     if search_query:
-        search_lower = search_query.lower()
-        all_products = [p for p in all_products if search_lower in p.lower()]
+        within = None if all_products is catalog.sorted_files else all_products
+        all_products = get_search_index().search(search_query, within=within)
+    return all_products, category_filter, search_query
+
+
+def _filter_db_products(request):
+    """Product tablosundan filtre ve sıralama (SQL'de): (QuerySet, kategori, arama metni)"""
+    products = Product.objects.filter(is_active=True)
     
-    # Ürünleri path'lerle birlikte hazırla ve Product objelerini de eşleştir
-    products_with_data = []
-    for p in sorted(all_products):
-        product_data = {
-            'name': p,
-            'path': f'images/New folder/{p}',
-            'db_product': None
-        }
-        # Product modelinde bu ürün var mı kontrol et (Sketchfab için)
-        product_display_name = p.rsplit('.', 1)[0] if '.' in p else p
-        product_slug_candidate = slugify(product_display_name)
-        db_product = Product.objects.filter(slug=product_slug_candidate, is_active=True).first()
-        if not db_product:
-            db_product = Product.objects.filter(name__icontains=product_display_name, is_active=True).first()
-        if db_product:
-            product_data['db_product'] = db_product
-        products_with_data.append(product_data)
+    category_filter = request.GET.get('category')
+    if category_filter:
+        products = products.filter(category__slug=category_filter)
     
-    paginator = Paginator(products_with_data, 12)
-    page_number = request.GET.get('page')
-    products_page = paginator.get_page(page_number)
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        # Tam metin arama: sonuçlar alaka sırasıyla gelir
+        products = fulltext.search(products, search_query)
+    else:
+        products = products.order_by('name', 'id')
+    return products, category_filter, search_query
+
+
+def _related_cards(records, record, db_only=False):
+    """Kayıttaki sıralı ilgili dosyalardan kart sözlükleri (DB modunda ürünü olanlar)"""
+    related = record.related
+    if db_only:
+        related = [p for p in related if records.get(p).product_id is not None]
+    return [{'name': p, 'path': f'images/New folder/{p}'} for p in related[:RELATED_COUNT]]
+
+
+def _product_detail_db(request, product_file_name):
+    """Ürün detay sayfası - Product tablosundan (dosya adı veya slug ile)"""
+    records = get_product_records()
+    record = records.get(product_file_name)
+    products = Product.objects.select_related('category').filter(is_active=True)
+    if record is not None:
+        # Katalog ürünü: kayıttaki Product pk ile tek sorgu
+        db_product = products.filter(pk=record.product_id).first() if record.product_id else None
+    else:
+        # Katalog dışı (admin'den eklenmiş) ürünler get_absolute_url ile slug üzerinden gelir
+        db_product = products.filter(slug=product_file_name).first()
+    if db_product is None:
+        raise Http404("Ürün bulunamadı")
     
-    categories = Category.objects.filter(is_active=True).order_by('name')
+    card = _db_product_card(db_product)
+    if record is not None:
+        related_products = _related_cards(records, record, db_only=True)
+    else:
+        related = (Product.objects.filter(category_id=db_product.category_id, is_active=True)
+                   .exclude(pk=db_product.pk).order_by('name', 'id')[:RELATED_COUNT])
+        related_products = [_db_product_card(p) for p in related]
     
     context = {
-        'products': products_page,
-        'categories': categories,
-        'current_category': category_filter,
-        'search_query': search_query,
-        'products_count': len(products_with_data),
+        'product': {
+            'name': display_name_for(product_file_name) if record else db_product.name,
+            'file_name': card['name'],
+            'path': card['path'],
+            'image_url': card.get('image_url') and thumbnails.thumbnail_url(
+                db_product.main_image, DETAIL_THUMBNAIL_WIDTH,
+            ),
+            'category': db_product.category,
+        },
+        'db_product': db_product,
+        'related_products': related_products,
     }
-    return render(request, 'core/product_list.html', context)
+    return render(request, 'core/product_detail.html', context)
 
 
 def product_detail(request, product_name):
-    """Ürün detay sayfası - static dosyalardan"""
+    """Ürün detay sayfası - önceden hesaplanmış ürün kaydından (en fazla bir sorgu)"""
     from urllib.parse import unquote
-    from django.http import Http404
     
     # URL decode et
     product_file_name = unquote(product_name)
     
-    # Dosya adını kontrol et
-    if hasattr(settings, 'STATIC_ROOT') and settings.STATIC_ROOT:
-        products_dir = os.path.join(settings.STATIC_ROOT, 'images', 'New folder')
-    else:
-        products_dir = os.path.join(settings.BASE_DIR, 'static', 'images', 'New folder')
-    
-    product_path = os.path.join(products_dir, product_file_name)
+    if use_db_catalog():
+        return _product_detail_db(request, product_file_name)
     
-    # Dosya var mı kontrol et
-    if not os.path.exists(product_path) or not product_file_name.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
+    # Kategori, Product pk ve ilgili ürünler katalog değişince bir kez hesaplanır
+    records = get_product_records()
+    record = records.get(product_file_name)
+    if record is None:
         raise Http404("Ürün bulunamadı")
     
-    # Ürün adını dosya adından çıkar (uzantıyı kaldır)
-    if "." in product_file_name:
-        product_display_name = product_file_name.rsplit('.', 1)[0]
-    else:
-        product_display_name = product_file_name
-    
-    # Kategori bul
-    category_products = _get_products_by_category()
-    product_category_slug = None
-    product_category = None
-    
-    for cat_slug, products in category_products.items():
-        if product_file_name in products:
-            product_category_slug = cat_slug
-            product_category = Category.objects.filter(slug=cat_slug, is_active=True).first()
-            break
-    
-    # İlgili ürünler - aynı kategoriden
-    related_products = []
-    if product_category_slug and product_category_slug in category_products:
-        cat_products = category_products[product_category_slug]
-        # Aynı kategoriden farklı ürünleri al
-        related_files = [p for p in cat_products if p != product_file_name][:4]
-        related_products = [{'name': p, 'path': f'images/New folder/{p}'} for p in related_files]
-    
-    # Product modelinde bu ürün var mı kontrol et (Sketchfab için)
-    product_slug_candidate = slugify(product_display_name)
-    db_product = Product.objects.filter(slug=product_slug_candidate, is_active=True).first()
-    if not db_product:
-        db_product = Product.objects.filter(name__icontains=product_display_name, is_active=True).first()
+    # Product modelinde bu ürün var mı (Sketchfab için) - yalnızca eşleşen kayıt varsa sorgu
+    db_product = Product.objects.filter(pk=record.product_id).first() if record.product_id else None
     
     context = {
         'product': {
-            'name': product_display_name,
+            'name': display_name_for(product_file_name),
             'file_name': product_file_name,
             'path': f'images/New folder/{product_file_name}',
-            'category': product_category,
+            'category': records.registry.get(record.category),
         },
         'db_product': db_product,  # Database'deki Product objesi (Sketchfab için)
-        'related_products': related_products,
+        'related_products': _related_cards(records, record),
     }
     return render(request, 'core/product_detail.html', context)
 
 
 def blog_list(request):
     """Blog listesi"""
-    posts = BlogPost.objects.filter(is_active=True).order_by('-created_at')
+    posts = BlogPost.objects.filter(is_active=True)
+    
+    # Arama
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        posts = fulltext.search(posts, search_query)
+    else:
+        posts = posts.order_by('-created_at')
     
-    # Sayfalama
-    paginator = Paginator(posts, 6)
-    page_number = request.GET.get('page')
-    posts = paginator.get_page(page_number)
+    # Sayfalama (arama sonuçları alaka sırasıyla, sayfa numarasıyla)
+    posts = _paginate(request, posts, 6, keyset=None if search_query else KEYSET_ORDERING)
     
-    return render(request, 'core/blog_list.html', {'posts': posts})
+    return render(request, 'core/blog_list.html', {'posts': posts, 'search_query': search_query})
 
 
 def blog_detail(request, slug):
@@ -378,37 +409,41 @@ def blog_detail(request, slug):
 
 
 def search_suggestions(request):
-    """Arama önerileri AJAX"""
+    """Arama önerileri AJAX - bellek içi önek indeksinden (sorgu yapılmaz)"""
     query = request.GET.get('q', '')
-    suggestions = []
-    
-    if len(query) >= 2:
-        # Ürün önerileri
-        products = Product.objects.filter(
-            Q(name__icontains=query) |
-            Q(short_description__icontains=query)
-        ).filter(is_active=True)[:5]
-        
-        suggestions = [{
-            'name': product.name,
-            'url': product.get_absolute_url(),
-            'type': 'Ürün'
-        } for product in products]
-        
-        # Kategori önerileri
-        categories = Category.objects.filter(
-            name__icontains=query
-        ).filter(is_active=True)[:3]
-        
-        category_suggestions = [{
-            'name': category.name,
-            'url': f'/kategori/{category.slug}/',
-            'type': 'Kategori'
-        } for category in categories]
-        
-        suggestions.extend(category_suggestions)
-    
-    return JsonResponse({'suggestions': suggestions})
+    response = HttpResponse(get_suggestion_index().lookup(query), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=SUGGESTIONS_MAX_AGE)
+    return response
+
+
+def thumbnail(request, size, path):
+    """Media görselinin imzalı küçük hali (/thumb/<g>x<y>/<yol>?s=<imza>)
+
+    İlk istekte Pillow ile üretilip disk önbelleğine yazılır; biçim Accept
+    başlığına göre AVIF/WebP, desteklenmiyorsa JPEG/PNG seçilir.
+    """
+    dimensions = thumbnails.parse_size(size)
+    if dimensions is None or not thumbnails.verify(size, path, request.GET.get('s')):
+        raise Http404("Görsel bulunamadı")
+    result = thumbnails.get_thumbnail(path, *dimensions, request.META.get('HTTP_ACCEPT'))
+    if result is None:
+        raise Http404("Görsel bulunamadı")
+
+    file_path, format_name, _ = result
+    response = serve_file(
+        request, file_path, content_type=thumbnails.THUMBNAIL_FORMATS[format_name][2], max_age=THUMBNAIL_MAX_AGE,
+    )
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Production'da /media/ dosyaları: ETag/Last-Modified, Range ve X-Accel/X-Sendfile devri"""
+    full_path = media_path(path)
+    if is_derivative_file(full_path):
+        return serve_file(request, full_path, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return serve_file(request, full_path)
 
 
 def logout_view(request):
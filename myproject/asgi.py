@@ -7,10 +7,21 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
+import logging
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+os.environ.setdefault('ASGI_MODE', '1')
 
 application = get_asgi_application()
+
+# Katalog indeksini worker açılışında yükle (ilk istek beklemesin)
+# (başarısız olursa worker yine açılır, indeks ilk istekte kurulur)
+from core.catalog import get_catalog  # noqa: E402
+
+try:
+    get_catalog()
+except OSError:
+    logging.getLogger(__name__).exception('Katalog indeksi açılışta yüklenemedi')
@@ -100,13 +100,18 @@ WSGI_APPLICATION = 'myproject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# ASGI modu (myproject.asgi varsayılan olarak açar): ana sayfa, listelemeler ve arama önerileri
+# async görünümlerle sunulur. Bu modda her istek ayrı thread'de bağlantı açtığı için kalıcı
+# bağlantılar kapalıdır (CONN_MAX_AGE ile değiştirilebilir; havuz için PgBouncer önerilir).
+ASGI_MODE = os.environ.get('ASGI_MODE', '0') == '1'
+
 _ssl_required_flag = os.environ.get('DATABASE_SSL_REQUIRED')
 _ssl_required = (_ssl_required_flag == '1') if _ssl_required_flag is not None else (not DEBUG)
 
 DATABASES = {
     'default': dj_database_url.parse(
         os.environ.get('DATABASE_URL', f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
-        conn_max_age=600,
+        conn_max_age=int(os.environ.get('CONN_MAX_AGE', '0' if ASGI_MODE else '600')),
         ssl_require=_ssl_required,
     )
 }
@@ -152,17 +157,61 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# Whitenoise static files storage for production
+# Build sırasında (collectstatic sonrası) üretilen ürün kataloğu manifesti.
+# Dosya yoksa katalog görsel klasörü taranarak kurulur.
+CATALOG_MANIFEST_PATH = os.environ.get('CATALOG_MANIFEST_PATH', str(BASE_DIR / 'catalog-manifest.json'))
+
+# Sayfa başına satır içi kritik CSS manifesti (build_critical_css). Dosya yoksa ya da
+# stil dosyası/şablonlar sonradan değiştiyse kritik CSS worker'da hesaplanır.
+CRITICAL_CSS_PATH = os.environ.get('CRITICAL_CSS_PATH', str(BASE_DIR / 'critical-css.json'))
+
+# Sayfa başına satır içi kritik CSS üst sınırı (bayt); aşan sayfalar tam stil dosyasıyla yüklenir
+CRITICAL_CSS_MAX_BYTES = int(os.environ.get('CRITICAL_CSS_MAX_BYTES', str(14 * 1024)))
+
+# Ürün listeleme kaynağı: 'static' (görsel klasörü) veya 'db' (Product tablosu,
+# önce 'python manage.py sync_catalog_products' çalıştırılmalı)
+CATALOG_BACKEND = os.environ.get('CATALOG_BACKEND', 'static')
+
+# Ürün arama indeksinin diğer worker'lardaki Product değişikliklerini kontrol aralığı (saniye)
+SEARCH_INDEX_CHECK_SECONDS = int(os.environ.get('SEARCH_INDEX_CHECK_SECONDS', '30'))
+
+# Diğer worker önbelleklerinin (ana sayfa, kategori kaydı, ürün kayıtları, kritik CSS, media
+# yer tutucuları) başka süreçlerdeki değişiklikleri kontrol aralığı (saniye)
+CACHE_CHECK_SECONDS = int(os.environ.get('CACHE_CHECK_SECONDS', '30'))
+
+# Tam metin arama arka ucu: 'auto' (Postgres tsvector/pg_trgm, SQLite FTS5) veya 'basic' (icontains)
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+
+# Listeleme sayfalaması: 'page' (?page=N) veya 'cursor' (?cursor=..., derin sayfalar
+# OFFSET taraması yapmaz; ürün/blog listeleri created_at'e göre yeniden eskiye sıralanır)
+PAGINATION_MODE = os.environ.get('PAGINATION_MODE', 'page')
+
+# Ana sayfadaki öne çıkan/yeni ürün seçimlerinin dönme aralığı (saniye); sayfa bu
+# süre boyunca worker'da render edilmiş haliyle önbellekten sunulur
+HOME_ROTATION_SECONDS = int(os.environ.get('HOME_ROTATION_SECONDS', '600'))
+
+# Ürün görseli türevleri (build_image_derivatives). Varsayılan STATIC_ROOT/derivatives;
+# deploy'lar arasında kalıcı bir klasör verilirse değişmeyen görseller yeniden üretilmez
+# (IMAGE_DERIVATIVES_URL de o klasörü sunan adrese ayarlanmalıdır).
+IMAGE_DERIVATIVES_ROOT = os.environ.get('IMAGE_DERIVATIVES_ROOT') or None
+IMAGE_DERIVATIVES_URL = os.environ.get('IMAGE_DERIVATIVES_URL') or None
+
+# Whitenoise static files storage for production: dosya adları içerik özetiyle
+# (style.<md5>.css) yazılır, metin dosyaları gzip/brotli ile önceden sıkıştırılır
 if not DEBUG:
     STORAGES = {
         'default': {
             'BACKEND': 'django.core.files.storage.FileSystemStorage',
         },
         'staticfiles': {
-            'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
+            'BACKEND': 'core.storage.FingerprintedStaticFilesStorage',
         },
     }
 
+# Süresiz (immutable) önbelleklenecek dosyalar: manifest kopyaları (ad.<md5>.uzantı) ile
+# türev/atlas dosyaları (ad-<md5>-genişlik.uzantı, ad-<md5>.uzantı)
+WHITENOISE_IMMUTABLE_FILE_TEST = r'[.-][0-9a-f]{12}(?:-\d+)?\.\w+$'
+
 # Media files configuration
 # Railway Volumes: Mount volume at /data/media in Railway dashboard
 # Environment variable: RAILWAY_VOLUME_MOUNT_PATH (default: /data/media)
@@ -206,6 +255,30 @@ if DEBUG:
 
 MEDIA_URL = '/media/'
 
+# Görsel türevleri ve atlaslar release aşamasında üretilir (ilk deploy ~30 sn). Volume bağlıysa
+# bunlar varsayılan olarak volume'de tutulur: sonraki deploy'larda yalnızca değişen görseller
+# üretilir ve /media/derivatives/ altından süresiz önbelleklenerek sunulur.
+if IMAGE_DERIVATIVES_ROOT is None and os.path.exists(RAILWAY_VOLUME_MOUNT_PATH):
+    IMAGE_DERIVATIVES_ROOT = os.path.join(MEDIA_ROOT, 'derivatives')
+    IMAGE_DERIVATIVES_URL = IMAGE_DERIVATIVES_URL or f'{MEDIA_URL}derivatives/'
+
+# Production'da /media/ aktarımının ön proxy'ye devri: 'x-accel' (nginx; MEDIA_ROOT'u
+# MEDIA_ACCEL_REDIRECT_PREFIX altında internal location olarak sunmalı), 'x-sendfile'
+# (Apache/lighttpd) ya da boş (dosya Django'dan FileResponse/os.sendfile ile gönderilir)
+MEDIA_SERVE_OFFLOAD = os.environ.get('MEDIA_SERVE_OFFLOAD', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# /thumb/ ile üretilen küçük görsellerin disk önbelleği (varsayılan MEDIA_ROOT/cache/thumbs);
+# boyut sınırı aşılınca en uzun süredir kullanılmayan dosyalar silinir
+THUMBNAIL_CACHE_ROOT = os.environ.get('THUMBNAIL_CACHE_ROOT') or os.path.join(MEDIA_ROOT, 'cache', 'thumbs')
+THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get('THUMBNAIL_CACHE_MAX_MB', '512')) * 1024 * 1024
+
+# Sketchfab poster önbelleği (MEDIA_ROOT/sketchfab; fetch_sketchfab_posters ve medya worker'ı doldurur).
+# SKETCHFAB_HTTP_CLIENT aynı arayüzde başka bir istemci sınıfı, SKETCHFAB_API_URL yerel bir test sunucusu olabilir.
+SKETCHFAB_API_URL = os.environ.get('SKETCHFAB_API_URL', 'https://api.sketchfab.com/v3')
+SKETCHFAB_HTTP_CLIENT = os.environ.get('SKETCHFAB_HTTP_CLIENT', 'core.sketchfab.UrllibClient')
+SKETCHFAB_HTTP_TIMEOUT = float(os.environ.get('SKETCHFAB_HTTP_TIMEOUT', '10'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -18,7 +18,8 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
+
+from core.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -32,11 +33,8 @@ if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 else:
-    # Production: Media dosyalarını manuel olarak serve et
-    # Railway Volume mount path'inden serve edilecek
+    # Production: Media dosyaları Railway Volume mount path'inden serve edilir
+    # (ETag/Range destekli; MEDIA_SERVE_OFFLOAD ile aktarım ön proxy'ye bırakılabilir)
     urlpatterns += [
-        re_path(r'^media/(?P<path>.*)$', serve, {
-            'document_root': settings.MEDIA_ROOT,
-            'show_indexes': False,
-        }),
+        re_path(r'^media/(?P<path>.*)$', serve_media),
     ]
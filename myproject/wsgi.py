@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
 application = get_wsgi_application()
+
+# Katalog indeksini worker açılışında yükle (ilk istek beklemesin)
+# (başarısız olursa worker yine açılır, indeks ilk istekte kurulur)
+from core.catalog import get_catalog  # noqa: E402
+
+try:
+    get_catalog()
+except OSError:
+    logging.getLogger(__name__).exception('Katalog indeksi açılışta yüklenemedi')